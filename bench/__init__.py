@@ -0,0 +1,6 @@
+# Headless benchmarks for Space Asteroid Dodge
+import os
+
+# Benchmarks never open a real window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
@@ -0,0 +1,82 @@
+# Per-tick asteroid update cost of AsteroidField against one Asteroid object
+# per asteroid, at steady state with culled asteroids respawned at the top.
+# The objects are recycled through a free list, as the game did before
+# AsteroidField.
+#
+#   python -m bench.asteroids
+import random
+import time
+
+import bench  # noqa: F401  (selects the dummy video driver)
+from space_asteroid_dodge import SCREEN_HEIGHT, Asteroid, AsteroidField, AsteroidPool, RandomStreams
+
+FRAMES = 50
+SIZES = (10, 1000, 50000)
+CULL_Y = SCREEN_HEIGHT + 100
+
+def spread(size):
+    # Start heights spread over the whole fall so culling happens every tick
+    rng = random.Random(1)
+    return [(rng.randint(50, 750), rng.uniform(-100, CULL_Y)) for _ in range(size)]
+
+def bench_asteroid_field(size, frames=FRAMES):
+    field = AsteroidField(AsteroidPool(RandomStreams(1)))
+    for x, y in spread(size):
+        field.spawn(x, y, 5)
+    for _ in range(60):  # Warm up, including the first cull
+        field.update(CULL_Y)
+    start = time.perf_counter()
+    for _ in range(frames):
+        field.update(CULL_Y)
+        for _ in range(size - len(field)):
+            field.spawn(400, -100, 5)
+    return (time.perf_counter() - start) / frames
+
+class ObjectPool:
+    # Asteroid objects that left play, respawned with one of the pool's shapes
+    def __init__(self, rng):
+        self.rng = rng
+        self.templates = AsteroidPool(rng).templates
+        self.free = []
+    
+    def acquire(self, x, y, speed):
+        shape = self.rng.spawn.choice(self.templates)
+        if self.free:
+            asteroid = self.free.pop()
+            asteroid.respawn(x, y, speed, shape)
+            return asteroid
+        return Asteroid(x, y, speed, self.rng, shape)
+    
+    def release(self, asteroid):
+        self.free.append(asteroid)
+
+def bench_asteroid_objects(size, frames=FRAMES):
+    pool = ObjectPool(RandomStreams(1))
+    asteroids = [pool.acquire(x, y, 5) for x, y in spread(size)]
+    score = 0
+    start = time.perf_counter()
+    for _ in range(frames):
+        for asteroid in asteroids[:]:
+            asteroid.update()
+            if asteroid.y > CULL_Y:
+                asteroids.remove(asteroid)
+                pool.release(asteroid)
+                score += 10
+        for _ in range(size - len(asteroids)):
+            asteroids.append(pool.acquire(400, -100, 5))
+    return (time.perf_counter() - start) / frames
+
+def run(sizes=SIZES, frames=FRAMES):
+    results = {}
+    for size in sizes:
+        results[size] = {"asteroid_field_ms": bench_asteroid_field(size, frames) * 1000,
+                         "objects_ms": bench_asteroid_objects(size, frames) * 1000}
+    return results
+
+def main():
+    print(f"{'asteroids':>10} {'AsteroidField':>15} {'objects':>12}")
+    for size, result in run().items():
+        print(f"{size:>10} {result['asteroid_field_ms']:>12.3f} ms {result['objects_ms']:>9.3f} ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+# Correctness checks for the vectorized paths, against the plain versions
+# they replace: grid broad-phase pairs and queries against brute force,
+# swap_compact against a boolean mask, and recorded rounds against their
+# replays; and that the storm's lethal debris reaches the player
+#
+#   python -m bench.check
+#   python -m bench.check --trials 200
+import argparse
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pygame
+
+import bench  # noqa: F401  (selects the dummy video driver)
+import space_asteroid_dodge as game
+
+SEED = 1234
+TRIALS = 50
+STORM_TICKS = 120  # Ticks of a real storm whose pairs are checked
+REPLAY_ROUNDS = 5
+STORM_ROUNDS = 5  # Seeded storm rounds played against the same rounds without a storm
+REPLAY_TICKS = 3000  # Rounds still running after this many ticks are cut short
+
+def touching_pairs(pos, radius):
+    # Every pair (i, j), i < j, of overlapping circles, by brute force
+    offset = pos[:, None, :] - pos[None, :, :]
+    distance_sq = (offset ** 2).sum(axis=2)
+    reach = radius[:, None] + radius[None, :]
+    i, j = np.nonzero(np.triu((distance_sq < reach ** 2) & (distance_sq > 0), 1))
+    return set(zip(i.tolist(), j.tolist()))
+
+def grid_pairs(grid, pos, radius):
+    # The grid's candidate pairs, checking each is listed once, cut down to
+    # those that touch
+    i, j = grid.neighbour_pairs()
+    pairs = [(min(a, b), max(a, b)) for a, b in zip(i.tolist(), j.tolist())]
+    if len(set(pairs)) != len(pairs):
+        return None
+    return {(a, b) for a, b in pairs if 0 < ((pos[a] - pos[b]) ** 2).sum() < (radius[a] + radius[b]) ** 2}
+
+def check_grid_random(rng, trials):
+    # Circles scattered over and around the grid's area, no wider than a cell
+    cell = game.STORM_CELL_SIZE
+    for _ in range(trials):
+        n = int(rng.integers(0, 600))
+        grid = game.UniformGrid(cell, -20, -200, 240, 220)
+        pos = np.stack((rng.uniform(-60, 260, n), rng.uniform(-240, 60, n)), axis=1).astype(np.float32)
+        radius = rng.uniform(0.5, cell / 2, n).astype(np.float32)
+        grid.rebuild(pos)
+        pairs = grid_pairs(grid, pos, radius)
+        if pairs is None:
+            return "a pair was listed twice"
+        missing = touching_pairs(pos, radius) - pairs
+        if missing:
+            return f"{len(missing)} touching pairs missed among {n} circles"
+        for _ in range(5):
+            x, y, r = rng.uniform(-40, 240), rng.uniform(-220, 40), rng.uniform(0, 30)
+            found = set(grid.query_radius(pos, radius, x, y, r).tolist())
+            expected = set(np.flatnonzero(((pos - (x, y)) ** 2).sum(axis=1) <= (r + radius) ** 2).tolist())
+            if found != expected:
+                return f"query_radius found {len(found)} circles, brute force {len(expected)}"
+    return None
+
+def check_grid_storm(ticks):
+    # The pairs and rect queries of a real storm as it builds up and shatters
+    debris = game.DebrisField(game.STORM_DEBRIS // 4, np.random.default_rng(SEED))
+    screen = game.SCREEN_WIDTH, game.SCREEN_HEIGHT
+    for tick in range(ticks):
+        debris.update(game.game_speed)
+        n = len(debris)
+        pos = debris.pos[:n].copy()
+        radius = debris.radius[:n].copy()
+        pairs = grid_pairs(debris.grid, pos, radius)
+        if pairs is None:
+            return f"tick {tick}: a pair was listed twice"
+        if pairs != touching_pairs(pos, radius):
+            return f"tick {tick}: grid pairs differ from brute force among {n} pieces"
+        rect = pygame.Rect(tick * 7 % screen[0], tick * 13 % screen[1], 60, 80)
+        nearest = np.clip(pos, (rect.left, rect.top), (rect.right, rect.bottom))
+        expected = set(np.flatnonzero(((pos - nearest) ** 2).sum(axis=1) <= radius ** 2).tolist())
+        if set(debris.query_rect(rect).tolist()) != expected:
+            return f"tick {tick}: query_rect differs from brute force"
+        debris.collide()
+    return None
+
+def check_storm_lethal(rounds):
+    # An idle player in a default storm, next to the same round without one:
+    # lethal pieces must get down to the player, and ending a round earlier
+    # than the asteroids alone would shows one destroyed the ship
+    reached = 0
+    kills = 0
+    for index in range(rounds):
+        plain = game.Simulation(seed=SEED + index, effects=False)
+        while not plain.player.exploding and not plain.game_over:
+            plain.step(game.NO_INPUT)
+        sim = game.Simulation(seed=SEED + index, storm=game.STORM_DEBRIS, effects=False)
+        band = sim.player.rect.top
+        while not sim.player.exploding and not sim.game_over:
+            sim.step(game.NO_INPUT)
+            n = len(sim.debris)
+            reached += int(((sim.debris.radius[:n] >= game.STORM_LETHAL_RADIUS)
+                            & (sim.debris.pos[:n, 1] >= band)).any())
+        kills += sim.game_time < plain.game_time
+    if not reached:
+        return f"no lethal debris reached the player's band in {rounds} rounds"
+    if not kills:
+        return f"the storm did not end any of {rounds} rounds early"
+    return None
+
+def check_swap_compact(rng, trials):
+    for _ in range(trials):
+        capacity = int(rng.integers(1, 300))
+        count = int(rng.integers(0, capacity + 1))
+        dead = np.flatnonzero(rng.random(count) < rng.random())
+        # Row ids in a 1-D array and a 2-D one, to follow the rows as they move
+        ids = np.arange(capacity)
+        rows = np.stack((ids, -ids), axis=1)
+        keep = np.ones(count, bool)
+        keep[dead] = False
+        expected = ids[:count][keep]
+        new_count = game.swap_compact((ids, rows), count, dead)
+        if new_count != len(expected):
+            return f"kept {new_count} rows, the mask keeps {len(expected)}"
+        if sorted(ids[:new_count].tolist()) != expected.tolist():
+            return "the surviving rows differ from the mask's"
+        if not (rows[:new_count, 0] == ids[:new_count]).all() or not (rows[:new_count, 1] == -ids[:new_count]).all():
+            return "the arrays' rows were moved differently"
+        if (ids[count:] != np.arange(count, capacity)).any():
+            return "rows past count were changed"
+    return None
+
+def check_replays(rounds, directory):
+    # Seeded rounds under scripted input, with and without a storm, saved
+    # and replayed from the file
+    for index in range(rounds):
+        storm = game.STORM_DEBRIS // 10 if index % 2 else 0
+        sim = game.Simulation(seed=SEED + index, storm=storm)
+        recorder = game.InputRecorder(sim.rng.seed, storm, sim.shape_seed)
+        pilot = np.random.default_rng(index)
+        while not sim.game_over and sim.game_time < REPLAY_TICKS:
+            inputs = game.Inputs(int(pilot.integers(0, 3)), int(pilot.integers(0, 3)), bool(pilot.random() < 0.01))
+            recorder.record(inputs)
+            sim.step(inputs)
+        path = os.path.join(directory, f"round{index}.rec")
+        recorder.save(path, sim.checksum())
+        replayed, matches = game.play_replay(path)
+        if not matches or replayed.checksum() != sim.checksum():
+            return f"round {index} (seed {SEED + index}, storm {storm}) replays differently"
+        if (replayed.game_time, replayed.score) != (sim.game_time, sim.score):
+            return f"round {index} replays to a different time or score"
+    return None
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge correctness checks")
+    parser.add_argument("--trials", type=int, default=TRIALS, help="random cases per randomized check")
+    args = parser.parse_args(argv)
+
+    rng = np.random.default_rng(SEED)
+    with tempfile.TemporaryDirectory() as directory:
+        checks = (("grid pairs and queries, random circles", lambda: check_grid_random(rng, args.trials)),
+                  ("grid pairs and queries, storm debris", lambda: check_grid_storm(STORM_TICKS)),
+                  ("storm debris reaches the player and can end a round", lambda: check_storm_lethal(STORM_ROUNDS)),
+                  ("swap_compact against a boolean mask", lambda: check_swap_compact(rng, args.trials * 20)),
+                  ("recorded rounds replay to the same checksum", lambda: check_replays(REPLAY_ROUNDS, directory)))
+        failures = 0
+        for name, check in checks:
+            problem = check()
+            print(f"{'ok  ' if problem is None else 'FAIL'} {name}" + (f": {problem}" if problem else ""))
+            failures += problem is not None
+    if failures:
+        print(f"FAILED: {failures} of {len(checks)} checks")
+        return 1
+    print(f"OK: all {len(checks)} checks passed")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+# Steps per second of the agent environment: one AsteroidDodgeEnv in this
+# process, then VectorEnv across worker processes, with random actions
+#
+#   python -m bench.env
+#   python -m bench.env --envs 256 --workers 16 --steps 2000
+import argparse
+import os
+import time
+
+import numpy as np
+
+import bench  # noqa: F401  (selects the dummy video driver)
+from space_asteroid_dodge_env import AsteroidDodgeEnv, VectorEnv
+
+SEED = 1234
+STEPS = 1000  # Vector steps to time; the single env takes a tenth of the total env steps
+
+def bench_single(steps):
+    env = AsteroidDodgeEnv()
+    env.reset(SEED)
+    actions = np.random.default_rng(SEED).integers(env.action_count, size=steps).tolist()
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, truncated, _ = env.step(action)
+        if terminated or truncated:
+            env.reset()
+    return steps / (time.perf_counter() - start)
+
+def bench_vector(envs, workers, steps):
+    rng = np.random.default_rng(SEED)
+    with VectorEnv(envs, workers) as vector:
+        vector.reset(SEED)
+        vector.step(np.zeros(envs, np.int8))  # Let every worker finish starting up
+        start = time.perf_counter()
+        for _ in range(steps):
+            vector.step(rng.integers(vector.action_count, size=envs))
+        return envs * steps / (time.perf_counter() - start)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge environment throughput")
+    parser.add_argument("--envs", type=int, default=64, help="environments in the vector env")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--steps", type=int, default=STEPS, help="vector steps to time")
+    args = parser.parse_args(argv)
+    print(f"single env            {bench_single(args.envs * args.steps // 10):>10.0f} steps/s")
+    print(f"vector env {args.envs:>4} x {args.workers:<3} {bench_vector(args.envs, args.workers, args.steps):>10.0f} steps/s")
+
+if __name__ == "__main__":
+    main()
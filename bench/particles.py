@@ -0,0 +1,61 @@
+# Per-frame particle update cost of ParticleSystem against the old
+# list-of-lists particles, at steady state with dead particles respawned
+#
+#   python -m bench.particles
+import random
+import time
+
+import numpy as np
+
+import bench  # noqa: F401  (selects the dummy video driver)
+from space_asteroid_dodge import ParticleSystem
+
+FRAMES = 200
+SIZES = (1000, 10000, 100000)
+LIST_MAX_SIZE = 10000  # The list version is O(n^2) and crawls beyond this
+
+def bench_particle_system(size, frames=FRAMES):
+    system = ParticleSystem(size, 0.5)
+    rng = np.random.default_rng(1)
+    system.burst(size, 400, 300, 3, (5, 15), (255, 165, 0))
+    start = time.perf_counter()
+    for _ in range(frames):
+        system.update()
+        missing = size - len(system)
+        system.emit(missing, 400, 300, rng.uniform(-3, 3, missing), rng.uniform(-3, 3, missing),
+                    rng.integers(5, 16, missing), (255, 165, 0))
+    return (time.perf_counter() - start) / frames
+
+def bench_particle_lists(size, frames=FRAMES):
+    rng = random.Random(1)
+    def new_particle():
+        return [400, 300, rng.uniform(-3, 3), rng.uniform(-3, 3), rng.randint(5, 15), (255, 165, 0)]
+    particles = [new_particle() for _ in range(size)]
+    start = time.perf_counter()
+    for _ in range(frames):
+        for particle in particles[:]:
+            particle[0] += particle[2]
+            particle[1] += particle[3]
+            particle[4] -= 0.5
+            if particle[4] <= 0:
+                particles.remove(particle)
+        for _ in range(size - len(particles)):
+            particles.append(new_particle())
+    return (time.perf_counter() - start) / frames
+
+def run(sizes=SIZES, frames=FRAMES):
+    results = {}
+    for size in sizes:
+        results[size] = {"particle_system_ms": bench_particle_system(size, frames) * 1000}
+        if size <= LIST_MAX_SIZE:
+            results[size]["lists_ms"] = bench_particle_lists(size, frames) * 1000
+    return results
+
+def main():
+    print(f"{'particles':>10} {'ParticleSystem':>16} {'lists':>12}")
+    for size, result in run().items():
+        lists = f"{result['lists_ms']:.3f} ms" if "lists_ms" in result else "-"
+        print(f"{size:>10} {result['particle_system_ms']:>13.3f} ms {lists:>12}")
+
+if __name__ == "__main__":
+    main()
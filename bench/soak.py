@@ -0,0 +1,100 @@
+# Headless soak of the session loop: plays many rounds back to back through
+# Session, pressing SPACE at every game over, and checks that the time to
+# restart a round and the memory in use stay flat
+#
+#   python -m bench.soak                 # 1000 rounds
+#   python -m bench.soak --rounds 5000
+import argparse
+import os
+import resource
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pygame
+
+import bench  # noqa: F401  (selects the dummy video driver)
+import space_asteroid_dodge as game
+
+SEED = 1234
+ROUNDS = 1000
+ROUND_TICKS = 300  # Rounds still running after this many ticks are ended by hand
+FRAME_MS = 1000 / game.TICK_RATE * game.MAX_CATCHUP_TICKS  # Each frame runs the most ticks it can
+WARMUP_ROUNDS = 20  # Caches fill up over the first rounds; growth is measured after them
+MAX_RESTART_GROWTH = 1.5  # Late restarts may take at most this many times as long as early ones
+MAX_MEMORY_GROWTH_KB = 1024
+
+def press_space():
+    pygame.event.post(pygame.event.Event(pygame.KEYDOWN, key=pygame.K_SPACE))
+
+def play_round(session):
+    # Fast-forward until the round ends, ending a long one by destroying the
+    # player; then run one game over frame and press SPACE
+    frames = 0
+    while session.state in (game.PLAYING, game.EXPLODING):
+        if session.sim.game_time >= ROUND_TICKS and not session.sim.player.exploding:
+            session.sim.explode_player(session.sim.player.x, session.sim.player.y, game.METEOR_COLORS[0])
+        session.frame(FRAME_MS)
+        frames += 1
+    session.frame(FRAME_MS)
+    press_space()
+    session.frame(FRAME_MS)
+    return frames + 2
+
+def run(rounds=ROUNDS):
+    # Returns one (restart ms, traced memory KB, peak RSS KB, frames) row per round
+    game.MAX_RENDER_FPS = 0  # Never wait for the frame rate cap
+    screen = pygame.display.set_mode((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    with tempfile.TemporaryDirectory() as directory:
+        session = game.Session(screen, SEED, show_start=False,
+                               score_path=os.path.join(directory, "scores.json"))
+        tracemalloc.start()
+        rows = []
+        for _ in range(rounds):
+            frames = play_round(session)
+            current, _ = tracemalloc.get_traced_memory()
+            rows.append((session.restart_ms, current / 1024,
+                         resource.getrusage(resource.RUSAGE_SELF).ru_maxrss, frames))
+        tracemalloc.stop()
+        session.scores.close()
+    return rows
+
+def summarize(rows):
+    # Compares the first and last tenth of the rounds after the warm-up
+    measured = rows[WARMUP_ROUNDS:]
+    tenth = max(1, len(measured) // 10)
+    early, late = measured[:tenth], measured[-tenth:]
+    restart = (statistics.median(row[0] for row in early), statistics.median(row[0] for row in late))
+    memory = (statistics.mean(row[1] for row in early), statistics.mean(row[1] for row in late))
+    rss = (early[-1][2], late[-1][2])
+    return restart, memory, rss
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge session soak test")
+    parser.add_argument("--rounds", type=int, default=ROUNDS, help="rounds to play")
+    args = parser.parse_args(argv)
+    if args.rounds < WARMUP_ROUNDS + 10:
+        parser.error(f"--rounds must be at least {WARMUP_ROUNDS + 10}")
+
+    start = time.perf_counter()
+    rows = run(args.rounds)
+    restart, memory, rss = summarize(rows)
+    print(f"{args.rounds} rounds, {sum(row[3] for row in rows)} frames in {time.perf_counter() - start:.1f} s")
+    print(f"restart time  early {restart[0]:.3f} ms  late {restart[1]:.3f} ms")
+    print(f"traced memory early {memory[0]:.0f} KB  late {memory[1]:.0f} KB")
+    print(f"peak RSS      early {rss[0]} KB  late {rss[1]} KB")
+    failures = []
+    if restart[1] > restart[0] * MAX_RESTART_GROWTH:
+        failures.append("restart time grew")
+    if memory[1] - memory[0] > MAX_MEMORY_GROWTH_KB:
+        failures.append("memory grew")
+    if failures:
+        print("FAILED: " + ", ".join(failures))
+        return 1
+    print("OK: restart time and memory are flat")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,283 @@
+# Seeded rendering and full-frame scenarios timed through the real game code,
+# written to JSON and compared against a stored baseline
+#
+#   python -m bench.suite                     # run and compare with bench/baseline.json
+#   python -m bench.suite --output out.json   # also keep the results
+#   python -m bench.suite --save-baseline     # record a new baseline from several runs
+#   python -m bench.suite --only frame_steady draw_space
+import argparse
+import json
+import os
+import platform
+import random
+import sys
+import time
+
+import numpy as np
+import pygame
+
+import bench  # noqa: F401  (selects the dummy video driver)
+import space_asteroid_dodge as game
+
+SEED = 1234
+WARMUP = 10  # Untimed calls before each scenario
+FRAMES = 120  # Timed calls per scenario
+REPEATS = 9  # Runs per scenario, taken in turn with the others; the median run is kept
+THRESHOLD = 0.2  # Relative median slowdown, as a fraction, that counts as a regression
+BASELINE_RUNS = 5  # Suite runs a saved baseline takes its per-scenario medians from
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+DENSE_ASTEROIDS = 150
+
+def invincible(sim):
+    # Keep the player alive through a scenario
+    sim.player.shield_active = True
+    sim.player.shield_timer = 10 ** 9
+
+def frame(screen, sim, renderer):
+    sim.step(game.NO_INPUT)
+    game.draw_game(screen, sim, renderer, 0)
+
+# Each scenario takes the screen and returns a function that does one timed
+# call; everything it needs is built, from fixed seeds, before timing starts
+
+def scenario_draw_space(screen):
+    return lambda: game.draw_space(screen)
+
+def scenario_draw_stars(count):
+    # A starfield of its own, so the game's stars are left as they are
+    def setup(screen):
+        field = game.StarField()
+        field.generate(count, game.SCREEN_WIDTH, game.SCREEN_HEIGHT, random.Random(SEED))
+        rng = np.random.default_rng(SEED)
+        return lambda: field.draw(screen, rng=rng)
+    return setup
+
+def scenario_asteroid_draw(meteor_type):
+    def setup(screen):
+        rng = game.RandomStreams(SEED)
+        shape = game.AsteroidShape.random(meteor_type, rng, rng.shape)
+        asteroid = game.Asteroid(400, 300, 0, rng, shape)
+        asteroid.has_glow = True
+        def draw():
+            asteroid.update()
+            asteroid.draw(screen)
+        return draw
+    return setup
+
+def scenario_astronaut_draw(shield=False, exploding=False):
+    def setup(screen):
+        astronaut = game.Astronaut(game.RandomStreams(SEED))
+        astronaut.shield_active = shield
+        astronaut.exploding = exploding
+        def draw():
+            astronaut.update()
+            # Mid-explosion stays at the halfway point of the animation
+            astronaut.draw(screen, astronaut.explosion_duration // 2 if exploding else 0)
+        return draw
+    return setup
+
+def scenario_show_game_over(screen):
+    return lambda: game.show_game_over(screen, 500, 800, False, 40)
+
+def scenario_frame_steady(screen):
+    # An ordinary round a few seconds in
+    sim = game.Simulation(seed=SEED, prerender=True)
+    invincible(sim)
+    for _ in range(300):
+        sim.step(game.NO_INPUT)
+    renderer = game.DirtyRectRenderer(False)
+    return lambda: frame(screen, sim, renderer)
+
+def scenario_frame_death_burst(screen):
+    # The 115-particle burst of the player exploding; every call after the
+    # first FRAMES // 2 starts a fresh burst so it is always in flight
+    sim = game.Simulation(seed=SEED, prerender=True)
+    for _ in range(120):
+        sim.step(game.NO_INPUT)
+    renderer = game.DirtyRectRenderer(False)
+    calls = [0]
+    def death_frame():
+        if calls[0] % (FRAMES // 2) == 0:
+            sim.particles.clear()
+            sim.explode_player(sim.player.x, sim.player.y - 40, game.METEOR_COLORS[0])
+        calls[0] += 1
+        frame(screen, sim, renderer)
+    return death_frame
+
+def scenario_frame_dense_field(screen):
+    # Many asteroids on screen at once, the same number in every frame: none
+    # spawn, and none get low enough to reach the player or be culled
+    sim = game.Simulation(seed=SEED, prerender=True,
+                          difficulty=game.DEFAULT_DIFFICULTY._replace(spawn_interval=10 ** 9))
+    invincible(sim)
+    # Every sprite ready, so this times drawing rather than filling the cache
+    for shape in sim.pool.templates:
+        for has_glow in (False, True):
+            game.asteroid_sprites.prerender(shape, has_glow)
+    rng = np.random.default_rng(SEED)
+    for x, y in zip(rng.integers(50, 750, DENSE_ASTEROIDS).tolist(),
+                    rng.uniform(-100, 250, DENSE_ASTEROIDS).tolist()):
+        sim.asteroids.spawn(x, y, 1)
+    renderer = game.DirtyRectRenderer(False)
+    return lambda: frame(screen, sim, renderer)
+
+def scenario_frame_storm(screen):
+    # Meteor storm mode at its default size, once the storm has built up
+    sim = game.Simulation(seed=SEED, prerender=True, storm=game.STORM_DEBRIS)
+    invincible(sim)
+    for _ in range(180):
+        sim.step(game.NO_INPUT)
+    renderer = game.DirtyRectRenderer(False)
+    return lambda: frame(screen, sim, renderer)
+
+SCENARIOS = {
+    "draw_space": scenario_draw_space,
+    "draw_stars_10k": scenario_draw_stars(10000),
+    "asteroid_draw_stony": scenario_asteroid_draw("stony"),
+    "asteroid_draw_iron": scenario_asteroid_draw("iron"),
+    "asteroid_draw_stony_iron": scenario_asteroid_draw("stony-iron"),
+    "astronaut_draw": scenario_astronaut_draw(),
+    "astronaut_draw_shield": scenario_astronaut_draw(shield=True),
+    "astronaut_draw_exploding": scenario_astronaut_draw(exploding=True),
+    "show_game_over": scenario_show_game_over,
+    "frame_steady": scenario_frame_steady,
+    "frame_death_burst": scenario_frame_death_burst,
+    "frame_dense_field": scenario_frame_dense_field,
+    "frame_storm": scenario_frame_storm,
+}
+
+def time_scenario(screen, setup, frames=FRAMES, warmup=WARMUP):
+    call = setup(screen)
+    for _ in range(warmup):
+        call()
+    times = np.zeros(frames)
+    for i in range(frames):
+        start = time.perf_counter()
+        call()
+        times[i] = time.perf_counter() - start
+    times *= 1000
+    return {"median_ms": float(np.median(times)), "p95_ms": float(np.percentile(times, 95)),
+            "mean_ms": float(times.mean())}
+
+def calibrate(screen):
+    # Time of a fixed mix of Python and blitting work, taken next to each
+    # scenario. Shared and throttled machines swing by tens of percent within
+    # and between runs; comparing against the baseline relative to this takes
+    # most of that swing out.
+    sprite = pygame.Surface((64, 64), pygame.SRCALPHA)
+    sprite.fill((255, 255, 255, 128))
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        total = 0
+        for i in range(20000):
+            total += i * i % 7
+        for i in range(500):
+            screen.blit(sprite, (i % 700, i % 500))
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+def median_run(runs):
+    # The run with the median relative time, so neither a lucky nor an
+    # unlucky run decides the result
+    return sorted(runs, key=lambda result: result["relative"])[len(runs) // 2]
+
+def run(names=None, frames=FRAMES, repeats=REPEATS):
+    # The scenarios take turns, one run each per round, so a slow spell on the
+    # machine lands on one run of many scenarios rather than every run of one
+    screen = pygame.display.set_mode((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+    names = names or list(SCENARIOS)
+    runs = {name: [] for name in names}
+    for _ in range(repeats):
+        for name in names:
+            game.streams.reseed(SEED)  # Module-level draws (stars, twinkle) repeat too
+            game.asteroid_sprites.clear()  # Earlier scenarios' sprites would cause evictions
+            result = time_scenario(screen, SCENARIOS[name], frames)
+            result["calibration_ms"] = calibrate(screen)
+            result["relative"] = result["median_ms"] / result["calibration_ms"]
+            runs[name].append(result)
+    results = {name: median_run(runs[name]) for name in names}
+    return {"meta": {"python": platform.python_version(), "pygame": pygame.version.ver,
+                     "numpy": np.__version__, "machine": platform.machine(),
+                     "frames": frames, "repeats": repeats},
+            "results": results}
+
+def median_results(runs):
+    # One result of several runs: each scenario's run with the median
+    # relative time, so one lucky or unlucky run does not set the baseline
+    merged = {"meta": dict(runs[0]["meta"], baseline_runs=len(runs)), "results": {}}
+    for name in runs[0]["results"]:
+        merged["results"][name] = median_run([run["results"][name] for run in runs])
+    return merged
+
+def compare(results, baseline, threshold=THRESHOLD):
+    # Returns [(name, current median, baseline median, ratio, verdict)]. The
+    # ratio compares medians relative to their calibration times.
+    rows = []
+    for name, result in results["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            rows.append((name, result["median_ms"], None, None, "new"))
+            continue
+        ratio = result["relative"] / before["relative"]
+        if ratio > 1 + threshold:
+            verdict = "REGRESSION"
+        elif ratio < 1 - threshold:
+            verdict = "faster"
+        else:
+            verdict = "ok"
+        rows.append((name, result["median_ms"], before["median_ms"], ratio, verdict))
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge benchmark suite")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), metavar="SCENARIO",
+                        help="run only these scenarios")
+    parser.add_argument("--frames", type=int, default=FRAMES, help="timed calls per scenario")
+    parser.add_argument("--repeats", type=int, default=REPEATS,
+                        help="runs per scenario, keeping the one with the median time")
+    parser.add_argument("--output", metavar="PATH", help="write the results to PATH as JSON")
+    parser.add_argument("--baseline", default=BASELINE_PATH, metavar="PATH",
+                        help="baseline to compare against (default bench/baseline.json)")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="write the median of several runs to the baseline instead of comparing")
+    parser.add_argument("--baseline-runs", type=int, default=BASELINE_RUNS, metavar="N",
+                        help=f"suite runs --save-baseline takes the medians of (default {BASELINE_RUNS})")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                        help="median slowdown that counts as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    if args.save_baseline:
+        results = median_results([run(args.only, args.frames, args.repeats) for _ in range(args.baseline_runs)])
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Saved baseline of {len(results['results'])} scenarios, the medians of {args.baseline_runs} runs, "
+              f"to {args.baseline}")
+        return 0
+
+    baseline = {"results": {}}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    results = run(args.only, args.frames, args.repeats)
+    rows = compare(results, baseline, args.threshold)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    print(f"{'scenario':<26} {'median':>10} {'baseline':>10} {'change':>8}  (relative to calibration)")
+    for name, median, before, ratio, verdict in rows:
+        before_text = f"{before:.3f}" if before is not None else "-"
+        change = f"{(ratio - 1) * 100:+.0f}%" if ratio is not None else "-"
+        print(f"{name:<26} {median:>10.3f} {before_text:>10} {change:>8}  {verdict}")
+    regressions = [row[0] for row in rows if row[4] == "REGRESSION"]
+    if regressions:
+        print(f"{len(regressions)} regression(s) above {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
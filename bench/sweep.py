@@ -0,0 +1,281 @@
+# Difficulty sweep: plays a grid of Difficulty settings headless with scripted
+# pilots, across all cores, and reports how long each pilot survives and what
+# it scores under each setting. Every finished episode is appended to a JSON
+# lines file as it comes in; running the same sweep again skips the episodes
+# already there, so an interrupted sweep picks up where it stopped.
+#
+#   python -m bench.sweep                                  # the default grid
+#   python -m bench.sweep --spawn-interval 30 40 50 --start-speed 4 5 6
+#   python -m bench.sweep --asteroid-sizes 40-80 50-100 --pilots dodger --episodes 50
+#   python -m bench.sweep --results sweep.jsonl --report sweep.txt
+import argparse
+import concurrent.futures
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+import bench  # noqa: F401  (selects the dummy video driver)
+import space_asteroid_dodge as game
+
+SEED = 1234  # Episode i of every setting plays seed SEED + i, so settings face the same rounds
+SHAPE_SEED = 1234  # Asteroid shape templates, shared by every episode
+EPISODES = 20
+MAX_TICKS = game.TICK_RATE * 60 * 5  # Episodes still going after five minutes are cut off
+RESULTS_PATH = "sweep.jsonl"
+LOOKAHEAD = 60  # Ticks ahead a pilot looks for asteroids coming down on it
+SHIP_HALF_WIDTH = 25
+STEP = 20  # Pixels a ship moves per move
+
+# Pilots take the Simulation and return the Inputs for the next tick. They
+# see the same state a player sees on screen.
+
+def pilot_idle(sim):
+    return game.NO_INPUT
+
+def danger(sim, positions):
+    # For each candidate ship x, how soon an asteroid would reach the ship
+    # there: 1 / ticks until it arrives, 0 for none within the lookahead
+    asteroids = sim.asteroids
+    n = len(asteroids)
+    player = sim.player
+    result = np.zeros(len(positions))
+    if not n:
+        return result
+    y = asteroids.y[:n]
+    radius = asteroids.radius[:n]
+    gap = player.y - y - radius
+    ticks = np.maximum(gap, 0) / asteroids.speed[:n] + 1
+    coming = (y - radius < player.y + player.height / 2) & (ticks <= LOOKAHEAD)
+    if not coming.any():
+        return result
+    x, radius, ticks = asteroids.x[:n][coming], radius[coming], ticks[coming]
+    overlap = np.abs(x[None, :] - positions[:, None]) < radius[None, :] + SHIP_HALF_WIDTH
+    return np.where(overlap, 1.0 / ticks[None, :], 0.0).max(axis=1)
+
+def steer(sim, target=None):
+    # Step toward the safest spot within reach, preferring target, then
+    # staying put, when several are equally safe
+    x = sim.player.x
+    positions = np.clip(x + STEP * np.arange(-4, 5), game.PLAYER_X_MIN, game.PLAYER_X_MAX)
+    goal = x if target is None else target
+    # Safety first; among equally safe spots the one nearest the goal
+    cost = danger(sim, positions) * 1e6 + np.abs(positions - goal)
+    best = positions[int(np.argmin(cost))]
+    if best < x:
+        return game.Inputs(left=1)
+    if best > x:
+        return game.Inputs(right=1)
+    return game.NO_INPUT
+
+def pilot_dodger(sim):
+    # Moves out of the way of asteroids, never touching the shield
+    return steer(sim)
+
+def pilot_collector(sim):
+    # A dodger that goes after shield power-ups when it is safe to
+    if sim.shield_powerup_active and sim.shield_powerup_pos[1] > 0:
+        return steer(sim, sim.shield_powerup_pos[0])
+    return steer(sim)
+
+def pilot_shielder(sim):
+    # A dodger that raises the shield whenever it cannot get out of the way
+    inputs = steer(sim)
+    player = sim.player
+    if not player.shield_active and danger(sim, np.array([float(player.x)]))[0] >= 1.0 / 3:
+        return inputs._replace(shield=True)
+    return inputs
+
+PILOTS = {
+    "idle": pilot_idle,
+    "dodger": pilot_dodger,
+    "collector": pilot_collector,
+    "shielder": pilot_shielder,
+}
+
+def play(difficulty, pilot, seeds, max_ticks, storm):
+    # Runs in a worker process. Returns (seed, ticks survived, score, win)
+    # for each seed.
+    sim = game.Simulation(seed=seeds[0], storm=storm, shape_seed=SHAPE_SEED, effects=False,
+                          difficulty=game.Difficulty(*difficulty))
+    fly = PILOTS[pilot]
+    rows = []
+    for seed in seeds:
+        sim.reset(seed)
+        while not sim.game_over and sim.game_time < max_ticks:
+            sim.step(fly(sim))
+        rows.append((seed, sim.game_time, sim.score, sim.win))
+    return rows
+
+def grid(args):
+    # Every combination of the swept settings, as Difficulty tuples
+    sizes = [parse_range(text) for text in args.asteroid_sizes]
+    windows = [parse_range(text) for text in args.powerup_window]
+    return [game.Difficulty(spawn, speed, step, win, powerup[0], powerup[1], size[0], size[1])
+            for spawn, speed, step, win, powerup, size in itertools.product(
+                args.spawn_interval, args.start_speed, args.speed_step, args.win_score, windows, sizes)]
+
+def parse_range(text):
+    low, _, high = text.partition("-")
+    low, high = int(low), int(high or low)
+    if low > high:
+        raise argparse.ArgumentTypeError(f"empty range {text}")
+    return low, high
+
+def key(difficulty, pilot, seed, max_ticks, storm):
+    return (tuple(difficulty), pilot, seed, max_ticks, storm)
+
+def load_results(path):
+    # Episodes already played, by key. A line cut short by an interruption
+    # is skipped, and that episode played again.
+    results = {}
+    if not os.path.exists(path):
+        return results
+    with open(path) as f:
+        for line in f:
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                continue
+            results[key(row["difficulty"], row["pilot"], row["seed"], row["max_ticks"], row["storm"])] = row
+    return results
+
+def end_line(path):
+    # Finish a line left cut short, so appended rows start on their own line
+    with open(path, "rb+") as f:
+        if f.seek(0, os.SEEK_END) == 0:
+            return
+        f.seek(-1, os.SEEK_END)
+        if f.read(1) != b"\n":
+            f.write(b"\n")
+
+def run(configs, pilots, episodes, max_ticks, storm, results_path, workers=None, chunk=5):
+    # Plays every episode not already in the results file, appending each as
+    # it finishes. Returns the rows for this sweep, old and new.
+    results = load_results(results_path)
+    seeds = range(SEED, SEED + episodes)
+    todo = []
+    for difficulty, pilot in itertools.product(configs, pilots):
+        missing = [seed for seed in seeds if key(difficulty, pilot, seed, max_ticks, storm) not in results]
+        todo += [(difficulty, pilot, missing[i:i + chunk]) for i in range(0, len(missing), chunk)]
+    total = sum(len(task[2]) for task in todo)
+    if results:
+        print(f"{len(configs) * len(pilots) * episodes - total} episodes already in {results_path}")
+    print(f"playing {total} episodes in {len(todo)} tasks")
+
+    if os.path.exists(results_path):
+        end_line(results_path)
+    start = time.perf_counter()
+    done = 0
+    with open(results_path, "a") as out, concurrent.futures.ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(play, tuple(difficulty), pilot, task_seeds, max_ticks, storm): (difficulty, pilot)
+                   for difficulty, pilot, task_seeds in todo}
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                difficulty, pilot = futures[future]
+                played = future.result()
+                for seed, ticks, score, win in played:
+                    row = {"difficulty": list(difficulty), "pilot": pilot, "seed": seed, "max_ticks": max_ticks,
+                           "storm": storm, "ticks": ticks, "score": score, "win": win}
+                    results[key(difficulty, pilot, seed, max_ticks, storm)] = row
+                    out.write(json.dumps(row) + "\n")
+                out.flush()
+                done += len(played)
+                print(f"\r{done}/{total} episodes, {time.perf_counter() - start:.0f} s", end="", flush=True)
+        except KeyboardInterrupt:
+            pool.shutdown(cancel_futures=True)
+            print(f"\ninterrupted; {done} episodes saved to {results_path}, run again to resume")
+            raise
+    if total:
+        print()
+    return [results[key(difficulty, pilot, seed, max_ticks, storm)]
+            for difficulty, pilot in itertools.product(configs, pilots) for seed in seeds]
+
+def summarize(rows):
+    # Survival time and score distributions per (difficulty, pilot)
+    groups = {}
+    for row in rows:
+        groups.setdefault((tuple(row["difficulty"]), row["pilot"]), []).append(row)
+    summary = []
+    for (difficulty, pilot), group in groups.items():
+        seconds = np.array([row["ticks"] for row in group]) / game.TICK_RATE
+        scores = np.array([row["score"] for row in group])
+        survival = np.percentile(seconds, (10, 50, 90))
+        score = np.percentile(scores, (10, 50, 90))
+        summary.append({"difficulty": game.Difficulty(*difficulty), "pilot": pilot, "episodes": len(group),
+                        "survival_s": survival.tolist(), "score": score.tolist(),
+                        "mean_score": float(scores.mean()),
+                        "win_rate": sum(row["win"] for row in group) / len(group),
+                        "death_rate": sum(not row["win"] and row["ticks"] < row["max_ticks"]
+                                          for row in group) / len(group)})
+    return summary
+
+def report(summary):
+    # One line per setting and pilot; only the settings that vary are shown
+    varying = [field for field in game.Difficulty._fields
+               if len({getattr(entry["difficulty"], field) for entry in summary}) > 1]
+    names = {"spawn_interval": "spawn", "start_speed": "speed", "speed_step": "step", "win_score": "win",
+             "powerup_min": "pu_min", "powerup_max": "pu_max", "asteroid_min_size": "size_min",
+             "asteroid_max_size": "size_max"}
+    header = "".join(f"{names[field]:>9}" for field in varying)
+    lines = [f"{header} {'pilot':<10} {'n':>4} {'survival s p10/p50/p90':>23} "
+             f"{'score p10/p50/p90':>18} {'win':>5} {'died':>5}"]
+    for entry in summary:
+        settings = "".join(f"{getattr(entry['difficulty'], field):>9g}" for field in varying)
+        survival = "/".join(f"{value:.0f}" for value in entry["survival_s"])
+        score = "/".join(f"{value:.0f}" for value in entry["score"])
+        lines.append(f"{settings} {entry['pilot']:<10} {entry['episodes']:>4} {survival:>23} {score:>18} "
+                     f"{entry['win_rate']:>5.0%} {entry['death_rate']:>5.0%}")
+    fixed = [f"{field}={getattr(summary[0]['difficulty'], field):g}"
+             for field in game.Difficulty._fields if field not in varying]
+    if fixed:
+        lines.append("all with " + ", ".join(fixed))
+    return "\n".join(lines)
+
+def main(argv=None):
+    default = game.DEFAULT_DIFFICULTY
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge difficulty sweep")
+    parser.add_argument("--spawn-interval", type=int, nargs="+", default=[30, 40, 50], metavar="TICKS",
+                        help="ticks between asteroid spawns (default 30 40 50)")
+    parser.add_argument("--start-speed", type=float, nargs="+", default=[4, default.start_speed, 6],
+                        metavar="SPEED", help="starting game speed (default 4 5 6)")
+    parser.add_argument("--speed-step", type=float, nargs="+", default=[default.speed_step], metavar="STEP",
+                        help="speed added at each 100 points")
+    parser.add_argument("--win-score", type=int, nargs="+", default=[default.win_score], metavar="SCORE",
+                        help="score that wins the round")
+    parser.add_argument("--powerup-window", nargs="+", default=[f"{default.powerup_min}-{default.powerup_max}"],
+                        metavar="MIN-MAX", help="ticks between shield power-ups")
+    parser.add_argument("--asteroid-sizes", nargs="+",
+                        default=[f"{default.asteroid_min_size}-{default.asteroid_max_size}"],
+                        metavar="MIN-MAX", help="asteroid size range in pixels")
+    parser.add_argument("--pilots", nargs="+", choices=sorted(PILOTS), default=list(PILOTS),
+                        help="pilots to fly each setting (default all)")
+    parser.add_argument("--episodes", type=int, default=EPISODES, help="episodes per setting and pilot")
+    parser.add_argument("--max-ticks", type=int, default=MAX_TICKS, help="ticks before an episode is cut off")
+    parser.add_argument("--storm", type=int, default=0, help="meteor storm debris count")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--results", default=RESULTS_PATH, metavar="PATH",
+                        help=f"episode results to append to and resume from (default {RESULTS_PATH})")
+    parser.add_argument("--report", metavar="PATH", help="also write the report to PATH")
+    args = parser.parse_args(argv)
+    try:
+        configs = grid(args)
+    except (ValueError, argparse.ArgumentTypeError) as e:
+        parser.error(str(e))
+
+    try:
+        rows = run(configs, args.pilots, args.episodes, args.max_ticks, args.storm, args.results, args.workers)
+    except KeyboardInterrupt:
+        return 130
+    text = report(summarize(rows))
+    print(text)
+    if args.report:
+        with open(args.report, "w") as f:
+            f.write(text + "\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
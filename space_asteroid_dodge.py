@@ -3,6 +3,22 @@ import random
 import sys
 import math
 import os
+import argparse
+import itertools
+import struct
+import hashlib
+import logging
+import time
+import csv
+import json
+import queue
+import threading
+import zlib
+from collections import OrderedDict, namedtuple
+
+import numpy as np
+
+log = logging.getLogger("space_asteroid_dodge")
 
 # Initialize pygame
 pygame.init()
@@ -29,31 +45,443 @@ BROWN = (139, 69, 19)
 PURPLE = (128, 0, 128)
 
 # Game variables
-score = 0
-game_speed = 5
-game_over = False
+game_speed = 5  # Starting speed; a running game's speed lives on its Simulation
 win_score = 1000
-high_score = 0
+
+# What makes a round hard, as a Simulation plays it; the defaults are the
+# game's own. Asteroid sizes apply to the shape templates made up front.
+Difficulty = namedtuple("Difficulty", ["spawn_interval", "start_speed", "speed_step", "win_score",
+                                       "powerup_min", "powerup_max", "asteroid_min_size",
+                                       "asteroid_max_size"],
+                        defaults=(40, game_speed, 0.2, win_score, 300, 600, 50, 100))
+DEFAULT_DIFFICULTY = Difficulty()
+
+# Asteroid sprite cache settings
+ASTEROID_ROTATION_STEPS = 36  # Quantized rotation angles rendered per asteroid
+ASTEROID_SPRITE_CACHE_MB = 96  # Memory cap shared by all cached asteroid sprites
+ASTEROID_PRERENDER_MB = 32  # Sprites rendered up front for a new pool; the rest are rendered when first drawn
+USE_ASTEROID_SPRITE_CACHE = True  # False draws every asteroid from scratch each frame
+SHAPE_TEMPLATES_PER_TYPE = 8  # Pre-generated asteroid shapes per meteor type
+COLLISION_ROTATION_STEPS = 36  # Quantized rotations with their own hit mask per asteroid
+GLOW_CACHE_SIZE = 1024  # Most radial glow sprites kept before evicting
+TEXT_CACHE_SIZE = 256  # Most rendered text surfaces kept before evicting
+SHIELD_PULSE_PERIOD = 2 * math.pi / 0.01  # Shield pulse period in ms (sin(ticks * 0.01))
+SHIELD_PULSE_FRAMES = 32  # Pre-rendered shield frames covering one pulse period
+PARTICLE_CAPACITY = 2048  # Explosion and pickup particles alive at once
+THRUSTER_PARTICLE_CAPACITY = 32
+TRAIL_PARTICLE_CAPACITY = 64
+FIELD_TRAIL_CAPACITY = 1024  # Trail particles shared by every asteroid in an AsteroidField
+DIRTY_RECT_RENDERING = False  # Repaint only changed regions instead of the whole screen
+DIRTY_RECT_MAX_FRACTION = 0.5  # Dirty area (fraction of screen) above which we flip instead
+TRAIL_DIRTY_CELL = 64  # Grid cell size (px) asteroid trails are grouped by for dirty rects
+TICK_RATE = 60  # Simulation ticks per second; all game timers count ticks
+MAX_CATCHUP_TICKS = 5  # Most ticks run for one rendered frame before dropping time
+MAX_RENDER_FPS = 60  # Cap on rendered frames per second
+QUALITY_WINDOW = 60  # Frames the quality governor judges the load over
+QUALITY_DROP_LOAD = 0.9  # Drop a tier when p90 frame work exceeds this fraction of the budget
+QUALITY_RAISE_LOAD = 0.5  # Raise a tier when p90 frame work stays under this fraction...
+QUALITY_RAISE_WINDOWS = 3  # ...for this many windows in a row
+QUALITY_PREPARE_MS = 2  # Time per frame spent building the next tier's assets before switching to it
+ASTEROID_RENDERS_PER_FRAME = 2  # Asteroid sprites rendered per frame once a tier change makes them all miss
+SCORE_BOARD_SIZE = 10  # Rounds kept on the leaderboard
+SCORES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "scores.json")  # Next to the game
+CAPTURE_QUEUE_FRAMES = 60  # Captured frames waiting for the writer, about 115 MB at 800x600
+CAPTURE_PNG_LEVEL = 1  # zlib level for captured PNGs; fastest, since the game draws large flat areas
+PROFILE_WINDOW = 300  # Frames the profiler's rolling percentiles cover
+PROFILE_GRAPH_FRAMES = 240  # Frames shown in the profiler overlay's frame-time graph
+METEOR_STORM = 0  # Debris kept in play on top of the asteroids; 0 turns storm mode off
+STORM_DEBRIS = 5000  # Default debris count for storm mode
+STORM_CELL_SIZE = 16  # Broad-phase grid cell size in pixels; at least the largest debris diameter
+STORM_LETHAL_RADIUS = 6  # Debris at least this large destroys an unshielded ship
+STORM_LETHAL_SHARE = 0.001  # Share of new debris that is lethal; 5 pieces in the default storm
+DEBRIS_MAX_RADIUS = 8
+DEBRIS_MIN_RADIUS = 2  # Debris smaller than twice this no longer splits
+DEBRIS_SPLIT_SPEED = 2  # Closing speed in pixels per tick that splits debris
+DEBRIS_SPLIT_SCALE = 0.7  # Radius of each half of a split piece, relative to the piece
+DEBRIS_COLOR = (150, 120, 90)
+STAR_COUNT = 300  # Twinkling background stars
+PARALLAX_LAYERS = 3  # Scrolling star layers under the twinkling ones; 0 for a still background
+PARALLAX_TILE_HEIGHT = SCREEN_HEIGHT  # Height of each layer's wrapping tile, at least the screen's
+PARALLAX_NEBULA_SPEED = 0.05  # Share of the game speed the nebula scrolls at
+PARALLAX_STAR_SPEED = 0.5  # Share of the game speed the nearest star layer scrolls at
+
+# Independent seeded random streams, one per subsystem, so that a change in
+# how much one subsystem draws never shifts another's sequence. Drawing has
+# its own stream and never touches the ones the simulation uses.
+class RandomStreams:
+    NAMES = ("background", "spawn", "shape", "particles", "powerup", "draw", "storm")
+    
+    def __init__(self, seed=None):
+        self.reseed(seed)
+    
+    def reseed(self, seed=None):
+        if seed is None:
+            seed = random.SystemRandom().randrange(2**63)
+        self.seed = seed
+        # Generators are reseeded in place after the first time, so objects
+        # holding on to one keep drawing from the right sequence
+        for index, name in enumerate(self.NAMES):
+            if hasattr(self, name):
+                getattr(self, name).seed(f"{seed}:{name}")
+            else:
+                setattr(self, name, random.Random(f"{seed}:{name}"))
+        # Vectorized particle bursts and storm debris draw from NumPy; purely
+        # cosmetic effects such as trails get their own generator, so the
+        # quality tier can change them without changing the game
+        for offset, name in enumerate(("particles_np", "storm_np", "effects_np")):
+            entropy = [seed, len(self.NAMES) + offset]
+            if hasattr(self, name):
+                getattr(self, name).bit_generator.state = np.random.PCG64(entropy).state
+            else:
+                setattr(self, name, np.random.default_rng(entropy))
+
+# Streams used by anything not owned by a Simulation (background, start screen)
+streams = RandomStreams()
+
+# Pre-rendered radial gradient sprites shared by every glow and particle effect,
+# keyed by (radius, RGB, peak alpha, falloff) where falloff is the radius step
+# between gradient rings
+class GlowSpriteCache:
+    def __init__(self, max_sprites=GLOW_CACHE_SIZE):
+        self.max_sprites = max_sprites
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, radius, rgb, peak_alpha, falloff=1):
+        key = (radius, rgb, peak_alpha, falloff)
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.hits += 1
+            self.sprites.move_to_end(key)
+            return sprite
+        
+        self.misses += 1
+        sprite = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+        # Draw gradient glow
+        for r in range(radius, 0, -falloff):
+            alpha = peak_alpha * (r / radius)
+            pygame.draw.circle(sprite, (rgb[0], rgb[1], rgb[2], alpha), (radius, radius), r)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_sprites:
+            self.sprites.popitem(last=False)
+            self.evictions += 1
+        return sprite
+    
+    def prepare(self, falloff, new_falloff):
+        # Render the sprites cached with one falloff again with another,
+        # yielding after each, ahead of a quality change
+        if new_falloff == falloff:
+            return
+        for radius, rgb, peak_alpha, old in list(self.sprites):
+            if old == falloff and (radius, rgb, peak_alpha, new_falloff) not in self.sprites:
+                self.get(radius, rgb, peak_alpha, new_falloff)
+                yield
+    
+    def blit(self, screen, center, radius, rgb, peak_alpha, falloff=1):
+        if radius <= 0:
+            return None
+        sprite = self.get(radius, rgb, peak_alpha, falloff)
+        return screen.blit(sprite, (center[0] - radius, center[1] - radius))
+    
+    def stats(self):
+        return {"sprites": len(self.sprites), "hits": self.hits,
+                "misses": self.misses, "evictions": self.evictions}
+
+glow_sprites = GlowSpriteCache()
+
+def swap_compact(arrays, count, dead):
+    # Remove the rows at the sorted, unique indices in dead from the first
+    # count rows of each array. Holes below the new count are refilled by the
+    # live rows found beyond it; there are exactly as many of each.
+    new_count = count - len(dead)
+    holes = dead[dead < new_count]
+    live_tail = np.ones(count - new_count, bool)
+    live_tail[dead[dead >= new_count] - new_count] = False
+    movers = np.arange(new_count, count)[live_tail]
+    for array in arrays:
+        array[holes] = array[movers]
+    return new_count
+
+# Particles held as a structure of preallocated arrays with a fixed capacity.
+# Motion and decay are vectorized, and dead particles are removed by swapping
+# live ones from the tail into their slots.
+class ParticleSystem:
+    __slots__ = ("capacity", "decay", "rng", "count", "pos", "vel", "life", "color")
+    
+    def __init__(self, capacity, decay, rng=None):
+        self.capacity = capacity
+        self.decay = decay  # Lifetime lost per frame
+        self.rng = rng if rng is not None else streams.particles_np  # NumPy generator for bursts
+        self.count = 0
+        self.pos = np.zeros((capacity, 2), np.float32)
+        self.vel = np.zeros((capacity, 2), np.float32)
+        self.life = np.zeros(capacity, np.float32)
+        self.color = np.zeros((capacity, 3), np.uint8)
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.count = 0
+    
+    def emit(self, n, x, y, vx, vy, life, color):
+        # Each argument is a scalar or an array of n values; overflow is dropped
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return
+        start, end = self.count, self.count + n
+        self.pos[start:end, 0] = np.broadcast_to(x, (n,)) if np.ndim(x) == 0 else x[:n]
+        self.pos[start:end, 1] = np.broadcast_to(y, (n,)) if np.ndim(y) == 0 else y[:n]
+        self.vel[start:end, 0] = vx if np.ndim(vx) == 0 else vx[:n]
+        self.vel[start:end, 1] = vy if np.ndim(vy) == 0 else vy[:n]
+        self.life[start:end] = life if np.ndim(life) == 0 else life[:n]
+        self.color[start:end] = color if np.ndim(color) == 1 else color[:n]
+        self.count = end
+    
+    def emit_one(self, x, y, vx, vy, life, color):
+        if self.count < self.capacity:
+            i = self.count
+            self.pos[i] = (x, y)
+            self.vel[i] = (vx, vy)
+            self.life[i] = life
+            self.color[i] = color[:3]
+            self.count = i + 1
+    
+    def burst(self, n, x, y, speed, life_range, color, spread=0):
+        # Particles fly out from (x, y) with integer lifetimes in life_range
+        offset_x = self.rng.uniform(-spread, spread, n) if spread else 0
+        offset_y = self.rng.uniform(-spread, spread, n) if spread else 0
+        self.emit(n, x + offset_x, y + offset_y,
+                  self.rng.uniform(-speed, speed, n),
+                  self.rng.uniform(-speed, speed, n),
+                  self.rng.integers(life_range[0], life_range[1] + 1, n),
+                  color)
+    
+    def update(self):
+        n = self.count
+        if n == 0:
+            return
+        self.pos[:n] += self.vel[:n]
+        self.life[:n] -= self.decay
+        dead = np.flatnonzero(self.life[:n] <= 0)
+        if len(dead):
+            self.count = swap_compact((self.pos, self.vel, self.life, self.color), n, dead)
+    
+    def render_positions(self, alpha=1.0):
+        # Motion is linear, so stepping back along the velocity gives the
+        # position between the last two ticks
+        n = self.count
+        if alpha == 1.0:
+            return self.pos[:n]
+        return self.pos[:n] - self.vel[:n] * (1.0 - alpha)
+    
+    def bounds(self, positions, size_scale=1):
+        # Screen area covered by the whole cluster, for dirty-rect tracking
+        n = self.count
+        if n == 0:
+            return None
+        reach = float(self.life[:n].max()) * size_scale + 1
+        low = positions.min(axis=0) - reach
+        high = positions.max(axis=0) + reach
+        return pygame.Rect(int(low[0]), int(low[1]), int(high[0] - low[0]) + 1, int(high[1] - low[1]) + 1)
+    
+    def cell_bounds(self, positions, size_scale, cell_size):
+        # The area covered, as one rect per grid cell that has particles in
+        # it, for particles spread over the screen whose single bounding
+        # rect would cover most of it
+        n = self.count
+        if n == 0:
+            return []
+        reach = (self.life[:n] * size_scale + 1)[:, None]
+        cells = np.floor_divide(positions, cell_size).astype(np.int64)
+        order = np.argsort(cells[:, 0] << 32 | cells[:, 1] & 0xFFFFFFFF)
+        cells = cells[order]
+        starts = np.flatnonzero(np.append(True, (cells[1:] != cells[:-1]).any(axis=1)))
+        low = np.floor(np.minimum.reduceat((positions - reach)[order], starts)).astype(np.int32)
+        high = np.maximum.reduceat((positions + reach)[order], starts).astype(np.int32)
+        return [pygame.Rect(x0, y0, x1 - x0 + 1, y1 - y0 + 1)
+                for (x0, y0), (x1, y1) in zip(low.tolist(), high.tolist())]
+    
+    def draw(self, screen, alpha=1.0):
+        # Solid circles shrinking with lifetime
+        n = self.count
+        positions = self.render_positions(alpha)
+        centers = positions.astype(np.int32).tolist()
+        radii = self.life[:n].astype(np.int32).tolist()
+        colors = self.color[:n].tolist()
+        for center, radius, color in zip(centers, radii, colors):
+            pygame.draw.circle(screen, color, center, radius)
+        return self.bounds(positions)
+    
+    def draw_glow(self, screen, size_scale, peak_alpha=None, alpha_per_life=None, alpha=1.0, cell_size=None):
+        # Radial glow sprites sized by lifetime; alpha is either fixed or
+        # fades with lifetime, rounded so fading particles share sprites.
+        # Returns the bounding rect, or with cell_size a list of them per cell.
+        n = self.count
+        positions = self.render_positions(alpha)
+        centers = positions.astype(np.int32).tolist()
+        lives = self.life[:n].tolist()
+        colors = self.color[:n].tolist()
+        for center, life, color in zip(centers, lives, colors):
+            if alpha_per_life is not None:
+                peak_alpha = min(255, int(alpha_per_life * life) // 5 * 5)
+            glow_sprites.blit(screen, center, int(life * size_scale), tuple(color), peak_alpha)
+        if cell_size is not None:
+            return self.cell_bounds(positions, size_scale, cell_size)
+        return self.bounds(positions, size_scale)
+
+def emit_powerup_burst(system, x, y):
+    # Add particles for power-up collection
+    system.burst(20, x, y, 2, (5, 10), (100, 150, 255))
+
+def emit_shield_hit(system, x, y):
+    # Add explosion particles for an asteroid destroyed by the shield
+    system.burst(20, x, y, 3, (5, 15), (255, 165, 0))
+
+def emit_explosion(system, x, y, meteor_x, meteor_y, meteor_color):
+    # First wave - bright center
+    system.burst(30, x, y, 8, (15, 25), (255, 255, 200))
+    # Second wave - orange/red flames
+    flame_colors = np.zeros((40, 3), np.uint8)
+    flame_colors[:, 0] = 255
+    flame_colors[:, 1] = system.rng.integers(50, 151, 40)
+    system.burst(40, x, y, 6, (10, 20), flame_colors, spread=10)
+    # Third wave - smoke and debris
+    system.burst(30, x, y, 3, (20, 40), (100, 100, 100), spread=15)
+    # Meteor fragments in the meteor's own color
+    system.burst(15, meteor_x, meteor_y, 5, (10, 20), meteor_color[:3])
+
+# The twinkling stars as arrays of position, size and brightness. Stars never
+# move, so the screen pixels each one covers are worked out once; every frame
+# then writes all of their colors into the screen in one go and twinkles them
+# with one vectorized random walk.
+class StarField:
+    def __init__(self):
+        self.x = np.zeros(0, np.int32)
+        self.y = np.zeros(0, np.int32)
+        self.size = np.zeros(0, np.int32)
+        self.brightness = np.zeros(0, np.int32)
+        self.layouts = {}  # (screen size, pitch in pixels, star count) -> pixel layout
+        self.rects = []  # Screen area of each star, for dirty-rect tracking
+        self.rects_size = None
+    
+    def __len__(self):
+        return len(self.x)
+    
+    def generate(self, count, width, height, rng):
+        # Drawn star by star in the order the old list of stars used
+        self.x, self.y, self.size, self.brightness = (np.zeros(count, np.int32) for _ in range(4))
+        for i in range(count):
+            self.x[i] = rng.randint(0, width)
+            self.y[i] = rng.randint(0, height)
+            self.size[i] = rng.randint(1, 3)
+            self.brightness[i] = rng.randint(100, 255)
+        self.layouts.clear()
+        self.rects_size = None
+    
+    @staticmethod
+    def circle_offsets(radius):
+        # The pixels pygame.draw.circle fills for a radius, around the center
+        surface = pygame.Surface((radius * 2 + 3, radius * 2 + 3))
+        pygame.draw.circle(surface, WHITE, (radius + 1, radius + 1), radius)
+        offsets = np.argwhere(pygame.surfarray.array2d(surface) != 0) - (radius + 1)
+        return offsets[:, 0], offsets[:, 1]
+    
+    def layout(self, size, pitch, count):
+        # Where the first count stars' pixels are in the screen's buffer, in
+        # address order with each pixel once (the later star wins overlaps,
+        # as when drawn one by one), and the star each pixel takes its color from
+        width, height = size
+        pixel_x, pixel_y, pixel_star = [], [], []
+        for radius in np.unique(self.size[:count]).tolist():
+            dx, dy = self.circle_offsets(radius)
+            members = np.flatnonzero(self.size[:count] == radius)
+            pixel_x.append((self.x[members, None] + dx).ravel())
+            pixel_y.append((self.y[members, None] + dy).ravel())
+            pixel_star.append(np.repeat(members, len(dx)))
+        if not pixel_star:
+            return np.zeros(0, np.intp), np.zeros(0, np.intp)
+        pixel_x, pixel_y, pixel_star = (np.concatenate(column) for column in (pixel_x, pixel_y, pixel_star))
+        inside = (pixel_x >= 0) & (pixel_x < width) & (pixel_y >= 0) & (pixel_y < height)
+        address = (pixel_y[inside] * pitch + pixel_x[inside]).astype(np.intp)
+        pixel_star = pixel_star[inside]
+        order = np.lexsort((pixel_star, address))
+        address, pixel_star = address[order], pixel_star[order]
+        last = np.append(address[1:] != address[:-1], True)
+        return address[last], pixel_star[last]
+    
+    def star_rects(self, size):
+        # The area pygame.draw.circle would report for each star
+        bounds = {}
+        for radius in np.unique(self.size).tolist():
+            dx, dy = self.circle_offsets(radius)
+            bounds[radius] = (int(dx.min()), int(dy.min()), int(dx.max() - dx.min()) + 1, int(dy.max() - dy.min()) + 1)
+        screen_rect = pygame.Rect((0, 0), size)
+        rects = []
+        for x, y, radius in zip(self.x.tolist(), self.y.tolist(), self.size.tolist()):
+            left, top, width, height = bounds[radius]
+            rects.append(pygame.Rect(x + left, y + top, width, height).clip(screen_rect))
+        return rects
+    
+    def draw(self, screen, count=None, rng=None):
+        n = len(self) if count is None else min(count, len(self))
+        grey = self.brightness[:n]
+        size = screen.get_size()
+        if size != self.rects_size:
+            self.rects = self.star_rects(size)
+            self.rects_size = size
+        bytesize = screen.get_bytesize()
+        if bytesize in (2, 4):
+            # Map the greys to the screen's pixel format and write them
+            # straight into its pixels
+            key = (size, screen.get_pitch() // bytesize, n)
+            if key not in self.layouts:
+                self.layouts[key] = self.layout(*key)
+            address, pixel_star = self.layouts[key]
+            shifts, losses = screen.get_shifts(), screen.get_losses()
+            grey32 = grey.astype(np.uint32)
+            mapped = np.full(n, screen.get_masks()[3], np.uint32)  # Opaque, if the screen has alpha
+            for channel in range(3):
+                mapped |= (grey32 >> losses[channel]) << shifts[channel]
+            buffer = screen.get_buffer()
+            pixels = np.frombuffer(buffer, np.uint32 if bytesize == 4 else np.uint16)
+            pixels[address] = mapped[pixel_star]
+            del pixels, buffer  # Unlock the screen
+        else:
+            for x, y, radius, brightness in zip(self.x[:n].tolist(), self.y[:n].tolist(),
+                                                self.size[:n].tolist(), grey.tolist()):
+                pygame.draw.circle(screen, (brightness, brightness, brightness), (x, y), radius)
+        
+        # Make stars twinkle
+        rng = rng if rng is not None else streams.effects_np
+        grey += rng.integers(-10, 11, n, dtype=np.int32)
+        np.clip(grey, 100, 255, out=grey)
+        return self.rects if n == len(self.rects) else self.rects[:n]
 
 # Create a nebula effect for background
 nebula = []
-for _ in range(20):
-    x = random.randint(0, SCREEN_WIDTH)
-    y = random.randint(0, SCREEN_HEIGHT)
-    size = random.randint(100, 300)
-    color_choice = random.choice([(PURPLE[0]//4, 0, PURPLE[2]//4), (0, 0, BLUE[2]//3)])
-    nebula.append([x, y, size, color_choice])
 
 # Stars for background
-stars = []
-for _ in range(300):  # More stars
-    x = random.randint(0, SCREEN_WIDTH)
-    y = random.randint(0, SCREEN_HEIGHT)
-    size = random.randint(1, 3)
-    brightness = random.randint(100, 255)
-    stars.append([x, y, size, brightness])
+stars = StarField()
+
+def generate_background(width=SCREEN_WIDTH, height=SCREEN_HEIGHT):
+    # Reseed the nebula and stars in place so existing references stay valid
+    nebula.clear()
+    for _ in range(20):
+        x = streams.background.randint(0, width)
+        y = streams.background.randint(0, height)
+        size = streams.background.randint(100, 300)
+        color_choice = streams.background.choice([(PURPLE[0]//4, 0, PURPLE[2]//4), (0, 0, BLUE[2]//3)])
+        nebula.append([x, y, size, color_choice])
+    
+    stars.generate(STAR_COUNT, width, height, streams.background)
+    background.invalidate()
 
 class SpaceObject:
+    __slots__ = ("x", "y", "width", "height", "color", "speed", "rect", "prev_x", "prev_y")
+    
     def __init__(self, x, y, width, height, color, speed):
         self.x = x
         self.y = y
@@ -62,8 +490,21 @@ class SpaceObject:
         self.color = color
         self.speed = speed
         self.rect = pygame.Rect(x - width // 2, y - height // 2, width, height)
+        self.prev_x = x
+        self.prev_y = y
+    
+    def save_position(self):
+        # Remember where this tick started, for render interpolation
+        self.prev_x = self.x
+        self.prev_y = self.y
+    
+    def render_position(self, alpha):
+        # Position between the previous and the current tick
+        return (self.prev_x + (self.x - self.prev_x) * alpha,
+                self.prev_y + (self.y - self.prev_y) * alpha)
     
     def update(self):
+        self.save_position()
         self.y += self.speed
         self.rect.center = (self.x, self.y)
     
@@ -71,18 +512,42 @@ class SpaceObject:
         pygame.draw.rect(screen, self.color, self.rect)
 
 class Astronaut(SpaceObject):
-    def __init__(self):
+    __slots__ = ("rng", "flame_size", "shield_active", "shield_timer", "shield_radius",
+                 "animation_frame", "animation_speed", "thruster_particles", "exploding",
+                 "explosion_start_time", "explosion_duration", "radius")
+    
+    # Pre-rendered ship frames shared by every Astronaut
+    body_frames = None  # One per animated light position
+    flame_frames = None  # One per flame_size
+    body_mask = None  # Hit mask of the hull, the same in every body frame
+    shield_frames = {}  # (shield_radius, ring step) -> one pulse period of shield frames
+    
+    def __init__(self, rng=None, particle_capacity=THRUSTER_PARTICLE_CAPACITY):
         super().__init__(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, 50, 70, WHITE, 0)
+        self.rng = rng if rng is not None else streams
+        if Astronaut.body_frames is None:
+            Astronaut.build_frames(self.width, self.height)
+        self.shield_radius = 60
+        self.animation_speed = 0.2
+        self.thruster_particles = ParticleSystem(particle_capacity, 0.5, self.rng.particles_np)
+        self.explosion_duration = 1000  # 1 second in milliseconds
+        self.radius = math.hypot(self.width, self.height) / 2  # Bounding circle
+        if (self.shield_radius, quality.tier.shield_ring_step) not in Astronaut.shield_frames:
+            Astronaut.build_shield_frames(self.shield_radius, quality.tier.shield_ring_step)
+        self.reset()
+
+    def reset(self):
+        # Back to the start of a round, keeping the particle buffers
+        self.x = self.prev_x = SCREEN_WIDTH // 2
+        self.y = self.prev_y = SCREEN_HEIGHT - 100
+        self.rect.center = (self.x, self.y)
         self.flame_size = 0
         self.shield_active = False
         self.shield_timer = 0
-        self.shield_radius = 60
         self.animation_frame = 0
-        self.animation_speed = 0.2
-        self.thruster_particles = []
+        self.thruster_particles.clear()
         self.exploding = False
         self.explosion_start_time = 0
-        self.explosion_duration = 1000  # 1 second in milliseconds
     
     def move_left(self):
         self.x = max(PLAYER_X_MIN, self.x - 20)
@@ -106,31 +571,34 @@ class Astronaut(SpaceObject):
             if self.shield_timer <= 0:
                 self.shield_active = False
         
-        # Update thruster particles
-        for particle in self.thruster_particles[:]:
-            particle[0] += particle[2]  # x position
-            particle[1] += particle[3]  # y position
-            particle[4] -= 0.5  # lifetime
-            if particle[4] <= 0:
-                self.thruster_particles.remove(particle)
+        # Update thruster particles; without a buffer for them (no effects)
+        # there is nothing to update or draw for
+        if not self.thruster_particles.capacity:
+            return
+        self.thruster_particles.update()
         
         # Add new thruster particles
-        if random.random() < 0.4:
-            self.thruster_particles.append([
-                self.x + random.uniform(-10, 10),
-                self.y + self.height // 2 + random.uniform(0, 10),
-                random.uniform(-0.5, 0.5),
-                random.uniform(2, 4),
-                random.uniform(5, 10),
-                (255, random.randint(100, 200), 0)
-            ])
+        if self.rng.particles.random() < quality.tier.thruster_chance:
+            self.thruster_particles.emit_one(
+                self.x + self.rng.particles.uniform(-10, 10),
+                self.y + self.height // 2 + self.rng.particles.uniform(0, 10),
+                self.rng.particles.uniform(-0.5, 0.5),
+                self.rng.particles.uniform(2, 4),
+                self.rng.particles.uniform(5, 10),
+                (255, self.rng.particles.randint(100, 200), 0)
+            )
     
-    def draw(self, screen):
+    def draw(self, screen, now=None, alpha=1.0):
+        # now is the time on the clock that drives the game, in milliseconds,
+        # and alpha how far rendering is between the last two ticks
+        if now is None:
+            now = pygame.time.get_ticks()
+        x, y = self.render_position(alpha)
+        
         # If exploding, don't draw the normal astronaut
         if self.exploding:
             # Check if we should still show the explosion or if it's time for game over
-            current_time = pygame.time.get_ticks()
-            explosion_elapsed = current_time - self.explosion_start_time
+            explosion_elapsed = now - self.explosion_start_time
             
             # Draw explosion effect based on time elapsed
             if explosion_elapsed < self.explosion_duration:
@@ -141,9 +609,9 @@ class Astronaut(SpaceObject):
                 for i in range(10):
                     # Calculate fragment positions with increasing spread over time
                     spread = explosion_progress * 30
-                    fragment_x = self.x + random.uniform(-spread, spread)
-                    fragment_y = self.y + random.uniform(-spread, spread)
-                    fragment_size = random.randint(3, 8)
+                    fragment_x = x + self.rng.draw.uniform(-spread, spread)
+                    fragment_y = y + self.rng.draw.uniform(-spread, spread)
+                    fragment_size = self.rng.draw.randint(3, 8)
                     
                     # Determine fragment color (parts of the ship)
                     if i % 3 == 0:
@@ -160,155 +628,211 @@ class Astronaut(SpaceObject):
                 # Draw fire at the center of explosion
                 fire_size = 40 - int(explosion_progress * 20)
                 if fire_size > 0:
-                    pygame.draw.circle(screen, ORANGE, (int(self.x), int(self.y)), fire_size)
-                    pygame.draw.circle(screen, YELLOW, (int(self.x), int(self.y)), fire_size // 2)
+                    pygame.draw.circle(screen, ORANGE, (int(x), int(y)), fire_size)
+                    pygame.draw.circle(screen, YELLOW, (int(x), int(y)), fire_size // 2)
+                
+                # Fragments and fire stay within this box
+                explosion_rect = pygame.Rect(0, 0, 100, 100)
+                explosion_rect.center = (int(x), int(y))
+                return explosion_rect
             
-            return  # Skip drawing the normal astronaut
+            return None  # Skip drawing the normal astronaut
         
         # Draw thruster particles
-        for particle in self.thruster_particles:
-            # Create a surface for the glow
-            glow_size = int(particle[4] * 2)
-            glow_surf = pygame.Surface((glow_size*2, glow_size*2), pygame.SRCALPHA)
-            
-            # Draw gradient glow
-            for radius in range(glow_size, 0, -1):
-                alpha = 150 * (radius / glow_size)
-                color = (particle[5][0], particle[5][1], 0, alpha)
-                pygame.draw.circle(glow_surf, color, (glow_size, glow_size), radius)
-            
-            # Blit the glow
-            screen.blit(glow_surf, (particle[0] - glow_size, particle[1] - glow_size))
+        rects = []
+        thruster_rect = self.thruster_particles.draw_glow(screen, 2, peak_alpha=150, alpha=alpha)
+        if thruster_rect is not None:
+            rects.append(thruster_rect)
+        
+        # Draw main rocket flames with their glow
+        flame_surf = Astronaut.flame_frames[self.flame_size]
+        rects.append(screen.blit(flame_surf, (x - 25, y + self.height // 2 - 15)))
+        
+        # Draw shield if active
+        if self.shield_active:
+            # Pick the pulse frame for the current phase of the animation
+            ring_step = quality.tier.shield_ring_step
+            frames = Astronaut.shield_frames.get((self.shield_radius, ring_step))
+            if frames is None:
+                frames = Astronaut.build_shield_frames(self.shield_radius, ring_step)
+            phase = (now % SHIELD_PULSE_PERIOD) / SHIELD_PULSE_PERIOD
+            shield_surf = frames[int(phase * len(frames)) % len(frames)]
+            half = shield_surf.get_width() // 2
+            rects.append(screen.blit(shield_surf, (x - half, y - half)))
+        
+        # Blit the astronaut body with its lights at the current position
+        body_rect = screen.blit(Astronaut.body_frames[int(self.animation_frame)], (x - self.width // 2, y - self.height // 2))
+        return body_rect.unionall(rects)
+    
+    @classmethod
+    def build_frames(cls, width, height):
+        cls.body_frames = [cls.render_body(width, height, light_pos) for light_pos in range(4)]
+        cls.flame_frames = [cls.render_flame(flame_size) for flame_size in range(10)]
+        cls.body_mask = pygame.mask.from_surface(cls.body_frames[0])
+        if pygame.display.get_surface() is not None:
+            cls.body_frames = [frame.convert_alpha() for frame in cls.body_frames]
+            cls.flame_frames = [frame.convert_alpha() for frame in cls.flame_frames]
+    
+    @classmethod
+    def build_shield_frames(cls, shield_radius, ring_step=2):
+        for _ in cls.shield_frame_builder(shield_radius, ring_step):
+            pass
+        return cls.shield_frames[(shield_radius, ring_step)]
+    
+    @classmethod
+    def shield_frame_builder(cls, shield_radius, ring_step):
+        # Renders the flipbook one frame per step and stores it when complete
+        frames = []
+        for i in range(SHIELD_PULSE_FRAMES):
+            ticks = i * SHIELD_PULSE_PERIOD / SHIELD_PULSE_FRAMES
+            frame = cls.render_shield(shield_radius, ticks, ring_step)
+            if pygame.display.get_surface() is not None:
+                frame = frame.convert_alpha()
+            frames.append(frame)
+            yield
+        cls.shield_frames[(shield_radius, ring_step)] = frames
+    
+    @classmethod
+    def prepare_shield_frames(cls, ring_step):
+        # Flipbooks at another ring step for every shield size in use, ahead
+        # of a quality change
+        for radius in {radius for radius, _ in cls.shield_frames}:
+            if (radius, ring_step) not in cls.shield_frames:
+                yield from cls.shield_frame_builder(radius, ring_step)
+    
+    @staticmethod
+    def render_shield(shield_radius, ticks, ring_step=2):
+        # Frames share one size so they can be centered on the ship
+        half = shield_radius + 5 + 10
+        shield_frame = pygame.Surface((half*2, half*2), pygame.SRCALPHA)
+        
+        # Create pulsating effect
+        pulse = math.sin(ticks * 0.01) * 5 + shield_radius
+        
+        # Draw outer shield glow
+        for radius in range(int(pulse) + 10, int(pulse) - 10, -ring_step):
+            if radius <= 0:
+                continue
+            alpha = 10 + 40 * ((radius - (pulse - 10)) / 20)
+            shield_surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+            shield_color = (100, 150, 255, alpha)
+            pygame.draw.circle(shield_surf, shield_color, (radius, radius), radius)
+            shield_frame.blit(shield_surf, (half - radius, half - radius))
+        
+        # Draw shield hexagon pattern
+        shield_surf = pygame.Surface((int(pulse)*2, int(pulse)*2), pygame.SRCALPHA)
+        for i in range(0, 360, 60):  # Draw 6 segments
+            angle1 = math.radians(i)
+            angle2 = math.radians(i + 60)
+            x1 = int(pulse + pulse * 0.9 * math.cos(angle1))
+            y1 = int(pulse + pulse * 0.9 * math.sin(angle1))
+            x2 = int(pulse + pulse * 0.9 * math.cos(angle2))
+            y2 = int(pulse + pulse * 0.9 * math.sin(angle2))
+            pygame.draw.line(shield_surf, (200, 220, 255, 100), (x1, y1), (x2, y2), 2)
         
-        # Draw main rocket flames
-        flame_height = 25 + self.flame_size
+        # Draw inner shield
+        pygame.draw.circle(shield_surf, (100, 150, 255, 30), (int(pulse), int(pulse)), int(pulse * 0.7))
+        
+        shield_frame.blit(shield_surf, (half - int(pulse), half - int(pulse)))
+        return shield_frame
+    
+    @staticmethod
+    def render_flame(flame_size):
+        flame_height = 25 + flame_size
         flame_width_base = 20
-        flame_points = [
-            (self.x - flame_width_base//2, self.y + self.height // 2),
-            (self.x, self.y + self.height // 2 + flame_height),
-            (self.x + flame_width_base//2, self.y + self.height // 2)
-        ]
         
         # Create a surface for the flame glow
-        glow_surf = pygame.Surface((flame_width_base + 30, flame_height + 30), pygame.SRCALPHA)
+        flame_surf = pygame.Surface((flame_width_base + 30, flame_height + 30), pygame.SRCALPHA)
         
         # Draw gradient flame glow
         flame_center = (flame_width_base//2 + 15, 15)
         for radius in range(flame_height, 0, -5):
             alpha = 100 * (radius / flame_height)
             color = (255, 150, 50, alpha)
-            pygame.draw.circle(glow_surf, color, flame_center, radius)
-        
-        # Blit the flame glow
-        screen.blit(glow_surf, (self.x - flame_width_base//2 - 15, self.y + self.height // 2 - 15))
+            pygame.draw.circle(flame_surf, color, flame_center, radius)
         
         # Draw the actual flames
-        pygame.draw.polygon(screen, ORANGE, flame_points)
+        flame_points = [
+            (15, 15),
+            (flame_width_base//2 + 15, 15 + flame_height),
+            (flame_width_base + 15, 15)
+        ]
+        pygame.draw.polygon(flame_surf, ORANGE, flame_points)
         
         # Inner flame
         inner_flame_points = [
-            (self.x - flame_width_base//4, self.y + self.height // 2 + 5),
-            (self.x, self.y + self.height // 2 + flame_height - 10),
-            (self.x + flame_width_base//4, self.y + self.height // 2 + 5)
+            (flame_width_base//4 + 15, 20),
+            (flame_width_base//2 + 15, 15 + flame_height - 10),
+            (flame_width_base*3//4 + 15, 20)
         ]
-        pygame.draw.polygon(screen, YELLOW, inner_flame_points)
-        
-        # Draw shield if active
-        if self.shield_active:
-            # Create pulsating effect
-            pulse = math.sin(pygame.time.get_ticks() * 0.01) * 5 + self.shield_radius
-            
-            # Draw outer shield glow
-            for radius in range(int(pulse) + 10, int(pulse) - 10, -2):
-                if radius <= 0:
-                    continue
-                alpha = 10 + 40 * ((radius - (pulse - 10)) / 20)
-                shield_surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-                shield_color = (100, 150, 255, alpha)
-                pygame.draw.circle(shield_surf, shield_color, (radius, radius), radius)
-                screen.blit(shield_surf, (self.x - radius, self.y - radius))
-            
-            # Draw shield hexagon pattern
-            shield_surf = pygame.Surface((int(pulse)*2, int(pulse)*2), pygame.SRCALPHA)
-            for i in range(0, 360, 60):  # Draw 6 segments
-                angle1 = math.radians(i)
-                angle2 = math.radians(i + 60)
-                x1 = int(pulse + pulse * 0.9 * math.cos(angle1))
-                y1 = int(pulse + pulse * 0.9 * math.sin(angle1))
-                x2 = int(pulse + pulse * 0.9 * math.cos(angle2))
-                y2 = int(pulse + pulse * 0.9 * math.sin(angle2))
-                pygame.draw.line(shield_surf, (200, 220, 255, 100), (x1, y1), (x2, y2), 2)
-            
-            # Draw inner shield
-            pygame.draw.circle(shield_surf, (100, 150, 255, 30), (int(pulse), int(pulse)), int(pulse * 0.7))
-            
-            screen.blit(shield_surf, (self.x - int(pulse), self.y - int(pulse)))
-        
+        pygame.draw.polygon(flame_surf, YELLOW, inner_flame_points)
+        return flame_surf
+    
+    @staticmethod
+    def render_body(width, height, light_pos):
         # Draw astronaut body (Rafale jet-inspired design)
         # Main body
-        body_surf = pygame.Surface((self.width, self.height), pygame.SRCALPHA)
+        body_surf = pygame.Surface((width, height), pygame.SRCALPHA)
         
         # Draw sleek body shape
         body_points = [
             (5, 15),  # Top left
-            (self.width - 5, 15),  # Top right
-            (self.width - 2, self.height - 20),  # Bottom right
-            (self.width//2 + 10, self.height),  # Bottom middle right
-            (self.width//2, self.height - 5),  # Bottom middle
-            (self.width//2 - 10, self.height),  # Bottom middle left
-            (2, self.height - 20)  # Bottom left
+            (width - 5, 15),  # Top right
+            (width - 2, height - 20),  # Bottom right
+            (width//2 + 10, height),  # Bottom middle right
+            (width//2, height - 5),  # Bottom middle
+            (width//2 - 10, height),  # Bottom middle left
+            (2, height - 20)  # Bottom left
         ]
         pygame.draw.polygon(body_surf, SILVER, body_points)
         
         # Add metallic shading
         highlight_points = [
             (8, 18),
-            (self.width - 8, 18),
-            (self.width - 5, self.height//2),
-            (8, self.height//2)
+            (width - 8, 18),
+            (width - 5, height//2),
+            (8, height//2)
         ]
         pygame.draw.polygon(body_surf, WHITE, highlight_points)
         
         # Add cockpit (helmet)
-        cockpit_rect = pygame.Rect(self.width//2 - 12, 5, 24, 20)
+        cockpit_rect = pygame.Rect(width//2 - 12, 5, 24, 20)
         pygame.draw.ellipse(body_surf, LIGHT_BLUE, cockpit_rect)
         
         # Add cockpit reflection
-        reflection_rect = pygame.Rect(self.width//2 - 8, 8, 6, 4)
+        reflection_rect = pygame.Rect(width//2 - 8, 8, 6, 4)
         pygame.draw.ellipse(body_surf, WHITE, reflection_rect)
         
         # Add wing details
-        wing_y = self.height - 30
+        wing_y = height - 30
         # Left wing
         pygame.draw.polygon(body_surf, GRAY, [
             (0, wing_y),
             (2, wing_y),
-            (5, self.height - 15),
-            (0, self.height - 20)
+            (5, height - 15),
+            (0, height - 20)
         ])
         # Right wing
         pygame.draw.polygon(body_surf, GRAY, [
-            (self.width, wing_y),
-            (self.width - 2, wing_y),
-            (self.width - 5, self.height - 15),
-            (self.width, self.height - 20)
+            (width, wing_y),
+            (width - 2, wing_y),
+            (width - 5, height - 15),
+            (width, height - 20)
         ])
         
         # Add engine details
-        pygame.draw.rect(body_surf, DARK_BLUE, (self.width//2 - 8, self.height - 25, 16, 20), border_radius=3)
-        pygame.draw.rect(body_surf, BLACK, (self.width//2 - 6, self.height - 15, 12, 10), border_radius=2)
+        pygame.draw.rect(body_surf, DARK_BLUE, (width//2 - 8, height - 25, 16, 20), border_radius=3)
+        pygame.draw.rect(body_surf, BLACK, (width//2 - 6, height - 15, 12, 10), border_radius=2)
         
         # Add decorative lines
-        pygame.draw.line(body_surf, GRAY, (self.width//2, 25), (self.width//2, self.height - 25), 1)
-        pygame.draw.line(body_surf, GRAY, (10, self.height//2), (self.width - 10, self.height//2), 1)
+        pygame.draw.line(body_surf, GRAY, (width//2, 25), (width//2, height - 25), 1)
+        pygame.draw.line(body_surf, GRAY, (10, height//2), (width - 10, height//2), 1)
         
         # Add animated lights
-        light_pos = int(self.animation_frame)
         pygame.draw.circle(body_surf, RED, (5, 30 + light_pos), 2)
-        pygame.draw.circle(body_surf, GREEN, (self.width - 5, 30 + light_pos), 2)
+        pygame.draw.circle(body_surf, GREEN, (width - 5, 30 + light_pos), 2)
         
-        # Blit the astronaut body
-        screen.blit(body_surf, (self.rect.left, self.rect.top))
+        return body_surf
 
 # Define meteor colors
 METEOR_COLORS = [
@@ -321,54 +845,59 @@ METEOR_COLORS = [
     (80, 70, 60)      # Very dark brown
 ]
 
-class Asteroid(SpaceObject):
-    def __init__(self, x, y):
-        # Randomly choose between meteor types
-        self.meteor_type = random.choice(["stony", "iron", "stony-iron"])
-        size = random.randint(50, 100)  # Larger size for more detail
+METEOR_TYPES = ("stony", "iron", "stony-iron")
+
+# Heated trail and glow colors an asteroid picks from when it spawns
+TRAIL_COLORS = tuple((255, green, 0, 150) for green in range(100, 201))  # Orange-red with alpha
+GLOW_COLORS = (
+    (255, 100, 0, 40),  # Orange glow
+    (255, 50, 0, 40),   # Red-orange glow
+    (255, 200, 0, 30)   # Yellow-orange glow
+)
+
+# An asteroid's geometry and surface texture. Generating one takes hundreds
+# of random draws, so pooled asteroids share a set of shapes made up front.
+class AsteroidShape:
+    __slots__ = ("key", "meteor_type", "width", "height", "color", "color_variation", "rng",
+                 "masks", "points", "crater_positions", "texture_noise", "radius")
+    
+    def __init__(self, meteor_type, size, color, color_variation, rng):
+        self.key = next(_sprite_keys)  # Sprites and hit masks are cached per shape
+        self.meteor_type = meteor_type
+        self.width = size
+        self.height = size
+        self.color = color
+        self.color_variation = color_variation
+        self.rng = rng
+        self.masks = {}  # Quantized rotation -> (mask, offset from center)
+        self.generate()
+    
+    @classmethod
+    def random(cls, meteor_type, rng, stream, sizes=(50, 100)):
+        size = stream.randint(*sizes)  # Larger size for more detail
         
         # Set base color based on meteor type
-        if self.meteor_type == "stony":
-            base_color = random.choice(METEOR_COLORS[:3])  # Browns
-        elif self.meteor_type == "iron":
-            base_color = random.choice(METEOR_COLORS[3:5])  # Grays
+        if meteor_type == "stony":
+            base_color = stream.choice(METEOR_COLORS[:3])  # Browns
+        elif meteor_type == "iron":
+            base_color = stream.choice(METEOR_COLORS[3:5])  # Grays
         else:  # stony-iron
-            base_color = random.choice(METEOR_COLORS[5:])  # Reddish browns
-            
-        super().__init__(x, y, size, size, base_color, game_speed)
-        self.rotation = random.randint(0, 360)
-        self.rotation_speed = random.uniform(-2, 2)
-        self.points = []
-        self.crater_positions = []
-        self.color_variation = random.randint(-20, 20)
-        self.texture_noise = []
-        
-        # Burning trail effect for entering atmosphere
-        self.trail_particles = []
-        self.trail_color = (255, random.randint(100, 200), 0, 150)  # Orange-red with alpha
-        
-        # Glowing effect for heated meteors
-        self.glow_color = random.choice([
-            (255, 100, 0, 40),  # Orange glow
-            (255, 50, 0, 40),   # Red-orange glow
-            (255, 200, 0, 30)   # Yellow-orange glow
-        ])
-        self.has_glow = random.random() < 0.4  # 40% chance of having a glow
-        self.generate_shape()
+            base_color = stream.choice(METEOR_COLORS[5:])  # Reddish browns
+        return cls(meteor_type, size, base_color, stream.randint(-20, 20), rng)
     
-    def generate_shape(self):
+    def generate(self):
         # Shape varies by meteor type
         if self.meteor_type == "stony":
             # Stony meteors are more irregular with many bumps
-            num_points = random.randint(14, 20)
+            num_points = self.rng.shape.randint(14, 20)
             irregularity = 0.4  # Higher irregularity
         elif self.meteor_type == "iron":
             # Iron meteors are smoother with fewer points
-            num_points = random.randint(8, 12)
+            num_points = self.rng.shape.randint(8, 12)
             irregularity = 0.2  # Lower irregularity
         else:  # stony-iron
             # Mix of both characteristics
-            num_points = random.randint(10, 16)
+            num_points = self.rng.shape.randint(10, 16)
             irregularity = 0.3  # Medium irregularity
         
         self.points = []
@@ -377,7 +906,7 @@ class Asteroid(SpaceObject):
         for i in range(num_points):
             angle = 2 * math.pi * i / num_points
             # Variation based on meteor type
-            distance = self.width // 2 * random.uniform(1.0 - irregularity, 1.0 + irregularity)
+            distance = self.width // 2 * self.rng.shape.uniform(1.0 - irregularity, 1.0 + irregularity)
             x = int(math.cos(angle) * distance)
             y = int(math.sin(angle) * distance)
             self.points.append((x, y))
@@ -386,13 +915,13 @@ class Asteroid(SpaceObject):
         bump_chance = 0.4 if self.meteor_type == "stony" else 0.2 if self.meteor_type == "iron" else 0.3
         extra_points = []
         for i in range(0, len(self.points)-1):
-            if random.random() < bump_chance:
+            if self.rng.shape.random() < bump_chance:
                 x1, y1 = self.points[i]
                 x2, y2 = self.points[i+1]
                 mid_x = (x1 + x2) // 2
                 mid_y = (y1 + y2) // 2
                 # Add random displacement
-                bump_size = random.uniform(0.1, 0.3) * self.width // 2
+                bump_size = self.rng.shape.uniform(0.1, 0.3) * self.width // 2
                 angle = math.atan2(y2 - y1, x2 - x1) + math.pi/2
                 mid_x += int(math.cos(angle) * bump_size)
                 mid_y += int(math.sin(angle) * bump_size)
@@ -404,43 +933,46 @@ class Asteroid(SpaceObject):
             self.points.insert(idx + offset, point)
             offset += 1
         
+        # Bounding circle of the hull, for a cheap collision pre-check
+        self.radius = max(math.hypot(x, y) for x, y in self.points) + 2
+        
         # Pre-generate crater positions with more variety
         # Stony meteors have more craters, iron have fewer
         if self.meteor_type == "stony":
-            num_craters = random.randint(5, 10)
+            num_craters = self.rng.shape.randint(5, 10)
         elif self.meteor_type == "iron":
-            num_craters = random.randint(2, 5)
+            num_craters = self.rng.shape.randint(2, 5)
         else:  # stony-iron
-            num_craters = random.randint(3, 7)
+            num_craters = self.rng.shape.randint(3, 7)
             
         self.crater_positions = []
         for _ in range(num_craters):
-            crater_x = random.randint(-self.width//3, self.width//3)
-            crater_y = random.randint(-self.height//3, self.height//3)
-            crater_size = random.randint(5, 15)
-            crater_depth = random.uniform(0.6, 1.0)  # Depth factor for 3D effect
+            crater_x = self.rng.shape.randint(-self.width//3, self.width//3)
+            crater_y = self.rng.shape.randint(-self.height//3, self.height//3)
+            crater_size = self.rng.shape.randint(5, 15)
+            crater_depth = self.rng.shape.uniform(0.6, 1.0)  # Depth factor for 3D effect
             
             # Crater color based on meteor type
             if self.meteor_type == "stony":
                 # Lighter craters for stony meteors
                 crater_color = (
-                    min(255, max(0, self.color[0] + random.randint(10, 30))),
-                    min(255, max(0, self.color[1] + random.randint(10, 30))),
-                    min(255, max(0, self.color[2] + random.randint(10, 30)))
+                    min(255, max(0, self.color[0] + self.rng.shape.randint(10, 30))),
+                    min(255, max(0, self.color[1] + self.rng.shape.randint(10, 30))),
+                    min(255, max(0, self.color[2] + self.rng.shape.randint(10, 30)))
                 )
             elif self.meteor_type == "iron":
                 # Darker, metallic craters for iron meteors
                 crater_color = (
-                    min(255, max(0, self.color[0] - random.randint(10, 30))),
-                    min(255, max(0, self.color[1] - random.randint(10, 30))),
-                    min(255, max(0, self.color[2] - random.randint(10, 30)))
+                    min(255, max(0, self.color[0] - self.rng.shape.randint(10, 30))),
+                    min(255, max(0, self.color[1] - self.rng.shape.randint(10, 30))),
+                    min(255, max(0, self.color[2] - self.rng.shape.randint(10, 30)))
                 )
             else:  # stony-iron
                 # Mixed coloration
                 crater_color = (
-                    min(255, max(0, self.color[0] + random.randint(-20, 20))),
-                    min(255, max(0, self.color[1] + random.randint(-20, 20))),
-                    min(255, max(0, self.color[2] + random.randint(-20, 20)))
+                    min(255, max(0, self.color[0] + self.rng.shape.randint(-20, 20))),
+                    min(255, max(0, self.color[1] + self.rng.shape.randint(-20, 20))),
+                    min(255, max(0, self.color[2] + self.rng.shape.randint(-20, 20)))
                 )
                 
             self.crater_positions.append((crater_x, crater_y, crater_size, crater_color, crater_depth))
@@ -451,28 +983,28 @@ class Asteroid(SpaceObject):
         # Different texture patterns based on meteor type
         if self.meteor_type == "stony":
             # More varied textures for stony meteors
-            num_noise = random.randint(40, 60)
+            num_noise = self.rng.shape.randint(40, 60)
             noise_size_range = (1, 4)
         elif self.meteor_type == "iron":
             # Smoother with metallic streaks for iron meteors
-            num_noise = random.randint(20, 35)
+            num_noise = self.rng.shape.randint(20, 35)
             noise_size_range = (1, 3)
         else:  # stony-iron
             # Mix of both
-            num_noise = random.randint(30, 50)
+            num_noise = self.rng.shape.randint(30, 50)
             noise_size_range = (1, 4)
             
         for _ in range(num_noise):
-            noise_x = random.randint(-self.width//2, self.width//2)
-            noise_y = random.randint(-self.height//2, self.height//2)
-            noise_size = random.randint(*noise_size_range)
+            noise_x = self.rng.shape.randint(-self.width//2, self.width//2)
+            noise_y = self.rng.shape.randint(-self.height//2, self.height//2)
+            noise_size = self.rng.shape.randint(*noise_size_range)
             
             # Color variation based on meteor type
             if self.meteor_type == "iron":
                 # Metallic streaks for iron meteors
-                variation = random.randint(-10, 30)  # More highlights
+                variation = self.rng.shape.randint(-10, 30)  # More highlights
             else:
-                variation = random.randint(-20, 20)
+                variation = self.rng.shape.randint(-20, 20)
                 
             noise_color = (
                 min(255, max(0, self.color[0] + self.color_variation + variation)),
@@ -484,9 +1016,9 @@ class Asteroid(SpaceObject):
         # For iron meteors, add metallic streaks
         if self.meteor_type == "iron":
             for _ in range(5):
-                start_angle = random.uniform(0, 2 * math.pi)
-                length = random.uniform(0.3, 0.8) * self.width
-                width = random.randint(1, 3)
+                start_angle = self.rng.shape.uniform(0, 2 * math.pi)
+                length = self.rng.shape.uniform(0.3, 0.8) * self.width
+                width = self.rng.shape.randint(1, 3)
                 
                 # Create a streak of points
                 for i in range(0, int(length), 2):
@@ -494,7 +1026,7 @@ class Asteroid(SpaceObject):
                     noise_y = int(math.sin(start_angle) * i)
                     if -self.width//2 <= noise_x <= self.width//2 and -self.height//2 <= noise_y <= self.height//2:
                         # Metallic highlight color
-                        highlight = random.randint(20, 50)
+                        highlight = self.rng.shape.randint(20, 50)
                         noise_color = (
                             min(255, self.color[0] + highlight),
                             min(255, self.color[1] + highlight),
@@ -502,75 +1034,41 @@ class Asteroid(SpaceObject):
                         )
                         self.texture_noise.append((noise_x, noise_y, width, noise_color))
     
-    def update(self):
-        super().update()
-        self.rotation += self.rotation_speed
-        if self.rotation > 360:
-            self.rotation -= 360
-            
-        # Update trail particles for burning meteor effect
-        if random.random() < 0.3:  # 30% chance to emit a particle each frame
-            # Create trail particles behind the meteor
-            self.trail_particles.append([
-                self.x + random.uniform(-self.width/4, self.width/4),  # x position
-                self.y - self.height/2 - random.uniform(5, 15),  # y position (behind meteor)
-                random.uniform(-0.5, 0.5),  # x velocity
-                random.uniform(-1, -2),  # y velocity (upward)
-                random.uniform(5, 10),  # lifetime
-                self.trail_color  # color
-            ])
-        
-        # Update existing trail particles
-        for particle in self.trail_particles[:]:
-            particle[0] += particle[2]  # Update x position
-            particle[1] += particle[3]  # Update y position
-            particle[4] -= 0.2  # Decrease lifetime
-            
-            # Remove dead particles
-            if particle[4] <= 0:
-                self.trail_particles.remove(particle)
+    def collision_mask(self, rotation):
+        # Hit mask of the hull at a quantized rotation, built on first use
+        index = int(round(rotation * COLLISION_ROTATION_STEPS / 360)) % COLLISION_ROTATION_STEPS
+        entry = self.masks.get(index)
+        if entry is None:
+            angle = math.radians(index * 360 / COLLISION_ROTATION_STEPS)
+            cos_a = math.cos(angle)
+            sin_a = math.sin(angle)
+            size = int(self.radius) * 2 + 1
+            center = size // 2
+            rotated_points = [(center + x * cos_a - y * sin_a, center + x * sin_a + y * cos_a)
+                              for x, y in self.points]
+            hull = pygame.Surface((size, size), pygame.SRCALPHA)
+            pygame.draw.polygon(hull, WHITE, rotated_points)
+            pygame.draw.polygon(hull, WHITE, rotated_points, 3)  # The drawn outline
+            entry = (pygame.mask.from_surface(hull), (-center, -center))
+            self.masks[index] = entry
+        return entry
     
-    def draw(self, screen):
-        # Draw trail particles first (behind the meteor)
-        for particle in self.trail_particles:
-            # Create a surface for the particle glow
-            glow_size = int(particle[4] * 1.5)
-            if glow_size <= 0:
-                continue
-                
-            glow_surf = pygame.Surface((glow_size*2, glow_size*2), pygame.SRCALPHA)
-            
-            # Draw gradient glow
-            for radius in range(glow_size, 0, -1):
-                alpha = min(255, int(150 * (radius / glow_size) * (particle[4] / 10)))
-                color = (particle[5][0], particle[5][1], particle[5][2], alpha)
-                pygame.draw.circle(glow_surf, color, (glow_size, glow_size), radius)
-            
-            # Blit the glow
-            screen.blit(glow_surf, (int(particle[0]) - glow_size, int(particle[1]) - glow_size))
-        
+    def render_body(self, rotation, has_glow):
         # Create a surface for the meteor with per-pixel alpha
         meteor_surf = pygame.Surface((self.width*2, self.height*2), pygame.SRCALPHA)
         
         # Calculate rotated points
+        angle = math.radians(rotation)
+        cos_a = math.cos(angle)
+        sin_a = math.sin(angle)
         rotated_points = []
         for x, y in self.points:
-            angle = math.radians(self.rotation)
-            rotated_x = x * math.cos(angle) - y * math.sin(angle)
-            rotated_y = x * math.sin(angle) + y * math.cos(angle)
+            rotated_x = x * cos_a - y * sin_a
+            rotated_y = x * sin_a + y * cos_a
             rotated_points.append((rotated_x + self.width, rotated_y + self.height))
         
-        # Draw glow effect for heated meteors
-        if self.has_glow:
-            # Draw on screen (larger area than the meteor itself)
-            glow_surf = pygame.Surface((self.width*3, self.height*3), pygame.SRCALPHA)
-            for radius in range(self.width, 0, -5):
-                alpha = self.glow_color[3] * (radius / self.width)
-                color = (self.glow_color[0], self.glow_color[1], self.glow_color[2], alpha)
-                pygame.draw.circle(glow_surf, color, (self.width*3//2, self.height*3//2), radius)
-            screen.blit(glow_surf, (self.x - self.width*3//2, self.y - self.height*3//2))
-            
-            # Also add a heated edge to the meteor itself
+        # Add a heated edge to the meteor itself
+        if has_glow:
             edge_glow = pygame.Surface((self.width*2, self.height*2), pygame.SRCALPHA)
             pygame.draw.polygon(edge_glow, (255, 150, 0, 100), rotated_points, 0)
             meteor_surf.blit(edge_glow, (0, 0))
@@ -582,10 +1080,12 @@ class Asteroid(SpaceObject):
             min(255, max(0, self.color[2] + self.color_variation))
         )
         
-        # Create a gradient fill for 3D effect
-        for i in range(10):
+        # Create a gradient fill for 3D effect, spread over the quality tier's
+        # layer count
+        layers = quality.tier.gradient_layers
+        for i in range(layers):
             # Shrink the points slightly for each layer
-            shrink_factor = 1.0 - (i * 0.03)
+            shrink_factor = 1.0 - (i * 0.3 / layers)
             inner_points = []
             for x, y in rotated_points:
                 dx = x - self.width
@@ -595,10 +1095,11 @@ class Asteroid(SpaceObject):
                 inner_points.append((new_x, new_y))
             
             # Darken the color for inner layers
+            darken = i * 50 // layers
             layer_color = (
-                max(0, base_color[0] - i * 5),
-                max(0, base_color[1] - i * 5),
-                max(0, base_color[2] - i * 5)
+                max(0, base_color[0] - darken),
+                max(0, base_color[1] - darken),
+                max(0, base_color[2] - darken)
             )
             
             if len(inner_points) >= 3:  # Need at least 3 points for a polygon
@@ -619,9 +1120,8 @@ class Asteroid(SpaceObject):
         # Add texture noise for surface detail
         for noise_x, noise_y, noise_size, noise_color in self.texture_noise:
             # Rotate noise position
-            angle = math.radians(self.rotation)
-            rotated_x = noise_x * math.cos(angle) - noise_y * math.sin(angle)
-            rotated_y = noise_x * math.sin(angle) + noise_y * math.cos(angle)
+            rotated_x = noise_x * cos_a - noise_y * sin_a
+            rotated_y = noise_x * sin_a + noise_y * cos_a
             
             # Draw the noise detail
             pygame.draw.circle(meteor_surf, noise_color, 
@@ -631,9 +1131,8 @@ class Asteroid(SpaceObject):
         # Add crater details with 3D effect
         for crater_x, crater_y, crater_size, crater_color, crater_depth in self.crater_positions:
             # Rotate crater position
-            angle = math.radians(self.rotation)
-            rotated_x = crater_x * math.cos(angle) - crater_y * math.sin(angle)
-            rotated_y = crater_x * math.sin(angle) + crater_y * math.cos(angle)
+            rotated_x = crater_x * cos_a - crater_y * sin_a
+            rotated_y = crater_x * sin_a + crater_y * cos_a
             
             # Draw crater shadow (offset slightly)
             shadow_color = (
@@ -673,26 +1172,26 @@ class Asteroid(SpaceObject):
             # Add metallic sheen to iron meteors
             for i in range(3):
                 # Create random highlight lines
-                start_x = random.randint(0, self.width*2)
-                start_y = random.randint(0, self.height*2)
-                end_x = start_x + random.randint(-self.width//3, self.width//3)
-                end_y = start_y + random.randint(-self.height//3, self.height//3)
+                start_x = self.rng.draw.randint(0, self.width*2)
+                start_y = self.rng.draw.randint(0, self.height*2)
+                end_x = start_x + self.rng.draw.randint(-self.width//3, self.width//3)
+                end_y = start_y + self.rng.draw.randint(-self.height//3, self.height//3)
                 
                 # Draw highlight
                 pygame.draw.line(meteor_surf, (200, 200, 200, 100), 
                                (start_x, start_y), (end_x, end_y), 
-                               random.randint(1, 3))
+                               self.rng.draw.randint(1, 3))
         
         elif self.meteor_type == "stony":
             # Add more texture to stony meteors
             for _ in range(10):
-                x = random.randint(0, self.width*2)
-                y = random.randint(0, self.height*2)
-                size = random.randint(2, 5)
+                x = self.rng.draw.randint(0, self.width*2)
+                y = self.rng.draw.randint(0, self.height*2)
+                size = self.rng.draw.randint(2, 5)
                 color = (
-                    min(255, base_color[0] + random.randint(-30, 30)),
-                    min(255, base_color[1] + random.randint(-30, 30)),
-                    min(255, base_color[2] + random.randint(-30, 30))
+                    min(255, base_color[0] + self.rng.draw.randint(-30, 30)),
+                    min(255, base_color[1] + self.rng.draw.randint(-30, 30)),
+                    min(255, base_color[2] + self.rng.draw.randint(-30, 30))
                 )
                 pygame.draw.circle(meteor_surf, color, (x, y), size)
         
@@ -709,7 +1208,7 @@ class Asteroid(SpaceObject):
         
         # Add heated front edge for atmospheric entry effect
         # Find the bottom-most points
-        if self.has_glow:
+        if has_glow:
             bottom_points = []
             for x, y in rotated_points:
                 if y > self.height:
@@ -725,53 +1224,647 @@ class Asteroid(SpaceObject):
                 
                 # Draw heated edge
                 for x, y in bottom_points:
-                    glow_size = random.randint(3, 6)
+                    glow_size = self.rng.draw.randint(3, 6)
                     pygame.draw.circle(meteor_surf, (255, 200, 0, 200), (x, y), glow_size)
         
-        # Blit the meteor onto the screen
-        screen.blit(meteor_surf, (self.x - self.width, self.y - self.height))
-
-def spawn_meteor():
-    x = random.randint(PLAYER_X_MIN, PLAYER_X_MAX)
-    return Asteroid(x, -100)
-    
-# Keep the old function name for compatibility
-spawn_asteroid = spawn_meteor
-
-def draw_space(screen):
-    # Draw nebula background
-    for nebula_cloud in nebula:
-        # Create a surface with per-pixel alpha
-        cloud_surf = pygame.Surface((nebula_cloud[2]*2, nebula_cloud[2]*2), pygame.SRCALPHA)
-        # Draw a soft gradient circle
-        for radius in range(nebula_cloud[2], 0, -5):
-            alpha = 50 * (radius / nebula_cloud[2])
-            color = nebula_cloud[3] + (int(alpha),)
-            pygame.draw.circle(cloud_surf, color, (nebula_cloud[2], nebula_cloud[2]), radius)
-        # Blit the nebula onto the screen
-        screen.blit(cloud_surf, (nebula_cloud[0] - nebula_cloud[2], nebula_cloud[1] - nebula_cloud[2]))
-    
-    # Draw stars with different brightness and sizes
-    for star in stars:
-        # Draw a glow effect for larger stars
-        if star[2] > 2:
-            glow_radius = star[2] * 2
-            glow_surf = pygame.Surface((glow_radius*2, glow_radius*2), pygame.SRCALPHA)
-            for r in range(glow_radius, 0, -1):
-                alpha = 100 * (r / glow_radius)
-                color = (star[3], star[3], star[3], alpha)
-                pygame.draw.circle(glow_surf, color, (glow_radius, glow_radius), r)
-            screen.blit(glow_surf, (star[0] - glow_radius, star[1] - glow_radius))
-        
-        # Draw the star itself
-        pygame.draw.circle(screen, (star[3], star[3], star[3]), (star[0], star[1]), star[2])
+        return meteor_surf
+    
+    def draw(self, screen, x, y, rotation, has_glow):
+        # Blit the meteor body, either from the rotation cache or drawn fresh
+        if USE_ASTEROID_SPRITE_CACHE:
+            sprite, (offset_x, offset_y) = asteroid_sprites.get(self, has_glow, rotation)
+            return screen.blit(sprite, (x + offset_x, y + offset_y))
+        meteor_surf = self.render_body(rotation, has_glow)
+        return screen.blit(meteor_surf, (x - self.width, y - self.height))
+
+# One asteroid as an object of its own, as on the title screen; asteroids in
+# play are rows of an AsteroidField
+class Asteroid(SpaceObject):
+    __slots__ = ("rng", "shape", "meteor_type", "color_variation", "points", "crater_positions",
+                 "texture_noise", "radius", "rotation", "rotation_speed", "trail_particles",
+                 "trail_color", "glow_color", "has_glow")
+    
+    def __init__(self, x, y, speed=None, rng=None, shape=None):
+        self.rng = rng if rng is not None else streams
+        if shape is None:
+            # Randomly choose between meteor types
+            shape = AsteroidShape.random(self.rng.spawn.choice(METEOR_TYPES), self.rng, self.rng.spawn)
+        super().__init__(x, y, shape.width, shape.height, shape.color, game_speed if speed is None else speed)
         
-        # Make stars twinkle
-        star[3] += random.randint(-10, 10)
-        if star[3] < 100:
-            star[3] = 100
-        elif star[3] > 255:
-            star[3] = 255
+        # Burning trail effect for entering atmosphere
+        self.trail_particles = ParticleSystem(TRAIL_PARTICLE_CAPACITY, 0.2, self.rng.particles_np)
+        self.respawn(x, y, speed, shape)
+    
+    def respawn(self, x, y, speed, shape):
+        # Start over at (x, y) with another shape, reusing this instance
+        self.x = x
+        self.y = y
+        self.prev_x = x
+        self.prev_y = y
+        self.speed = game_speed if speed is None else speed
+        self.set_shape(shape)
+        self.rotation = self.rng.spawn.randint(0, 360)
+        self.rotation_speed = self.rng.spawn.uniform(-2, 2)
+        self.trail_particles.clear()
+        self.trail_color = self.rng.spawn.choice(TRAIL_COLORS)
+        
+        # Glowing effect for heated meteors
+        self.glow_color = self.rng.spawn.choice(GLOW_COLORS)
+        self.has_glow = self.rng.spawn.random() < 0.4  # 40% chance of having a glow
+    
+    def set_shape(self, shape):
+        self.shape = shape
+        self.meteor_type = shape.meteor_type
+        self.width = shape.width
+        self.height = shape.height
+        self.color = shape.color
+        self.color_variation = shape.color_variation
+        self.points = shape.points
+        self.crater_positions = shape.crater_positions
+        self.texture_noise = shape.texture_noise
+        self.radius = shape.radius
+        self.rect.size = (shape.width, shape.height)
+        self.rect.center = (self.x, self.y)
+    
+    def collision_mask(self):
+        return self.shape.collision_mask(self.rotation)
+    
+    def update(self):
+        super().update()
+        self.rotation += self.rotation_speed
+        if self.rotation > 360:
+            self.rotation -= 360
+            
+        # Update trail particles for burning meteor effect
+        if self.rng.particles.random() < quality.tier.trail_chance:  # Chance to emit a particle each frame
+            # Create trail particles behind the meteor
+            self.trail_particles.emit_one(
+                self.x + self.rng.particles.uniform(-self.width/4, self.width/4),  # x position
+                self.y - self.height/2 - self.rng.particles.uniform(5, 15),  # y position (behind meteor)
+                self.rng.particles.uniform(-0.5, 0.5),  # x velocity
+                self.rng.particles.uniform(-1, -2),  # y velocity (upward)
+                self.rng.particles.uniform(5, 10),  # lifetime
+                self.trail_color  # color
+            )
+        
+        # Update existing trail particles
+        self.trail_particles.update()
+    
+    def draw(self, screen, alpha=1.0):
+        x, y = self.render_position(alpha)
+        
+        # Draw trail particles first (behind the meteor)
+        rects = []
+        trail_rect = self.trail_particles.draw_glow(screen, 1.5, alpha_per_life=15, alpha=alpha)
+        if trail_rect is not None:
+            rects.append(trail_rect)
+        
+        # Draw glow effect for heated meteors
+        if self.has_glow:
+            # Draw on screen (larger area than the meteor itself)
+            rects.append(glow_sprites.blit(screen, (x, y), self.width,
+                                           self.glow_color[:3], self.glow_color[3], quality.tier.glow_step))
+        
+        body_rect = self.shape.draw(screen, x, y, self.rotation, self.has_glow)
+        return body_rect.unionall(rects)
+    
+    def render_body(self, rotation):
+        return self.shape.render_body(rotation, self.has_glow)
+
+# Pre-rendered asteroid bodies at quantized rotations, shared by all asteroids
+# and evicted least-recently-used once the memory cap is reached
+class AsteroidSpriteCache:
+    def __init__(self, steps=ASTEROID_ROTATION_STEPS, max_mb=ASTEROID_SPRITE_CACHE_MB):
+        self.steps = steps
+        self.max_bytes = max_mb * 1024 * 1024
+        self.sprites = OrderedDict()  # ((shape key, has_glow, layers), angle index) -> (surface, offset)
+        self.renders_left = ASTEROID_RENDERS_PER_FRAME
+        self.stand_ins = 0
+        self.bytes_used = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def angle_index(self, rotation):
+        return int(round(rotation * self.steps / 360)) % self.steps
+    
+    def prerender(self, shape, has_glow):
+        for index in range(self.steps):
+            if ((shape.key, has_glow, quality.tier.gradient_layers), index) not in self.sprites:
+                self._render(shape, has_glow, index)
+    
+    def get(self, shape, has_glow, rotation):
+        # Sprites are kept per quality tier's gradient layer count
+        key = ((shape.key, has_glow, quality.tier.gradient_layers), self.angle_index(rotation))
+        entry = self.sprites.get(key)
+        if entry is None:
+            self.misses += 1
+            if self.renders_left <= 0:
+                # After a quality change every sprite misses at once; past
+                # this frame's few renders, show the old tier's sprite and
+                # render the new one on a later frame
+                entry = self.stand_in(shape, has_glow, key[1])
+                if entry is not None:
+                    self.stand_ins += 1
+                    return entry
+            self.renders_left -= 1
+            return self._render(shape, has_glow, key[1])
+        self.hits += 1
+        self.sprites.move_to_end(key)
+        return entry
+    
+    def clear(self):
+        self.sprites.clear()
+        self.bytes_used = 0
+    
+    def _size(self, surface):
+        return surface.get_width() * surface.get_height() * surface.get_bytesize()
+    
+    def start_frame(self):
+        self.renders_left = ASTEROID_RENDERS_PER_FRAME
+    
+    def stand_in(self, shape, has_glow, index):
+        # The same sprite at another quality tier, if one is cached
+        for tier in QUALITY_TIERS:
+            key = ((shape.key, has_glow, tier.gradient_layers), index)
+            entry = self.sprites.get(key)
+            if entry is not None:
+                self.sprites.move_to_end(key)
+                return entry
+        return None
+    
+    def _render(self, shape, has_glow, index):
+        layers = quality.tier.gradient_layers
+        meteor_surf = shape.render_body(index * 360 / self.steps, has_glow)
+        # Crop away the empty margin so each cached angle stays small
+        bounds = meteor_surf.get_bounding_rect()
+        sprite = meteor_surf.subsurface(bounds).copy()
+        entry = (sprite, (bounds.x - shape.width, bounds.y - shape.height))
+        self.sprites[((shape.key, has_glow, layers), index)] = entry
+        self.bytes_used += self._size(sprite)
+        
+        # Evict the least recently used sprites, but never the one just made
+        while self.bytes_used > self.max_bytes and len(self.sprites) > 1:
+            _, (old_sprite, _) = self.sprites.popitem(last=False)
+            self.bytes_used -= self._size(old_sprite)
+            self.evictions += 1
+        return entry
+
+_sprite_keys = itertools.count()
+asteroid_sprites = AsteroidSpriteCache()
+
+# The fixed set of shape templates asteroids are spawned from, all generated
+# when the pool is made. Spawning then only picks a template and re-rolls a
+# few cheap per-instance values.
+class AsteroidPool:
+    def __init__(self, rng=None, templates_per_type=SHAPE_TEMPLATES_PER_TYPE, prerender=False, shape_seed=None,
+                 sizes=(50, 100), prerender_mb=ASTEROID_PRERENDER_MB):
+        self.rng = rng if rng is not None else streams
+        # Given their own seed, the templates have their own streams and can
+        # outlive the round that made them
+        shape_rng = self.rng if shape_seed is None else RandomStreams(shape_seed)
+        self.templates = tuple(AsteroidShape.random(meteor_type, shape_rng, shape_rng.shape,
+                                                    self.size_slice(sizes, templates_per_type, i))
+                               for i in range(templates_per_type)
+                               for meteor_type in METEOR_TYPES)
+        if prerender:
+            # Sprites for as many templates as fit in the budget, bodies
+            # without glow first as most asteroids have none; the others are
+            # rendered the first time they are drawn
+            budget = asteroid_sprites.bytes_used + min(prerender_mb * 1024 * 1024, asteroid_sprites.max_bytes)
+            for has_glow in (False, True):
+                for shape in self.templates:
+                    if asteroid_sprites.bytes_used >= budget:
+                        return
+                    asteroid_sprites.prerender(shape, has_glow)
+    
+    @staticmethod
+    def size_slice(sizes, count, i):
+        # Each type's templates take their sizes from an even split of the
+        # range, so a few dozen shapes still cover all of it
+        low, high = sizes
+        step = (high - low + 1) / count
+        start = low + int(i * step)
+        return start, max(start, low + int((i + 1) * step) - 1)
+    
+# Every asteroid in play as one row of a set of preallocated arrays, grown by
+# doubling. Motion, rotation, trails and culling are vectorized; shapes come
+# from an AsteroidPool's templates and are referenced by index.
+class AsteroidField:
+    FIELDS = (("x", np.float64), ("y", np.float64), ("prev_x", np.float64), ("prev_y", np.float64),
+              ("speed", np.float64), ("rotation", np.float64), ("rotation_speed", np.float64),
+              ("size", np.float64), ("radius", np.float64), ("meteor_type", np.int8),
+              ("shape", np.int32), ("has_glow", bool), ("glow_color", np.int8), ("trail_color", np.uint8))
+    
+    def __init__(self, pool, capacity=64, trail_capacity=FIELD_TRAIL_CAPACITY):
+        self.pool = pool
+        self.rng = pool.rng
+        self.templates = pool.templates
+        self.capacity = capacity
+        self.count = 0
+        for name, dtype in self.FIELDS:
+            setattr(self, name, np.zeros(capacity, dtype))
+        self.arrays = tuple(getattr(self, name) for name, _ in self.FIELDS)
+        self.trails = ParticleSystem(trail_capacity, 0.2, self.rng.effects_np)
+        self.trail_colors = np.array(TRAIL_COLORS, np.uint8)[:, :3]
+    
+    def __len__(self):
+        return self.count
+    
+    def grow(self):
+        self.capacity *= 2
+        for name, _ in self.FIELDS:
+            array = getattr(self, name)
+            grown = np.zeros(self.capacity, array.dtype)
+            grown[:self.count] = array[:self.count]
+            setattr(self, name, grown)
+        self.arrays = tuple(getattr(self, name) for name, _ in self.FIELDS)
+    
+    def clear(self):
+        # Empty the field, keeping its arrays at their grown size
+        self.count = 0
+        self.trails.clear()
+    
+    def spawn(self, x, y, speed=None):
+        # Same draws, in the same order, as Asteroid.respawn
+        if self.count == self.capacity:
+            self.grow()
+        i = self.count
+        spawn = self.rng.spawn
+        shape_index = spawn.randrange(len(self.templates))
+        shape = self.templates[shape_index]
+        self.x[i] = self.prev_x[i] = x
+        self.y[i] = self.prev_y[i] = y
+        self.speed[i] = game_speed if speed is None else speed
+        self.rotation[i] = spawn.randint(0, 360)
+        self.rotation_speed[i] = spawn.uniform(-2, 2)
+        self.trail_color[i] = spawn.randrange(len(TRAIL_COLORS))
+        self.glow_color[i] = spawn.randrange(len(GLOW_COLORS))
+        self.has_glow[i] = spawn.random() < 0.4  # 40% chance of having a glow
+        self.size[i] = shape.width
+        self.radius[i] = shape.radius
+        self.meteor_type[i] = METEOR_TYPES.index(shape.meteor_type)
+        self.shape[i] = shape_index
+        self.count = i + 1
+        return i
+    
+    def remove(self, indices):
+        if len(indices):
+            self.count = swap_compact(self.arrays, self.count, np.unique(indices))
+    
+    def update(self, cull_y=SCREEN_HEIGHT + 100):
+        # Move and spin everything, then cull asteroids past cull_y. Returns
+        # how many were culled, as they count towards the score.
+        n = self.count
+        x = self.x[:n]
+        y = self.y[:n]
+        self.prev_x[:n] = x
+        self.prev_y[:n] = y
+        y += self.speed[:n]
+        rotation = self.rotation[:n]
+        rotation += self.rotation_speed[:n]
+        rotation[rotation > 360] -= 360
+        
+        # Burning trails: each asteroid has a chance to emit every tick
+        rng = self.rng.effects_np
+        emitting = np.flatnonzero(rng.random(n) < quality.tier.trail_chance) if self.trails.capacity else ()
+        k = len(emitting)
+        if k:
+            half_size = self.size[emitting] / 2
+            self.trails.emit(k,
+                             x[emitting] + rng.uniform(-0.5, 0.5, k) * half_size,  # x position
+                             y[emitting] - half_size - rng.uniform(5, 15, k),  # y position (behind meteor)
+                             rng.uniform(-0.5, 0.5, k),  # x velocity
+                             rng.uniform(-2, -1, k),  # y velocity (upward)
+                             rng.uniform(5, 10, k),  # lifetime
+                             self.trail_colors[self.trail_color[emitting]])
+        self.trails.update()
+        
+        passed = np.flatnonzero(y > cull_y)
+        self.remove(passed)
+        return len(passed)
+    
+    def near(self, x, y, radius):
+        # Indices of asteroids whose bounding circle overlaps the given circle
+        n = self.count
+        dx = self.x[:n] - x
+        dy = self.y[:n] - y
+        reach = self.radius[:n] + radius
+        return np.flatnonzero(dx * dx + dy * dy <= reach * reach)
+    
+    def collision_mask(self, i):
+        return self.templates[self.shape[i]].collision_mask(self.rotation[i])
+    
+    def color(self, i):
+        return self.templates[self.shape[i]].color
+    
+    def state(self):
+        # Bytes of the live simulation state, for checksums
+        n = self.count
+        return b"".join(array[:n].tobytes() for array in self.arrays)
+    
+    def draw(self, screen, alpha=1.0, split_trails=False):
+        # Returns the rects drawn, for dirty-rect tracking. Trails go first,
+        # behind every meteor. They follow every asteroid, so split_trails
+        # gives them a rect per area rather than one covering most of the screen.
+        if split_trails:
+            rects = self.trails.draw_glow(screen, 1.5, alpha_per_life=15, alpha=alpha, cell_size=TRAIL_DIRTY_CELL)
+        else:
+            trail_rect = self.trails.draw_glow(screen, 1.5, alpha_per_life=15, alpha=alpha)
+            rects = [trail_rect] if trail_rect is not None else []
+        
+        n = self.count
+        glow_step = quality.tier.glow_step
+        asteroid_sprites.start_frame()
+        xs = (self.prev_x[:n] + (self.x[:n] - self.prev_x[:n]) * alpha).tolist()
+        ys = (self.prev_y[:n] + (self.y[:n] - self.prev_y[:n]) * alpha).tolist()
+        for x, y, rotation, size, shape, has_glow, glow_color in zip(
+                xs, ys, self.rotation[:n].tolist(), self.size[:n].tolist(), self.shape[:n].tolist(),
+                self.has_glow[:n].tolist(), self.glow_color[:n].tolist()):
+            # Draw glow effect for heated meteors
+            if has_glow:
+                glow = GLOW_COLORS[glow_color]
+                rects.append(glow_sprites.blit(screen, (x, y), int(size), glow[:3], glow[3], glow_step))
+            rects.append(self.templates[shape].draw(screen, x, y, rotation, has_glow))
+        return rects
+
+# The space behind the game. Without parallax the nebula and star glows never
+# move, so they are composited once into a display-format surface that every
+# frame starts from, and the twinkling stars are drawn over it. With parallax
+# the nebula and the stars are split into layers, each pre-rendered once into
+# a tile that wraps seamlessly top to bottom and scrolls at its own share of
+# the game speed; drawing a layer takes at most two blits. The farthest share
+# of the stars stays still and keeps twinkling, drawn over the tiles.
+class BackgroundLayer:
+    def __init__(self, layers=PARALLAX_LAYERS, tile_height=PARALLAX_TILE_HEIGHT):
+        self.layers = layers  # Scrolling star layers over the nebula; 0 for a still background
+        self.tile_height = tile_height
+        self.size = None  # Screen size the background is built for
+        # Kept per quality tier, so changing tier back and forth rebuilds nothing
+        self.surfaces = {}  # Tier name -> still background
+        self.tile_sets = {}  # Tier name -> [(tile, share of game speed)], back to front
+    
+    @property
+    def scrolling(self):
+        return self.layers > 0
+    
+    @property
+    def surface(self):
+        return self.surfaces.get(quality.tier.name)
+    
+    @property
+    def tiles(self):
+        return self.tile_sets.get(quality.tier.name, [])
+    
+    def configure(self, layers, tile_height):
+        self.layers = layers
+        self.tile_height = tile_height
+        self.invalidate()
+    
+    def invalidate(self):
+        # Call after nebula/stars change; the next draw rebuilds the layer
+        self.surfaces.clear()
+        self.tile_sets.clear()
+    
+    @staticmethod
+    def draw_nebula(surface, clouds, y_scale=1.0, wrap=None):
+        # wrap is the tile height to repeat clouds across the top and bottom edges
+        for nebula_cloud in clouds:
+            # Create a surface with per-pixel alpha
+            cloud_surf = pygame.Surface((nebula_cloud[2]*2, nebula_cloud[2]*2), pygame.SRCALPHA)
+            # Draw a soft gradient circle
+            for radius in range(nebula_cloud[2], 0, -5):
+                alpha = 50 * (radius / nebula_cloud[2])
+                color = nebula_cloud[3] + (int(alpha),)
+                pygame.draw.circle(cloud_surf, color, (nebula_cloud[2], nebula_cloud[2]), radius)
+            # Blit the nebula onto the layer
+            y = int(nebula_cloud[1] * y_scale)
+            for shift in ((0, -wrap, wrap) if wrap else (0,)):
+                surface.blit(cloud_surf, (nebula_cloud[0] - nebula_cloud[2], y + shift - nebula_cloud[2]))
+    
+    @staticmethod
+    def draw_stars(surface, indices, y_scale=1.0, wrap=None, circles=False):
+        # Glows for larger stars at their current brightness, and with
+        # circles the stars themselves
+        for x, y, size, brightness in zip(stars.x[indices].tolist(), stars.y[indices].tolist(),
+                                          stars.size[indices].tolist(), stars.brightness[indices].tolist()):
+            y = int(y * y_scale)
+            color = (brightness, brightness, brightness)
+            for shift in ((0, -wrap, wrap) if wrap else (0,)):
+                if size > 2:
+                    glow_sprites.blit(surface, (x, y + shift), size * 2, color, 100)
+                if circles:
+                    pygame.draw.circle(surface, color, (x, y + shift), size)
+    
+    def render(self, size, tier):
+        surface = pygame.Surface(size)
+        surface.fill(DARK_BLUE)  # Space background
+        self.draw_nebula(surface, nebula[:tier.nebula_clouds])
+        self.draw_stars(surface, np.arange(visible_stars(tier)))
+        
+        # Match the display format so the per-frame blit is a plain copy
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        self.surfaces[tier.name] = surface
+    
+    def tile_builder(self, size, tier):
+        # Builds the tier's tiles in small steps, a nebula cloud or a batch of
+        # stars each, and stores them when complete
+        width, height = size
+        tile_height = max(self.tile_height, height)
+        y_scale = tile_height / height  # Spread the screen's nebula and stars over the tile
+        
+        # The nebula moves slowest, on an opaque tile
+        tile = pygame.Surface((width, tile_height))
+        tile.fill(DARK_BLUE)
+        for cloud in nebula[:tier.nebula_clouds]:
+            self.draw_nebula(tile, [cloud], y_scale, tile_height)
+            yield
+        if pygame.display.get_surface() is not None:
+            tile = tile.convert()
+        tiles = [(tile, PARALLAX_NEBULA_SPEED)]
+        
+        # The stars after the twinkling ones, smaller stars on the farther,
+        # slower layers. The star tiles are mostly empty; run-length encoding
+        # their alpha makes blitting them skip the empty runs.
+        still = twinkling_stars(tier)
+        by_size = still + np.argsort(stars.size[still:visible_stars(tier)], kind="stable")
+        for layer, indices in enumerate(np.array_split(by_size, self.layers)):
+            tile = pygame.Surface((width, tile_height), pygame.SRCALPHA)
+            for start in range(0, len(indices), 32):
+                self.draw_stars(tile, indices[start:start + 32], y_scale, tile_height, circles=True)
+                yield
+            if pygame.display.get_surface() is not None:
+                tile = tile.convert_alpha()
+            tile.set_alpha(255, pygame.RLEACCEL)
+            tiles.append((tile, PARALLAX_STAR_SPEED * (layer + 1) / self.layers))
+            yield
+        self.tile_sets[tier.name] = tiles
+    
+    def prepare(self, tier):
+        # Build a tier's background ahead of a quality change, in steps
+        if self.size is None:
+            return
+        if self.scrolling:
+            if tier.name not in self.tile_sets:
+                yield from self.tile_builder(self.size, tier)
+        elif tier.name not in self.surfaces:
+            self.render(self.size, tier)
+            yield
+    
+    def draw(self, screen, scroll=0.0):
+        # scroll is how far the game has travelled, in pixels at game speed
+        size = screen.get_size()
+        if size != self.size:
+            # Rebuild on first use or when the resolution changes
+            self.invalidate()
+            self.size = size
+        tier = quality.tier
+        if not self.scrolling:
+            if tier.name not in self.surfaces:
+                self.render(size, tier)
+            screen.blit(self.surfaces[tier.name], (0, 0))
+            return
+        if tier.name not in self.tile_sets:
+            for _ in self.tile_builder(size, tier):
+                pass
+        for tile, speed in self.tile_sets[tier.name]:
+            tile_height = tile.get_height()
+            offset = int(scroll * speed) % tile_height
+            if offset > 0:
+                screen.blit(tile, (0, offset - tile_height))
+            if offset < size[1]:
+                screen.blit(tile, (0, offset))
+    
+    def memory(self):
+        # Bytes of pixels held for the background, over every tier built
+        surfaces = [tile for tiles in self.tile_sets.values() for tile, _ in tiles] + list(self.surfaces.values())
+        return sum(surface.get_pitch() * surface.get_height() for surface in surfaces)
+    
+    def report(self):
+        if self.scrolling:
+            return (f"parallax background: {len(self.tiles)} tiles of {self.tile_height} px, "
+                    f"{self.memory() / 2**20:.1f} MB")
+        return f"still background: {self.memory() / 2**20:.1f} MB"
+
+background = BackgroundLayer()
+generate_background()
+
+def draw_space(screen, scroll=0.0):
+    # Start from the cached nebula and star glows
+    background.draw(screen, scroll)
+    return draw_stars(screen)
+
+def visible_stars(tier=None):
+    return round(len(stars) * (tier or quality.tier).star_fraction)
+
+def twinkling_stars(tier=None):
+    # The stars drawn still and twinkling; a scrolling background keeps one
+    # layer's share of them, as far away as the stars can be, and scrolls the rest
+    count = visible_stars(tier)
+    if background.scrolling:
+        return round(count / (background.layers + 1))
+    return count
+
+def draw_stars(screen):
+    # Draw stars with different brightness and sizes, then twinkle them
+    return stars.draw(screen, twinkling_stars())
+
+# SysFont does a system font lookup, so each size is only created once
+fonts = {}
+
+def get_font(size):
+    font = fonts.get(size)
+    if font is None:
+        font = pygame.font.SysFont(None, size)
+        fonts[size] = font
+    return font
+
+# Rendered text surfaces keyed by (font size, string, color), so unchanged
+# labels and scores are rasterized once
+class TextCache:
+    def __init__(self, max_surfaces=TEXT_CACHE_SIZE):
+        self.max_surfaces = max_surfaces
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def render(self, size, text, color):
+        key = (size, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+        
+        self.misses += 1
+        surface = get_font(size).render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.max_surfaces:
+            self.surfaces.popitem(last=False)
+        return surface
+
+text_cache = TextCache()
+render_text = text_cache.render
+
+# Repaints only what changed: the rects drawn last frame are restored from
+# the cached background, and those plus this frame's rects are pushed with
+# display.update. When disabled, or when too much changed, it falls back to
+# redrawing the whole background and a full flip.
+class DirtyRectRenderer:
+    def __init__(self, enabled=None, max_dirty_fraction=DIRTY_RECT_MAX_FRACTION):
+        self.enabled = DIRTY_RECT_RENDERING if enabled is None else enabled
+        self.max_dirty_fraction = max_dirty_fraction
+        self.previous = []
+        self.current = []
+        self.full_redraw = True
+        self.scene_frozen = False
+        self.full_frames = 0
+        self.dirty_frames = 0
+    
+    def invalidate(self):
+        # Repaint everything next frame
+        self.full_redraw = True
+        self.scene_frozen = False
+    
+    def freeze_scene(self):
+        # Nothing behind the overlays moves any more; stop redrawing it
+        if self.enabled:
+            self.scene_frozen = True
+    
+    def begin(self, screen, scroll=0.0):
+        self.current = []
+        if (not self.enabled or self.full_redraw or background.scrolling or background.surface is None
+                or background.surface.get_size() != screen.get_size()):
+            # A scrolling background changes everywhere every frame
+            background.draw(screen, scroll)
+            self.full_redraw = True
+        else:
+            # Erase what was drawn last frame
+            for rect in self.previous:
+                screen.blit(background.surface, rect, rect)
+    
+    def mark(self, rect):
+        if rect is not None:
+            self.current.append(rect)
+    
+    def mark_all(self, rects):
+        self.current.extend(rects)
+    
+    def present(self, screen):
+        rects = self.previous + self.current
+        self.previous = self.current
+        self.current = []
+        if self.enabled and not self.full_redraw:
+            # Overlapping rects are counted twice, which only errs towards flipping
+            dirty_area = sum(rect.width * rect.height for rect in rects)
+            if dirty_area <= self.max_dirty_fraction * screen.get_width() * screen.get_height():
+                pygame.display.update(rects)
+                self.dirty_frames += 1
+                return
+        pygame.display.flip()
+        self.full_frames += 1
+        self.full_redraw = False
 
 def draw_ui_panel(screen, x, y, width, height, title, content):
     # Draw panel background with rounded corners
@@ -780,28 +1873,28 @@ def draw_ui_panel(screen, x, y, width, height, title, content):
     pygame.draw.rect(screen, (100, 100, 150), panel_rect, 2, border_radius=10)
     
     # Draw title
-    font = pygame.font.SysFont(None, 28)
-    title_text = font.render(title, True, WHITE)
+    title_text = render_text(28, title, WHITE)
     screen.blit(title_text, (x + width//2 - title_text.get_width()//2, y + 10))
     
     # Draw content
-    font = pygame.font.SysFont(None, 24)
-    content_text = font.render(content, True, WHITE)
+    content_text = render_text(24, content, WHITE)
     screen.blit(content_text, (x + width//2 - content_text.get_width()//2, y + 40))
+    return panel_rect
 
-def show_game_over(screen, win=False, explosion_time=0):
-    # Create semi-transparent overlay with pulsating effect for explosion
-    overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    
-    if not win and explosion_time < 30:
-        # Pulsating red overlay for explosion effect
-        alpha = max(0, 180 - explosion_time * 6)  # Fade from 180 to 0
-        overlay.fill((255, 0, 0, alpha))
-    else:
-        # Normal dark overlay
-        overlay.fill((0, 0, 0, 180))
-    
-    screen.blit(overlay, (0, 0))
+def show_game_over(screen, score, high_score, win=False, explosion_time=0, draw_overlay=True):
+    if draw_overlay:
+        # Create semi-transparent overlay with pulsating effect for explosion
+        overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        
+        if not win and explosion_time < 30:
+            # Pulsating red overlay for explosion effect
+            alpha = max(0, 180 - explosion_time * 6)  # Fade from 180 to 0
+            overlay.fill((255, 0, 0, alpha))
+        else:
+            # Normal dark overlay
+            overlay.fill((0, 0, 0, 180))
+        
+        screen.blit(overlay, (0, 0))
     
     # Draw game over panel
     panel_width = 400
@@ -824,12 +1917,11 @@ def show_game_over(screen, win=False, explosion_time=0):
     pygame.draw.rect(screen, border_color, panel_rect, int(border_pulse), border_radius=15)
     
     # Draw header with glow effect
-    font = pygame.font.SysFont(None, 74)
     if win:
-        text = font.render("YOU WIN!", True, GREEN)
+        text = render_text(74, "YOU WIN!", GREEN)
         glow_color = (0, 255, 0, 10)
     else:
-        text = font.render("GAME OVER", True, RED)
+        text = render_text(74, "GAME OVER", RED)
         glow_color = (255, 0, 0, 10)
     
     # Add text glow
@@ -844,306 +1936,1356 @@ def show_game_over(screen, win=False, explosion_time=0):
     
     # Draw meteor impact message if game over
     if not win:
-        font = pygame.font.SysFont(None, 28)
-        text = font.render("Your ship was destroyed by a meteor!", True, ORANGE)
+        text = render_text(28, "Your ship was destroyed by a meteor!", ORANGE)
         screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, panel_y + 90))
     
     # Draw score
-    font = pygame.font.SysFont(None, 36)
-    text = font.render(f"Score: {score}", True, WHITE)
+    text = render_text(36, f"Score: {score}", WHITE)
     screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, panel_y + 130))
     
     # Draw high score
-    text = font.render(f"High Score: {high_score}", True, YELLOW)
+    text = render_text(36, f"High Score: {high_score}", YELLOW)
     screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, panel_y + 180))
     
     # Draw restart instruction with pulsating effect
     pulse = math.sin(pygame.time.get_ticks() * 0.01) * 20 + 235  # Pulsate between 215-255
-    font = pygame.font.SysFont(None, 36)
-    text = font.render("Press SPACE to play again", True, (pulse, pulse, pulse))
+    # The color changes every frame, so this one bypasses the text cache
+    text = get_font(36).render("Press SPACE to play again", True, (pulse, pulse, pulse))
     screen.blit(text, (SCREEN_WIDTH // 2 - text.get_width() // 2, panel_y + 230))
+    return screen.get_rect() if draw_overlay else panel_rect
+
+# Keyboard input for one simulation step: how many times to move left and
+# right, and whether shield activation was requested
+Inputs = namedtuple("Inputs", ["left", "right", "shield"], defaults=(0, 0, False))
+NO_INPUT = Inputs()
+
+# Levels of detail, best first. Each tier sets the gradient layers in an
+# asteroid body, the radius step of asteroid glows, trail and thruster
+# emission chances, the share of stars and number of nebula clouds shown and the radius
+# step between shield glow rings.
+QualityTier = namedtuple("QualityTier", ["name", "gradient_layers", "glow_step", "trail_chance",
+                                         "thruster_chance", "star_fraction", "nebula_clouds", "shield_ring_step"])
+QUALITY_TIERS = (
+    QualityTier("high", 10, 5, 0.3, 0.4, 1.0, 20, 2),
+    QualityTier("medium", 6, 10, 0.2, 0.3, 2 / 3, 12, 4),
+    QualityTier("low", 3, 20, 0.1, 0.2, 1 / 3, 6, 10),
+)
 
-def main():
-    global score, game_speed, game_over, high_score
+# Watches how long each frame's work takes and moves between quality tiers
+# to stay inside the frame budget. It drops a tier after one window over
+# budget but only raises one after several calm windows in a row, so it
+# does not flip back and forth around the threshold.
+class QualityGovernor:
+    def __init__(self, pinned=None, budget_ms=1000 / 60):
+        names = [tier.name for tier in QUALITY_TIERS]
+        self.pinned = pinned is not None
+        self.level = names.index(pinned) if self.pinned else 0
+        self.budget_ms = budget_ms
+        self.samples = []
+        self.calm_windows = 0
+        self.changes = 0
+        self.pending = None  # (level, load) being prepared
+        self.preparation = None  # Steps building the pending tier's assets
     
-    # Set up the game window
-    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-    pygame.display.set_caption("Space Asteroid Dodge")
-    clock = pygame.time.Clock()
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.level]
     
-    # Load or create high score
-    if os.path.exists("highscore.txt"):
-        try:
-            with open("highscore.txt", "r") as f:
-                high_score = int(f.read())
-        except:
-            high_score = 0
-    
-    # Create player astronaut
-    player = Astronaut()
-    
-    # Falling asteroids
-    asteroids = []
-    asteroid_spawn_timer = 0
-    
-    # Particle effects
-    particles = []
-    
-    # Power-up variables
-    shield_powerup_timer = random.randint(300, 600)  # 5-10 seconds
-    shield_powerup_active = False
-    shield_powerup_pos = [0, 0]
-    
-    # Reset game variables
-    score = 0
-    game_speed = 5
-    game_over = False
-    win = False
-    game_time = 0
-    explosion_time = 0  # Counter for explosion animation
-    
-    # Game loop
-    running = True
-    while running:
-        # Handle events
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                running = False
-            
-            if not game_over:
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_LEFT:
-                        player.move_left()
-                    if event.key == pygame.K_RIGHT:
-                        player.move_right()
-                    if event.key == pygame.K_SPACE:
-                        player.activate_shield()
+    def observe(self, work_ms):
+        # Called once per frame with the time spent working, excluding the
+        # wait for the frame rate cap
+        if self.preparation is not None:
+            self.prepare_step()
+            return
+        if self.pinned:
+            return
+        self.samples.append(work_ms)
+        if len(self.samples) < QUALITY_WINDOW:
+            return
+        self.samples.sort()
+        load = self.samples[len(self.samples) * 9 // 10]
+        self.samples.clear()
+        if load > self.budget_ms * QUALITY_DROP_LOAD:
+            self.calm_windows = 0
+            if self.level < len(QUALITY_TIERS) - 1:
+                self.set_level(self.level + 1, load)
+        elif load < self.budget_ms * QUALITY_RAISE_LOAD and self.level > 0:
+            self.calm_windows += 1
+            if self.calm_windows >= QUALITY_RAISE_WINDOWS:
+                self.calm_windows = 0
+                self.set_level(self.level - 1, load)
+        else:
+            self.calm_windows = 0
+    
+    def set_level(self, level, load=None):
+        # Rebuilding the new tier's sprites and background in one frame would
+        # stall the frame the change is meant to relieve, so they are built a
+        # slice per frame and the tier switches once everything is ready
+        self.pending = (level, load)
+        self.preparation = self.prepare(QUALITY_TIERS[level])
+        self.samples.clear()
+    
+    def prepare(self, tier):
+        old = self.tier
+        yield from background.prepare(tier)
+        yield from Astronaut.prepare_shield_frames(tier.shield_ring_step)
+        yield from glow_sprites.prepare(old.glow_step, tier.glow_step)
+    
+    def prepare_step(self):
+        deadline = time.perf_counter() + QUALITY_PREPARE_MS / 1000
+        for _ in self.preparation:
+            if time.perf_counter() >= deadline:
+                return
+        self.preparation = None
+        (level, load), self.pending = self.pending, None
+        old = self.tier.name
+        self.level = level
+        self.changes += 1
+        reason = f" (p90 frame work {load:.1f} ms)" if load is not None else ""
+        log.info(f"Quality {old} -> {self.tier.name}{reason}")
+    
+    def report(self):
+        mode = "pinned" if self.pinned else f"{self.changes} automatic changes"
+        return f"quality {self.tier.name} ({mode})"
+
+quality = QualityGovernor()
+
+# Uniform grid broad phase over arrays of circles, rebuilt every tick with a
+# counting sort: objects are ordered by cell, so each cell's members are one
+# contiguous slice of order. Objects outside the area land in the edge cells.
+class UniformGrid:
+    def __init__(self, cell_size, left, top, width, height):
+        self.cell_size = cell_size
+        self.left = left
+        self.top = top
+        self.cols = width // cell_size + 1
+        self.rows = height // cell_size + 1
+        self.rebuild(np.zeros((0, 2), np.float32))
+    
+    def cell_coords(self, x, y):
+        cell_x = np.clip(((x - self.left) // self.cell_size).astype(np.int64), 0, self.cols - 1)
+        cell_y = np.clip(((y - self.top) // self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return cell_x, cell_y
+    
+    def rebuild(self, pos):
+        self.cell_x, self.cell_y = self.cell_coords(pos[:, 0], pos[:, 1])
+        cells = self.cell_y * self.cols + self.cell_x
+        self.order = np.argsort(cells, kind="stable")
+        self.counts = np.bincount(cells, minlength=self.cols * self.rows)
+        self.starts = np.cumsum(self.counts) - self.counts
+    
+    def query_rect(self, left, top, right, bottom):
+        # Indices of every object in the cells overlapping the rectangle
+        (x0, x1), (y0, y1) = self.cell_coords(np.array([left, right]), np.array([top, bottom]))
+        found = []
+        for cell_y in range(y0, y1 + 1):
+            row = cell_y * self.cols
+            start = self.starts[row + x0]
+            end = self.starts[row + x1] + self.counts[row + x1]
+            if end > start:
+                found.append(self.order[start:end])
+        return np.concatenate(found) if found else np.zeros(0, np.int64)
+    
+    def query_radius(self, pos, radius, x, y, r):
+        # Indices of the circles overlapping the circle at (x, y) with radius r
+        reach = r + (float(radius.max()) if len(radius) else 0)
+        candidates = self.query_rect(x - reach, y - reach, x + reach, y + reach)
+        offset = pos[candidates] - (x, y)
+        touching = (offset ** 2).sum(axis=1) <= (r + radius[candidates]) ** 2
+        return candidates[touching]
+    
+    def neighbour_pairs(self):
+        # Candidate pairs (i, j) of objects in the same or adjacent cells, each
+        # pair once. Only half the neighbours are visited from every cell.
+        index = np.arange(len(self.order))
+        pairs_i = []
+        pairs_j = []
+        for dx, dy in ((0, 0), (1, 0), (-1, 1), (0, 1), (1, 1)):
+            neighbour_x = self.cell_x + dx
+            neighbour_y = self.cell_y + dy
+            valid = (neighbour_x >= 0) & (neighbour_x < self.cols) & (neighbour_y < self.rows)
+            neighbour = neighbour_y[valid] * self.cols + neighbour_x[valid]
+            counts = self.counts[neighbour]
+            total = int(counts.sum())
+            if total == 0:
+                continue
+            # Pair each object with every member of its neighbour cell
+            i = np.repeat(index[valid], counts)
+            within = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+            j = self.order[np.repeat(self.starts[neighbour], counts) + within]
+            if dx == 0 and dy == 0:
+                keep = j > i
+                i = i[keep]
+                j = j[keep]
+            pairs_i.append(i)
+            pairs_j.append(j)
+        if not pairs_i:
+            return np.zeros(0, np.int64), np.zeros(0, np.int64)
+        return np.concatenate(pairs_i), np.concatenate(pairs_j)
+
+# Thousands of small meteor storm fragments in arrays. They fall with the
+# game speed, bounce off and shatter against each other, are culled below the screen,
+# with new debris streaming in from above to keep the storm at its target.
+class DebrisField:
+    sprites = {}  # Integer radius -> pre-rendered debris sprite
+    
+    def __init__(self, target, rng):
+        self.target = target
+        self.capacity = target * 2  # Room for fragments
+        self.rng = rng
+        self.count = 0
+        self.pos = np.zeros((self.capacity, 2), np.float32)
+        self.vel = np.zeros((self.capacity, 2), np.float32)
+        self.radius = np.zeros(self.capacity, np.float32)
+        # The grid also covers the band above the screen where debris enters
+        self.grid = UniformGrid(STORM_CELL_SIZE, -20, -200, SCREEN_WIDTH + 40, SCREEN_HEIGHT + 220)
+    
+    def __len__(self):
+        return self.count
+    
+    def clear(self):
+        self.count = 0
+    
+    def spawn(self, n, speed):
+        n = min(n, self.capacity - self.count)
+        if n <= 0:
+            return
+        start, end = self.count, self.count + n
+        self.pos[start:end, 0] = self.rng.uniform(0, SCREEN_WIDTH, n)
+        self.pos[start:end, 1] = self.rng.uniform(-190, -10, n)
+        self.vel[start:end, 0] = self.rng.uniform(-1, 1, n)
+        self.vel[start:end, 1] = self.rng.uniform(0.5, 1.5, n) * speed
+        # Mostly harmless grit, with the odd lethal rock in among it
+        radius = self.rng.uniform(DEBRIS_MIN_RADIUS, STORM_LETHAL_RADIUS, n)
+        lethal = np.flatnonzero(self.rng.random(n) < STORM_LETHAL_SHARE)
+        radius[lethal] = self.rng.uniform(STORM_LETHAL_RADIUS, DEBRIS_MAX_RADIUS, len(lethal))
+        self.radius[start:end] = radius
+        self.count = end
+    
+    def remove(self, indices):
+        if len(indices):
+            dead = np.unique(indices)
+            self.count = swap_compact((self.pos, self.vel, self.radius), self.count, dead)
+    
+    def update(self, speed):
+        n = self.count
+        self.pos[:n] += self.vel[:n]
+        
+        # Cull debris that left the screen
+        x = self.pos[:n, 0]
+        y = self.pos[:n, 1]
+        self.remove(np.flatnonzero((y > SCREEN_HEIGHT + 20) | (y < -200) | (x < -20) | (x > SCREEN_WIDTH + 20)))
+        
+        # Stream in new debris, building up to the target over about a second
+        self.spawn(min(self.target - self.count, max(1, self.target // 60)), speed)
+        self.grid.rebuild(self.pos[:self.count])
+    
+    def query_radius(self, x, y, r):
+        n = self.count
+        return self.grid.query_radius(self.pos[:n], self.radius[:n], x, y, r)
+    
+    def query_rect(self, rect):
+        # Debris overlapping a pygame.Rect
+        n = self.count
+        reach = float(self.radius[:n].max()) if n else 0
+        candidates = self.grid.query_rect(rect.left - reach, rect.top - reach,
+                                          rect.right + reach, rect.bottom + reach)
+        centers = self.pos[candidates]
+        nearest_x = np.clip(centers[:, 0], rect.left, rect.right)
+        nearest_y = np.clip(centers[:, 1], rect.top, rect.bottom)
+        distance_sq = (centers[:, 0] - nearest_x) ** 2 + (centers[:, 1] - nearest_y) ** 2
+        return candidates[distance_sq <= self.radius[candidates] ** 2]
+    
+    def collide(self):
+        # Touching debris that is closing in bounces apart; pieces large
+        # enough to split shatter in two when the impact is hard enough
+        i, j = self.grid.neighbour_pairs()
+        n = self.count
+        x = self.pos[:n, 0]
+        y = self.pos[:n, 1]
+        dx = x[i] - x[j]
+        dy = y[i] - y[j]
+        distance_sq = dx * dx + dy * dy
+        reach = self.radius[i] + self.radius[j]
+        touching = np.flatnonzero((distance_sq < reach * reach) & (distance_sq > 0))
+        i = i[touching]
+        j = j[touching]
+        offset = np.stack((dx[touching], dy[touching]), axis=1)
+        distance = np.sqrt(distance_sq[touching])
+        closing_speed = -((self.vel[i] - self.vel[j]) * offset).sum(axis=1) / distance
+        hit = closing_speed > 0
+        if not hit.any():
+            return 0
+        i = i[hit]
+        j = j[hit]
+        closing_speed = closing_speed[hit]
+        
+        # Equal-mass elastic bounce along the line between the centres
+        impulse = offset[hit] * (closing_speed / distance[hit])[:, None]
+        np.add.at(self.vel, i, impulse)
+        np.add.at(self.vel, j, -impulse)
+        
+        # Hard impacts split the larger pieces. A lethal piece only splits
+        # into halves that are still lethal; otherwise the storm grinds every
+        # lethal piece down long before it reaches the player.
+        hard = closing_speed > DEBRIS_SPLIT_SPEED
+        struck = np.unique(np.concatenate((i[hard], j[hard])))
+        radius = self.radius[struck]
+        self.split(struck[(radius >= 2 * DEBRIS_MIN_RADIUS)
+                          & ((radius < STORM_LETHAL_RADIUS) | (radius * DEBRIS_SPLIT_SCALE >= STORM_LETHAL_RADIUS))])
+        return len(i)
+    
+    def split(self, pieces):
+        # Both halves fly apart along a random direction
+        n = min(len(pieces), self.capacity - self.count)
+        pieces = pieces[:n]
+        angle = self.rng.uniform(0, 2 * math.pi, n)
+        direction = np.stack((np.cos(angle), np.sin(angle)), axis=1).astype(np.float32)
+        self.radius[pieces] *= DEBRIS_SPLIT_SCALE
+        reach = direction * self.radius[pieces, None]
+        start, end = self.count, self.count + n
+        self.pos[start:end] = self.pos[pieces] - reach
+        self.vel[start:end] = self.vel[pieces] - direction
+        self.radius[start:end] = self.radius[pieces]
+        self.pos[pieces] += reach
+        self.vel[pieces] += direction
+        self.count = end
+    
+    def draw(self, screen, alpha=1.0):
+        n = self.count
+        if n == 0:
+            return None
+        if not DebrisField.sprites:
+            for r in range(1, 9):
+                sprite = pygame.Surface((r*2, r*2), pygame.SRCALPHA)
+                pygame.draw.circle(sprite, DEBRIS_COLOR, (r, r), r)
+                pygame.draw.circle(sprite, (90, 70, 50), (r, r), r, 1)
+                DebrisField.sprites[r] = sprite
+        positions = self.pos[:n] - self.vel[:n] * (1.0 - alpha)
+        radii = np.clip(self.radius[:n].astype(np.int32), 1, DEBRIS_MAX_RADIUS)
+        corners = (positions - radii[:, None]).astype(np.int32).tolist()
+        sprites = DebrisField.sprites
+        screen.blits([(sprites[r], corner) for r, corner in zip(radii.tolist(), corners)], doreturn=False)
+        return screen.get_rect()
+
+# The simulation reads time only through its clock, which advances a fixed
+# amount per step, so it can run without a display and faster than real time
+class SimClock:
+    def __init__(self, step_ms=1000 / TICK_RATE):
+        self.step_ms = step_ms
+        self.ms = 0.0
+    
+    def reset(self):
+        self.ms = 0.0
+    
+    def advance(self):
+        self.ms += self.step_ms
+    
+    def now(self):
+        return self.ms
+
+# All game logic for one round: spawning, movement, collisions, power-ups,
+# scoring and speed-up. It makes no display or timer calls, so it can be
+# stepped headless.
+class Simulation:
+    def __init__(self, clock=None, high_score=0, prerender=False, seed=None, storm=0, shape_seed=None,
+                 effects=True, difficulty=DEFAULT_DIFFICULTY):
+        # Without effects no particles are made, which only changes what is
+        # drawn; headless users such as agents turn them off for speed
+        self.clock = clock if clock is not None else SimClock()
+        self.high_score = high_score
+        self.prerender = prerender  # Pre-render asteroid sprites at spawn
+        self.storm = storm  # Meteor storm debris count, 0 for none
+        self.difficulty = difficulty
+        self.rng = RandomStreams(seed)
+        
+        # Everything below lives as long as the simulation; reset() empties it
+        # in place for each round rather than building it again.
+        # Create player astronaut
+        self.player = Astronaut(self.rng, THRUSTER_PARTICLE_CAPACITY if effects else 0)
+        
+        # Falling asteroids, with shapes from a pool of templates. The
+        # templates and their sprites are kept for every round, drawn from the
+        # first round's seed unless given one.
+        self.shape_seed = self.rng.seed if shape_seed is None else shape_seed
+        self.pool = AsteroidPool(self.rng, prerender=prerender, shape_seed=self.shape_seed,
+                                 sizes=(difficulty.asteroid_min_size, difficulty.asteroid_max_size))
+        self.asteroids = AsteroidField(self.pool, trail_capacity=FIELD_TRAIL_CAPACITY if effects else 0)
+        
+        # Particle effects
+        self.particles = ParticleSystem(PARTICLE_CAPACITY if effects else 0, 0.5, self.rng.particles_np)
+        
+        # Meteor storm debris
+        self.debris = DebrisField(storm, self.rng.storm_np) if storm else None
+        self.start_round()
+    
+    def reset(self, seed=None):
+        # A round replays exactly from its seed; keep the current one by default
+        self.rng.reseed(self.rng.seed if seed is None else seed)
+        self.player.reset()
+        self.asteroids.clear()
+        self.particles.clear()
+        if self.debris is not None:
+            self.debris.clear()
+        self.start_round()
+    
+    def start_round(self):
+        self.clock.reset()
+        self.asteroid_spawn_timer = 0
+        
+        # Power-up variables
+        self.shield_powerup_timer = self.next_powerup_time()
+        self.shield_powerup_active = False
+        self.shield_powerup_pos = [0, 0]
+        
+        # Reset game variables
+        self.score = 0
+        self.game_speed = self.difficulty.start_speed
+        self.game_over = False
+        self.win = False
+        self.game_time = 0
+        self.scroll = 0.0  # Distance travelled, for the parallax background
+        
+        # Collision counters
+        self.narrow_checks = 0  # Bounding circles overlapped, so the masks were compared
+        self.narrow_hits = 0  # Masks overlapped
+    
+    def step(self, inputs=NO_INPUT):
+        if self.game_over:
+            return
+        player = self.player
+        player.save_position()
+        
+        # Apply movement and shield input
+        for _ in range(inputs.left):
+            player.move_left()
+        for _ in range(inputs.right):
+            player.move_right()
+        if inputs.shield:
+            player.activate_shield()
+        
+        self.clock.advance()
+        self.game_time += 1
+        self.scroll += self.game_speed
+        
+        # Update player
+        player.update()
+        
+        # Check if explosion animation is complete
+        if player.exploding:
+            if self.clock.now() - player.explosion_start_time >= player.explosion_duration:
+                self.game_over = True
+        profiler.lap("player_update")
+        
+        # Spawn shield power-up
+        self.shield_powerup_timer -= 1
+        if self.shield_powerup_timer <= 0 and not self.shield_powerup_active:
+            self.shield_powerup_active = True
+            self.shield_powerup_pos = [self.rng.powerup.randint(PLAYER_X_MIN, PLAYER_X_MAX), -50]
+        
+        # Update shield power-up
+        if self.shield_powerup_active:
+            self.shield_powerup_pos[1] += self.game_speed
+            # Check if player collected power-up
+            if abs(self.shield_powerup_pos[0] - player.x) < 30 and abs(self.shield_powerup_pos[1] - player.y) < 30:
+                self.shield_powerup_active = False
+                player.activate_shield()
+                self.shield_powerup_timer = self.next_powerup_time()
+                # Add particles for power-up collection
+                emit_powerup_burst(self.particles, self.shield_powerup_pos[0], self.shield_powerup_pos[1])
+            # Remove if off screen
+            if self.shield_powerup_pos[1] > SCREEN_HEIGHT + 50:
+                self.shield_powerup_active = False
+                self.shield_powerup_timer = self.next_powerup_time()
+        
+        # Spawn asteroids
+        self.asteroid_spawn_timer += 1
+        if self.asteroid_spawn_timer >= self.difficulty.spawn_interval:
+            self.asteroids.spawn(self.rng.spawn.randint(PLAYER_X_MIN, PLAYER_X_MAX), -100, self.game_speed)
+            self.asteroid_spawn_timer = 0
+        
+        # Update asteroids; those that made it off screen score
+        asteroids = self.asteroids
+        self.score += 10 * asteroids.update()
+        
+        # Check collision with player
+        hits = [i for i in asteroids.near(player.x, player.y, player.radius).tolist()
+                if self.asteroid_hits_player(i)]
+        for i in hits:
+            x = float(asteroids.x[i])
+            y = float(asteroids.y[i])
+            if player.shield_active:
+                # Destroy asteroid with shield
+                self.score += 5
+                # Add explosion particles
+                emit_shield_hit(self.particles, x, y)
             else:
-                if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                    # Save high score
-                    if score > high_score:
-                        high_score = score
-                        with open("highscore.txt", "w") as f:
-                            f.write(str(high_score))
-                    # Reset the game
-                    main()
-                    return
-        
-        # Continuous movement with key presses
-        if not game_over:
-            keys = pygame.key.get_pressed()
-            if keys[pygame.K_LEFT]:
-                player.move_left()
-            if keys[pygame.K_RIGHT]:
-                player.move_right()
-        
-        if not game_over:
-            game_time += 1
-            
-            # Update player
-            player.update()
-            
-            # Check if explosion animation is complete
-            if player.exploding:
-                current_time = pygame.time.get_ticks()
-                if current_time - player.explosion_start_time >= player.explosion_duration:
-                    game_over = True
-            
-            # Spawn shield power-up
-            shield_powerup_timer -= 1
-            if shield_powerup_timer <= 0 and not shield_powerup_active:
-                shield_powerup_active = True
-                shield_powerup_pos = [random.randint(PLAYER_X_MIN, PLAYER_X_MAX), -50]
-            
-            # Update shield power-up
-            if shield_powerup_active:
-                shield_powerup_pos[1] += game_speed
-                # Check if player collected power-up
-                if abs(shield_powerup_pos[0] - player.x) < 30 and abs(shield_powerup_pos[1] - player.y) < 30:
-                    shield_powerup_active = False
-                    player.activate_shield()
-                    shield_powerup_timer = random.randint(300, 600)
-                    # Add particles for power-up collection
-                    for _ in range(20):
-                        particles.append([
-                            shield_powerup_pos[0],
-                            shield_powerup_pos[1],
-                            random.uniform(-2, 2),
-                            random.uniform(-2, 2),
-                            random.randint(5, 10),
-                            (100, 150, 255)
-                        ])
-                # Remove if off screen
-                if shield_powerup_pos[1] > SCREEN_HEIGHT + 50:
-                    shield_powerup_active = False
-                    shield_powerup_timer = random.randint(300, 600)
-            
-            # Spawn asteroids
-            asteroid_spawn_timer += 1
-            if asteroid_spawn_timer >= 40:  # Spawn a new asteroid more frequently
-                asteroids.append(spawn_asteroid())
-                asteroid_spawn_timer = 0
-            
-            # Update asteroids
-            for asteroid in asteroids[:]:
-                asteroid.update()
-                
-                # Check if asteroid is off screen
-                if asteroid.y > SCREEN_HEIGHT + 100:
-                    asteroids.remove(asteroid)
-                    score += 10
-                
-                # Check collision with player
-                if asteroid.rect.colliderect(player.rect):
-                    if player.shield_active:
-                        # Destroy asteroid with shield
-                        asteroids.remove(asteroid)
-                        score += 5
-                        # Add explosion particles
-                        for _ in range(20):
-                            particles.append([
-                                asteroid.x,
-                                asteroid.y,
-                                random.uniform(-3, 3),
-                                random.uniform(-3, 3),
-                                random.randint(5, 15),
-                                (255, 165, 0)
-                            ])
-                    else:
-                        # Start explosion but don't set game_over yet
-                        # We'll set it after the explosion animation
-                        explosion_start_time = pygame.time.get_ticks()
-                        
-                        # Create massive explosion effect
-                        # First wave - bright center
-                        for _ in range(30):
-                            particles.append([
-                                player.x,
-                                player.y,
-                                random.uniform(-8, 8),  # Faster particles
-                                random.uniform(-8, 8),
-                                random.randint(15, 25),  # Longer lifetime
-                                (255, 255, 200)  # Bright yellow-white
-                            ])
-                        
-                        # Second wave - orange/red flames
-                        for _ in range(40):
-                            particles.append([
-                                player.x + random.uniform(-10, 10),
-                                player.y + random.uniform(-10, 10),
-                                random.uniform(-6, 6),
-                                random.uniform(-6, 6),
-                                random.randint(10, 20),
-                                (255, random.randint(50, 150), 0)  # Orange variations
-                            ])
-                        
-                        # Third wave - smoke and debris
-                        for _ in range(30):
-                            particles.append([
-                                player.x + random.uniform(-15, 15),
-                                player.y + random.uniform(-15, 15),
-                                random.uniform(-3, 3),
-                                random.uniform(-3, 3),
-                                random.randint(20, 40),  # Longer lasting smoke
-                                (100, 100, 100, 150)  # Gray smoke
-                            ])
-                            
-                        # Add meteor fragments
-                        for _ in range(15):
-                            particles.append([
-                                asteroid.x,
-                                asteroid.y,
-                                random.uniform(-5, 5),
-                                random.uniform(-5, 5),
-                                random.randint(10, 20),
-                                asteroid.color  # Same color as the meteor
-                            ])
-                            
-                        # Remove the asteroid that caused the collision
-                        asteroids.remove(asteroid)
-                        
-                        # Set player to exploding state
-                        player.exploding = True
-                        player.explosion_start_time = explosion_start_time
-            
-            # Update particles
-            for particle in particles[:]:
-                particle[0] += particle[2]  # x position
-                particle[1] += particle[3]  # y position
-                particle[4] -= 0.5  # lifetime
-                if particle[4] <= 0:
-                    particles.remove(particle)
-            
-            # Increase game speed gradually
-            if score > 0 and score % 100 == 0:
-                game_speed += 0.2
-            
-            # Check win condition
-            if score >= win_score:
-                game_over = True
-                win = True
-                if score > high_score:
-                    high_score = score
-        
-        # Draw everything
-        screen.fill(DARK_BLUE)  # Space background
-        draw_space(screen)
-        
-        # Draw particles
-        for particle in particles:
-            pygame.draw.circle(screen, particle[5], (int(particle[0]), int(particle[1])), int(particle[4]))
-        
-        # Draw shield power-up
-        if shield_powerup_active:
-            # Draw glowing effect
-            for radius in range(20, 5, -5):
-                alpha = 100 * (radius / 20)
-                glow_surf = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-                pygame.draw.circle(glow_surf, (100, 150, 255, alpha), (radius, radius), radius)
-                screen.blit(glow_surf, (shield_powerup_pos[0] - radius, shield_powerup_pos[1] - radius))
-            # Draw shield icon
-            pygame.draw.circle(screen, LIGHT_BLUE, (int(shield_powerup_pos[0]), int(shield_powerup_pos[1])), 10)
-            pygame.draw.circle(screen, WHITE, (int(shield_powerup_pos[0]), int(shield_powerup_pos[1])), 10, 2)
-        
-        # Draw UI panels
-        draw_ui_panel(screen, 20, 20, 150, 70, "SCORE", str(score))
-        
-        # Draw progress to win
-        progress = min(score / win_score, 1.0)
-        draw_ui_panel(screen, SCREEN_WIDTH - 170, 20, 150, 70, "PROGRESS", f"{int(progress * 100)}%")
-        pygame.draw.rect(screen, (50, 50, 80), (SCREEN_WIDTH - 160, 60, 130, 20), border_radius=5)
-        pygame.draw.rect(screen, GREEN, (SCREEN_WIDTH - 160, 60, int(130 * progress), 20), border_radius=5)
-        
-        # Draw shield status if active
+                self.explode_player(x, y, asteroids.color(i))
+        # Remove the asteroids that hit
+        if hits:
+            asteroids.remove(np.array(hits, np.int64))
+        profiler.lap("asteroid_update")
+        
+        # Update meteor storm debris
+        if self.debris is not None:
+            self.update_debris()
+            profiler.lap("debris_update")
+        
+        # Update particles
+        self.particles.update()
+        profiler.lap("particle_update")
+        
+        # Increase game speed gradually
+        if self.score > 0 and self.score % 100 == 0:
+            self.game_speed += self.difficulty.speed_step
+        
+        # Check win condition
+        if self.score >= self.difficulty.win_score:
+            self.game_over = True
+            self.win = True
+            if self.score > self.high_score:
+                self.high_score = self.score
+    
+    def next_powerup_time(self):
+        # Ticks until the next shield power-up; 5-10 seconds by default
+        return self.rng.powerup.randint(self.difficulty.powerup_min, self.difficulty.powerup_max)
+    
+    def asteroid_hits_player(self, i):
+        # Called for asteroids whose bounding circle overlaps the player's;
+        # compares their hit masks
+        player = self.player
+        asteroids = self.asteroids
+        self.narrow_checks += 1
+        mask, (offset_x, offset_y) = asteroids.collision_mask(i)
+        overlap = Astronaut.body_mask.overlap(
+            mask, (int(asteroids.x[i]) + offset_x - (int(player.x) - player.width // 2),
+                   int(asteroids.y[i]) + offset_y - (int(player.y) - player.height // 2)))
+        if overlap is None:
+            return False
+        self.narrow_hits += 1
+        return True
+    
+    def collision_report(self):
+        near_misses = self.narrow_checks - self.narrow_hits
+        return (f"{self.narrow_checks} pixel collision checks after the bounding-circle test, "
+                f"{self.narrow_hits} hits, {near_misses} near misses")
+    
+    def update_debris(self):
+        debris = self.debris
+        player = self.player
+        debris.update(self.game_speed)
+        debris.collide()
+        if player.exploding:
+            return
         if player.shield_active:
-            draw_ui_panel(screen, SCREEN_WIDTH // 2 - 75, 20, 150, 70, "SHIELD", f"{player.shield_timer // 60}s")
+            # The shield sweeps away any debris inside it
+            hit = debris.query_radius(player.x, player.y, player.shield_radius)
+            for x, y in debris.pos[hit[:4]].tolist():
+                emit_shield_hit(self.particles, x, y)
+            debris.remove(hit)
+            return
+        hit = debris.query_rect(player.rect)
+        if len(hit):
+            lethal = hit[debris.radius[hit] >= STORM_LETHAL_RADIUS]
+            if len(lethal):
+                x, y = debris.pos[lethal[0]].tolist()
+                self.explode_player(x, y, DEBRIS_COLOR)
+            debris.remove(hit)
+    
+    def explode_player(self, x, y, color):
+        # Start explosion but don't set game_over yet
+        # We'll set it after the explosion animation
         
-        # Draw player and asteroids
-        player.draw(screen)
-        for asteroid in asteroids:
-            asteroid.draw(screen)
+        # Create massive explosion effect with meteor fragments
+        emit_explosion(self.particles, self.player.x, self.player.y, x, y, color)
         
-        # Show game over screen
-        if game_over:
-            if not win:
-                explosion_time += 1  # Increment explosion animation counter
-            show_game_over(screen, win, explosion_time)
+        # Set player to exploding state
+        self.player.exploding = True
+        self.player.explosion_start_time = self.clock.now()
+    
+    def checksum(self):
+        # Digest of the simulation state, for checking that a replay matches
+        state = [self.score, self.game_speed, self.game_time, self.game_over, self.win,
+                 self.player.x, self.player.shield_active, self.player.shield_timer,
+                 self.shield_powerup_active, tuple(self.shield_powerup_pos), self.shield_powerup_timer,
+                 self.particles.pos[:len(self.particles)].tobytes(), self.asteroids.state()]
+        if self.debris is not None:
+            n = len(self.debris)
+            state.append((self.debris.pos[:n].tobytes(), self.debris.radius[:n].tobytes()))
+        digest = hashlib.blake2b(repr(state).encode(), digest_size=8).digest()
+        return struct.unpack("<Q", digest)[0]
+
+# Replays store the round's seed, the seed its asteroid shapes came from, storm
+# size and per-step inputs, run-length encoded.
+# Each input is one byte: left moves in bits 0-2, right moves in bits 3-5 and
+# shield in bit 6. The footer holds the step count and final state checksum.
+REPLAY_MAGIC = b"SADR"
+REPLAY_VERSION = 9
+REPLAY_HEADER = struct.Struct("<4sBQQII")  # magic, version, seed, shape seed, storm, run count
+REPLAY_RUN = struct.Struct("<BH")  # input byte, repeat count
+REPLAY_FOOTER = struct.Struct("<IQ")  # steps, checksum
+MAX_MOVES_PER_STEP = 7
+
+def encode_inputs(inputs):
+    return inputs.left | inputs.right << 3 | int(bool(inputs.shield)) << 6
+
+def decode_inputs(byte):
+    return Inputs(byte & 7, byte >> 3 & 7, bool(byte >> 6 & 1))
+
+class InputRecorder:
+    def __init__(self, seed, storm=0, shape_seed=None):
+        self.seed = seed
+        self.shape_seed = seed if shape_seed is None else shape_seed
+        self.storm = storm
+        self.runs = []  # [input byte, repeat count]
+        self.steps = 0
+    
+    def record(self, inputs):
+        byte = encode_inputs(inputs)
+        if self.runs and self.runs[-1][0] == byte and self.runs[-1][1] < 0xFFFF:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([byte, 1])
+        self.steps += 1
+    
+    def save(self, path, checksum):
+        with open(path, "wb") as f:
+            f.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.seed, self.shape_seed,
+                                       self.storm, len(self.runs)))
+            for byte, count in self.runs:
+                f.write(REPLAY_RUN.pack(byte, count))
+            f.write(REPLAY_FOOTER.pack(self.steps, checksum))
+
+def round_record_path(path, round_number):
+    # Each round of a session is recorded to its own file: game.rec becomes
+    # game.001.rec, game.002.rec and so on
+    root, ext = os.path.splitext(path)
+    return f"{root}.{round_number:03d}{ext}"
+
+def load_replay(path):
+    # Returns (seed, shape seed, storm, list of Inputs, step count, checksum)
+    with open(path, "rb") as f:
+        data = f.read()
+    magic, version, seed, shape_seed, storm, run_count = REPLAY_HEADER.unpack_from(data, 0)
+    if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+        raise ValueError(f"{path} is not a version {REPLAY_VERSION} replay file")
+    inputs = []
+    offset = REPLAY_HEADER.size
+    for _ in range(run_count):
+        byte, count = REPLAY_RUN.unpack_from(data, offset)
+        inputs.extend([decode_inputs(byte)] * count)
+        offset += REPLAY_RUN.size
+    steps, checksum = REPLAY_FOOTER.unpack_from(data, offset)
+    return seed, shape_seed, storm, inputs, steps, checksum
+
+def play_replay(path):
+    # Re-run a recorded round headless, as fast as possible. Returns the
+    # finished simulation and whether it matches the recorded final state.
+    seed, shape_seed, storm, inputs, steps, checksum = load_replay(path)
+    sim = Simulation(seed=seed, storm=storm, shape_seed=shape_seed)
+    for step_inputs in inputs:
+        sim.step(step_inputs)
+    return sim, sim.checksum() == checksum
+
+# Turns real elapsed time into a whole number of fixed simulation ticks. Under
+# load several ticks run per rendered frame, up to a cap so a slow machine
+# drops time instead of falling further behind every frame.
+class FixedTimestep:
+    def __init__(self, tick_rate=TICK_RATE, max_catchup=MAX_CATCHUP_TICKS):
+        self.tick_ms = 1000 / tick_rate
+        self.max_catchup = max_catchup
+        self.accumulator = 0.0
+        self.frames = 0  # Frames rendered
+        self.ticks = 0  # Simulation ticks run
+        self.skipped_frames = 0  # Ticks that ran without their own rendered frame
+        self.dropped_ticks = 0  # Ticks thrown away by the catch-up cap
+    
+    def advance(self, elapsed_ms):
+        # Returns how many ticks to run before rendering this frame
+        self.accumulator += elapsed_ms
+        ticks = int(self.accumulator // self.tick_ms)
+        if ticks > self.max_catchup:
+            self.dropped_ticks += ticks - self.max_catchup
+            ticks = self.max_catchup
+            # Forget the backlog beyond the cap, keeping the partial tick
+            self.accumulator = ticks * self.tick_ms + self.accumulator % self.tick_ms
+        self.accumulator -= ticks * self.tick_ms
+        self.frames += 1
+        self.ticks += ticks
+        self.skipped_frames += max(0, ticks - 1)
+        return ticks
+    
+    @property
+    def alpha(self):
+        # How far between the last two ticks this frame is rendered
+        return min(1.0, self.accumulator / self.tick_ms)
+    
+    def report(self):
+        return (f"{self.frames} frames rendered for {self.ticks} ticks; "
+                f"{self.skipped_frames} frames skipped, {self.dropped_ticks} ticks dropped")
+
+# Where each frame's time goes. The game loop and simulation call lap() at
+# the end of every phase, charging the time since the previous lap to it, so
+# the phases of a frame add up to the whole frame. Disabled, lap() returns
+# straight away.
+PROFILE_PHASES = ("events", "player_update", "asteroid_update", "debris_update", "particle_update",
+                  "draw_space", "particle_draw", "hud", "player_draw", "asteroid_draw", "game_over",
+                  "profiler", "flip", "capture", "idle")
+
+class FrameProfiler:
+    def __init__(self, enabled=False, csv_path=None):
+        self.enabled = False
+        self.overlay = False  # Draw the overlay each frame (F3)
+        self.csv_path = csv_path  # Every frame's timings are written here on exit
+        self.phase_index = {phase: i for i, phase in enumerate(PROFILE_PHASES)}
+        self.current = [0.0] * len(PROFILE_PHASES)
+        self.window = np.zeros((PROFILE_WINDOW, len(PROFILE_PHASES) + 1))  # Seconds; last column is the frame
+        self.frames = 0
+        self.rows = []  # Per-frame timings in ms, kept only for CSV export
+        self.last = 0.0
+        self.stats_surface = None
+        if enabled:
+            self.enable()
+    
+    def enable(self):
+        if not self.enabled:
+            self.enabled = True
+            self.last = time.perf_counter()
+    
+    def toggle_overlay(self):
+        self.overlay = not self.overlay
+        if self.overlay:
+            self.enable()
+    
+    def lap(self, phase):
+        if self.enabled:
+            now = time.perf_counter()
+            self.current[self.phase_index[phase]] += now - self.last
+            self.last = now
+    
+    def end_frame(self):
+        if not self.enabled:
+            return
+        row = self.window[self.frames % PROFILE_WINDOW]
+        row[:-1] = self.current
+        row[-1] = sum(self.current)
+        if self.csv_path is not None:
+            self.rows.append([round(seconds * 1000, 4) for seconds in row])
+        self.current = [0.0] * len(PROFILE_PHASES)
+        self.frames += 1
+        if self.frames % 30 == 0:
+            self.stats_surface = None  # Refresh the overlay's numbers
+    
+    def percentiles(self):
+        # p50, p95 and p99 in ms over the rolling window, one column per phase
+        # plus the whole frame
+        filled = self.window[:min(self.frames, PROFILE_WINDOW)]
+        if len(filled) == 0:
+            return np.zeros((3, len(PROFILE_PHASES) + 1))
+        return np.percentile(filled, (50, 95, 99), axis=0) * 1000
+    
+    def report(self):
+        if self.frames == 0:
+            return "profiler recorded no frames"
+        p50, p95, p99 = self.percentiles()
+        slowest = np.argsort(p95[:-1])[::-1][:3]
+        phases = ", ".join(f"{PROFILE_PHASES[i]} {p95[i]:.2f} ms" for i in slowest)
+        return (f"frame p50/p95/p99 {p50[-1]:.2f}/{p95[-1]:.2f}/{p99[-1]:.2f} ms "
+                f"over the last {min(self.frames, PROFILE_WINDOW)} frames; slowest phases at p95: {phases}")
+    
+    def export_csv(self, path=None):
+        path = path if path is not None else self.csv_path
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame"] + [f"{phase}_ms" for phase in PROFILE_PHASES] + ["total_ms"])
+            for frame, row in enumerate(self.rows):
+                writer.writerow([frame] + row)
+    
+    def render_stats(self):
+        # Percentile table, re-rendered only every 30 frames
+        percentiles = self.percentiles()
+        line_height = 16
+        surface = pygame.Surface((300, line_height * (len(PROFILE_PHASES) + 2) + 8))
+        surface.fill((10, 10, 30))
+        columns = (170, 230, 290)  # Right edges of the p50, p95 and p99 columns
+        rows = [("phase", ("p50", "p95", "p99"), LIGHT_BLUE)]
+        for i, name in enumerate(PROFILE_PHASES + ("frame",)):
+            rows.append((name, [f"{value:.2f}" for value in percentiles[:, i]], WHITE))
+        for row, (name, values, color) in enumerate(rows):
+            y = 4 + line_height * row
+            surface.blit(render_text(18, name, color), (8, y))
+            for right, value in zip(columns, values):
+                text = render_text(18, value, color)
+                surface.blit(text, (right - text.get_width(), y))
+        self.stats_surface = surface
+    
+    def draw_overlay(self, screen):
+        if self.stats_surface is None:
+            self.render_stats()
+        x, y = 10, SCREEN_HEIGHT - self.stats_surface.get_height() - 70
+        rect = screen.blit(self.stats_surface, (x, y))
+        
+        # Frame-time graph, with the 60 FPS budget as a reference line
+        graph = pygame.Rect(x, rect.bottom, rect.width, 60)
+        pygame.draw.rect(screen, (10, 10, 30), graph)
+        scale = graph.height / 33.3  # Pixels per ms
+        budget_y = graph.bottom - int(16.7 * scale)
+        pygame.draw.line(screen, (80, 80, 120), (graph.left, budget_y), (graph.right - 1, budget_y))
+        count = min(self.frames, PROFILE_GRAPH_FRAMES, PROFILE_WINDOW)
+        if count > 1:
+            newest = self.frames % PROFILE_WINDOW
+            recent = np.roll(self.window[:, -1], -newest)[-count:] * 1000
+            heights = np.minimum(recent * scale, graph.height - 1)
+            step = graph.width / PROFILE_GRAPH_FRAMES
+            points = [(graph.left + i * step, graph.bottom - 1 - h) for i, h in enumerate(heights.tolist())]
+            pygame.draw.lines(screen, GREEN, False, points)
+        return rect.union(graph)
+
+profiler = FrameProfiler()
+
+def draw_game(screen, sim, renderer, explosion_time, alpha=1.0):
+    # alpha is how far rendering is between the last two simulation ticks
+    renderer.begin(screen, sim.scroll - sim.game_speed * (1.0 - alpha))
+    renderer.mark_all(draw_stars(screen))
+    profiler.lap("draw_space")
+    
+    # Draw particles
+    renderer.mark(sim.particles.draw(screen, alpha))
+    
+    # Draw shield power-up
+    if sim.shield_powerup_active:
+        powerup_x = int(sim.shield_powerup_pos[0])
+        powerup_y = int(sim.shield_powerup_pos[1] - sim.game_speed * (1.0 - alpha))
+        # Draw glowing effect
+        for radius in range(20, 5, -5):
+            glow_alpha = 100 * radius // 20
+            # A falloff equal to the radius gives a single flat disc
+            renderer.mark(glow_sprites.blit(screen, (powerup_x, powerup_y), radius, (100, 150, 255), glow_alpha, radius))
+        # Draw shield icon
+        pygame.draw.circle(screen, LIGHT_BLUE, (powerup_x, powerup_y), 10)
+        pygame.draw.circle(screen, WHITE, (powerup_x, powerup_y), 10, 2)
+    profiler.lap("particle_draw")
+    
+    # Draw UI panels
+    renderer.mark(draw_ui_panel(screen, 20, 20, 150, 70, "SCORE", str(sim.score)))
+    
+    # Draw progress to win
+    progress = min(sim.score / sim.difficulty.win_score, 1.0)
+    renderer.mark(draw_ui_panel(screen, SCREEN_WIDTH - 170, 20, 150, 70, "PROGRESS", f"{int(progress * 100)}%"))
+    pygame.draw.rect(screen, (50, 50, 80), (SCREEN_WIDTH - 160, 60, 130, 20), border_radius=5)
+    pygame.draw.rect(screen, GREEN, (SCREEN_WIDTH - 160, 60, int(130 * progress), 20), border_radius=5)
+    
+    # Draw shield status if active
+    if sim.player.shield_active:
+        renderer.mark(draw_ui_panel(screen, SCREEN_WIDTH // 2 - 75, 20, 150, 70, "SHIELD", f"{sim.player.shield_timer // 60}s"))
+    
+    # Current quality tier
+    quality_text = render_text(20, f"Quality: {quality.tier.name}", (150, 150, 200))
+    renderer.mark(screen.blit(quality_text, (SCREEN_WIDTH - quality_text.get_width() - 10,
+                                             SCREEN_HEIGHT - quality_text.get_height() - 8)))
+    profiler.lap("hud")
+    
+    # Draw player and asteroids
+    renderer.mark(sim.player.draw(screen, sim.clock.now(), alpha))
+    profiler.lap("player_draw")
+    renderer.mark_all(sim.asteroids.draw(screen, alpha, renderer.enabled))
+    if sim.debris is not None:
+        renderer.mark(sim.debris.draw(screen, alpha))
+    profiler.lap("asteroid_draw")
+    
+    # Show game over screen
+    if sim.game_over:
+        renderer.mark(show_game_over(screen, sim.score, sim.high_score, sim.win, explosion_time))
+        if sim.win or explosion_time >= 30:
+            renderer.freeze_scene()
+        profiler.lap("game_over")
+
+# Session states. A session opens on the title screen, then runs rounds one
+# after another: playing, exploding once the player is hit, then game over or
+# win until SPACE starts the next round.
+START = "start"
+PLAYING = "playing"
+EXPLODING = "exploding"
+GAME_OVER = "game_over"
+WIN = "win"
+
+# The best scores, with when and how each round was played, kept in a JSON
+# file. Recording a score only changes the list in memory; a writer thread
+# saves it by writing a temporary file and renaming it over the old one, so
+# the game loop never waits on the disk and a crash never leaves half a file.
+class ScoreStore:
+    def __init__(self, path=SCORES_PATH, size=SCORE_BOARD_SIZE):
+        self.path = path
+        self.size = size
+        self.writes = 0
+        self.write_errors = 0
+        self.pending = queue.Queue()  # Lists of entries to save, or None to stop
+        self.entries = self.load()  # Best first
+        self.writer = threading.Thread(target=self.write_loop, name="score-writer", daemon=True)
+        self.writer.start()
+        if not os.path.exists(path):
+            self.migrate(os.path.join(os.path.dirname(path), "highscore.txt"))
+    
+    def load(self):
+        if not os.path.exists(self.path):
+            return []
+        try:
+            with open(self.path, "r") as f:
+                entries = json.load(f)["scores"]
+            valid = [entry for entry in entries if self.valid_entry(entry)]
+            if len(valid) < len(entries):
+                log.warning(f"Dropped {len(entries) - len(valid)} malformed entries from {self.path}")
+            return sorted(valid, key=lambda entry: entry["score"], reverse=True)[:self.size]
+        except (OSError, ValueError, KeyError, TypeError) as error:
+            # Keep the unreadable file to look at instead of saving over it
+            aside = self.path + ".corrupt"
+            log.warning(f"Could not read scores from {self.path} ({error}); moving it to {aside}")
+            try:
+                os.replace(self.path, aside)
+            except OSError:
+                pass
+            return []
+    
+    @staticmethod
+    def valid_entry(entry):
+        # An entry as record() and migrate() write them, so format() can show it
+        def number(value):
+            return isinstance(value, (int, float)) and not isinstance(value, bool)
+        return (isinstance(entry, dict) and {"score", "time", "duration", "game_speed", "win"} <= entry.keys()
+                and isinstance(entry["score"], int) and not isinstance(entry["score"], bool)
+                and isinstance(entry["time"], str) and isinstance(entry["win"], bool)
+                and (entry["duration"] is None or number(entry["duration"]))
+                and (entry["game_speed"] is None or number(entry["game_speed"])))
+    
+    def migrate(self, legacy_path):
+        # Bring over the single high score older versions kept
+        if not os.path.exists(legacy_path):
+            return
+        try:
+            with open(legacy_path, "r") as f:
+                score = int(f.read())
+            played = os.path.getmtime(legacy_path)
+        except (OSError, ValueError) as error:
+            log.warning(f"Could not migrate the high score in {legacy_path}: {error}")
+            return
+        if score > 0:
+            self.add({"score": score, "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(played)),
+                      "duration": None, "game_speed": None, "win": score >= win_score})
+            log.info(f"Migrated high score {score} from {legacy_path} to {self.path}")
+    
+    @property
+    def best(self):
+        return self.entries[0]["score"] if self.entries else 0
+    
+    def record(self, sim):
+        # Add a finished round; returns its place on the board, or None if it
+        # did not make it
+        return self.add({"score": sim.score, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                         "duration": round(sim.game_time / TICK_RATE, 2), "game_speed": sim.game_speed,
+                         "win": sim.win})
+    
+    def add(self, entry):
+        # Rounds that scored nothing never make the board
+        if entry["score"] <= 0:
+            return None
+        # After any equal scores, so the earlier round keeps its place
+        place = next((i for i, other in enumerate(self.entries) if other["score"] < entry["score"]),
+                     len(self.entries))
+        if place >= self.size:
+            return None
+        self.entries.insert(place, entry)
+        del self.entries[self.size:]
+        self.pending.put(list(self.entries))
+        return place + 1
+    
+    def write_loop(self):
+        stop = False
+        while not stop:
+            entries = self.pending.get()
+            stop = entries is None
+            # Only the newest list is worth writing
+            while not self.pending.empty():
+                newer = self.pending.get_nowait()
+                if newer is None:
+                    stop = True
+                else:
+                    entries = newer
+            if entries is not None:
+                self.write(entries)
+    
+    def write(self, entries):
+        temp_path = self.path + ".tmp"
+        try:
+            with open(temp_path, "w") as f:
+                json.dump({"version": 1, "scores": entries}, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+            self.writes += 1
+        except OSError as error:
+            self.write_errors += 1
+            log.warning(f"Could not save scores to {self.path}: {error}")
+    
+    def close(self, timeout=5):
+        # Finish any pending write
+        self.pending.put(None)
+        self.writer.join(timeout)
+    
+    def format(self):
+        lines = [f"{'#':>3} {'score':>6} {'time':<20} {'duration':>9} {'speed':>6}"]
+        for place, entry in enumerate(self.entries, 1):
+            duration = f"{entry['duration']:.1f}s" if entry["duration"] is not None else "-"
+            speed = f"{entry['game_speed']:.1f}" if entry["game_speed"] is not None else "-"
+            win = "  win" if entry["win"] else ""
+            lines.append(f"{place:>3} {entry['score']:>6} {entry['time']:<20} {duration:>9} {speed:>6}{win}")
+        return "\n".join(lines)
+
+# Records every rendered frame for QA. The game loop only copies the screen
+# into a bytes object and queues it; a writer thread turns the queue into a
+# PNG sequence, a Y4M video or raw RGB24 frames, so disk I/O never holds up
+# a frame. When the writer falls behind, frames are dropped, or with the
+# block policy the game waits for room in the queue. PNG and raw frames are
+# the screen's pixels exactly; Y4M goes through YCbCr, which rounds and
+# squeezes colors into studio range, so it is for watching, not comparing.
+YUV_MATRIX = np.array([[66, 129, 25], [-38, -74, 112], [112, -94, -18]], np.float32) / 256
+YUV_OFFSET = np.array([[16.5], [128.5], [128.5]], np.float32)  # With 0.5 to round
+
+class FrameCapture:
+    FORMATS = ("png", "y4m", "raw")
+    
+    def __init__(self, path=None, format=None, policy="drop", queue_size=CAPTURE_QUEUE_FRAMES, fps=TICK_RATE):
+        self.path = path  # Directory for PNG frames, or the video file
+        self.enabled = path is not None
+        self.format = format if format is not None else self.guess_format(path)
+        self.policy = policy
+        self.fps = fps
+        self.size = None
+        self.frames = 0  # Frames handed to the writer
+        self.dropped = 0
+        self.written = 0
+        self.bytes_written = 0
+        self.write_errors = 0
+        self.max_queued = 0
+        self.grab_times = np.zeros(PROFILE_WINDOW)  # Seconds the game loop spent on recent frames
+        self.grab_seconds = 0.0
+        self.grabs = 0
+        self.write_seconds = 0.0
+        self.pending = queue.Queue(queue_size)  # RGBX frames as bytes, or None to stop
+        self.writer = None
+        if self.enabled:
+            self.writer = threading.Thread(target=self.write_loop, name="capture-writer", daemon=True)
+            self.writer.start()
+    
+    @staticmethod
+    def guess_format(path):
+        extension = os.path.splitext(path or "")[1].lower()
+        if extension == ".y4m":
+            return "y4m"
+        if extension in (".rgb", ".raw"):
+            return "raw"
+        return "png"
+    
+    def grab(self, screen):
+        # Called right after the display is updated
+        if not self.enabled:
+            return
+        start = time.perf_counter()
+        if self.size is None:
+            self.size = screen.get_size()
+        # The one copy capture needs, as the screen is drawn over next frame.
+        # RGBX is a straight copy of a 32-bit screen, several times quicker
+        # than packing RGB; the writer drops the padding.
+        data = pygame.image.tobytes(screen, "RGBX")
+        if self.policy == "block":
+            self.pending.put(data)
+            self.frames += 1
+        else:
+            try:
+                self.pending.put_nowait(data)
+                self.frames += 1
+            except queue.Full:
+                self.dropped += 1
+        self.max_queued = max(self.max_queued, self.pending.qsize())
+        seconds = time.perf_counter() - start
+        self.grab_times[self.grabs % PROFILE_WINDOW] = seconds
+        self.grab_seconds += seconds
+        self.grabs += 1
+    
+    def write_loop(self):
+        stream = None
+        try:
+            while True:
+                data = self.pending.get()
+                if data is None:
+                    break
+                if self.write_errors:
+                    continue  # Keep draining so a blocked game loop can go on
+                start = time.perf_counter()
+                width, height = self.size
+                rgb = np.frombuffer(data, np.uint8).reshape(height, width, 4)[..., :3]
+                try:
+                    if self.format == "png":
+                        self.write_png(rgb)
+                    else:
+                        if stream is None:
+                            stream = self.open_stream()
+                        self.write_frame(stream, rgb)
+                    self.written += 1
+                except OSError as error:
+                    self.write_errors += 1
+                    log.warning(f"Could not write captured frames to {self.path}: {error}; capture stopped")
+                self.write_seconds += time.perf_counter() - start
+        finally:
+            if stream is not None:
+                stream.close()
+    
+    def write_png(self, rgb):
+        # Encoded here rather than with pygame.image.save, which holds the GIL
+        # and so stalls the game loop; zlib lets go of it while compressing
+        if self.written == 0:
+            os.makedirs(self.path, exist_ok=True)
+        width, height = self.size
+        rows = np.zeros((height, width * 3 + 1), np.uint8)  # Each row starts with filter type 0
+        rows[:, 1:] = rgb.reshape(height, width * 3)
+        chunks = [(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)),
+                  (b"IDAT", zlib.compress(rows, CAPTURE_PNG_LEVEL)), (b"IEND", b"")]
+        png = b"\x89PNG\r\n\x1a\n" + b"".join(
+            struct.pack(">I", len(body)) + kind + body + struct.pack(">I", zlib.crc32(kind + body))
+            for kind, body in chunks)
+        with open(os.path.join(self.path, f"frame_{self.written:06d}.png"), "wb") as f:
+            f.write(png)
+        self.bytes_written += len(png)
+    
+    def open_stream(self):
+        stream = open(self.path, "wb")
+        if self.format == "y4m":
+            width, height = self.size
+            header = f"YUV4MPEG2 W{width} H{height} F{self.fps}:1 Ip A1:1 C444\n".encode()
+            stream.write(header)
+            self.bytes_written += len(header)
+        return stream
+    
+    def write_frame(self, stream, rgb):
+        if self.format == "raw":
+            packed = rgb.tobytes()
+            stream.write(packed)
+            self.bytes_written += len(packed)
+            return
+        # BT.601 studio-range YCbCr at full chroma resolution, as Y, U and V
+        # planes; lossy, as 8-bit RGB does not survive the round trip
+        planar = rgb.reshape(-1, 3).T.astype(np.float32)
+        planes = (YUV_MATRIX @ planar + YUV_OFFSET).astype(np.uint8).tobytes()
+        stream.write(b"FRAME\n")
+        stream.write(planes)
+        self.bytes_written += 6 + len(planes)
+    
+    def close(self, timeout=30):
+        # Finish writing what is queued
+        if self.writer is not None:
+            self.pending.put(None)
+            self.writer.join(timeout)
+            self.writer = None
+    
+    def report(self):
+        if self.grabs == 0:
+            return "capture recorded no frames"
+        recent = self.grab_times[:min(self.grabs, PROFILE_WINDOW)] * 1000
+        write = self.write_seconds * 1000 / max(self.written, 1)
+        return (f"captured {self.written} of {self.grabs} frames to {self.path} as {self.format} "
+                f"({self.dropped} dropped, {self.bytes_written / 2**20:.1f} MB); game loop cost per frame "
+                f"mean {self.grab_seconds * 1000 / self.grabs:.2f} ms, recent p50/p95 "
+                f"{np.percentile(recent, 50):.2f}/{np.percentile(recent, 95):.2f} ms; writer "
+                f"{write:.2f} ms per frame, queue peaked at {self.max_queued}/{self.pending.maxsize}")
+
+capture = FrameCapture()
+
+# Runs the game from the title screen through any number of rounds in one
+# loop. Every round resets the same Simulation in place, keeping its pooled
+# asteroids, particle buffers and sprite caches, so the thousandth restart
+# costs the same time and memory as the first.
+class Session:
+    def __init__(self, screen, seed=None, record_path=None, storm=0, prerender=None, show_start=True,
+                 score_path=SCORES_PATH):
+        self.screen = screen
+        self.clock = pygame.time.Clock()
+        self.record_path = record_path
+        self.scores = ScoreStore(score_path)
+        # The first round uses the seed; later rounds draw theirs from it
+        self.round_seeds = random.Random(seed) if seed is not None else random.SystemRandom()
+        if prerender is None:
+            prerender = USE_ASTEROID_SPRITE_CACHE
+        
+        # Game logic runs in the simulation; the session feeds it input and draws it
+        self.sim = Simulation(high_score=self.scores.best, prerender=prerender, seed=seed, storm=storm)
+        self.recorder = None
+        
+        # Full-frame or dirty-rect screen updates
+        self.renderer = DirtyRectRenderer()
+        
+        # Fixed-rate simulation ticks, however fast frames are rendered
+        self.timestep = FixedTimestep()
+        self.rounds = 0
+        self.restart_ms = 0.0  # Time the last round took to set up
+        self.running = True
+        self.state = None
+        if show_start:
+            self.enter(START)
+        else:
+            self.start_round()
+    
+    def enter(self, state):
+        self.state = state
+        if state == START:
+            show_start_screen(self.screen)
+    
+    def start_round(self):
+        start = time.perf_counter()
+        if self.rounds:
+            self.sim.reset(self.round_seeds.randrange(2**63))
+        self.rounds += 1
+        if self.record_path:
+            self.recorder = InputRecorder(self.sim.rng.seed, self.sim.storm, self.sim.shape_seed)
+        self.renderer.invalidate()
+        self.explosion_time = 0  # Counter for explosion animation
+        self.left = self.right = 0  # Key presses not yet passed to a tick
+        self.shield = False
+        self.restart_ms = (time.perf_counter() - start) * 1000
+        self.enter(PLAYING)
+    
+    def end_round(self):
+        sim = self.sim
+        # Saved in the background
+        place = self.scores.record(sim)
+        if place is not None:
+            log.info(f"Score {sim.score} is #{place} on the leaderboard")
+        sim.high_score = self.scores.best
+        if self.recorder is not None:
+            self.save_recording()
+        self.log_round()
+        self.enter(WIN if sim.win else GAME_OVER)
+    
+    def save_recording(self):
+        path = round_record_path(self.record_path, self.rounds)
+        self.recorder.save(path, self.sim.checksum())
+        log.info(f"Recorded round {self.rounds} to {path}")
+    
+    def log_round(self):
+        log.info(self.timestep.report())
+        log.info(self.sim.collision_report())
+        log.info(quality.report())
+        log.info(background.report())
+        if profiler.enabled:
+            log.info(profiler.report())
+    
+    def handle_event(self, event):
+        if event.type == pygame.QUIT:
+            self.running = False
+        if event.type != pygame.KEYDOWN:
+            return
+        if event.key == pygame.K_F3:
+            profiler.toggle_overlay()
+        if self.state in (PLAYING, EXPLODING):
+            if event.key == pygame.K_LEFT:
+                self.left += 1
+            if event.key == pygame.K_RIGHT:
+                self.right += 1
+            if event.key == pygame.K_SPACE:
+                self.shield = True
+        elif event.key == pygame.K_SPACE:
+            # Start the first round from the title screen, or the next one
+            self.start_round()
+    
+    def update(self, elapsed_ms):
+        # Run the ticks due for this frame
+        sim = self.sim
+        keys = pygame.key.get_pressed()
+        held_left = 1 if keys[pygame.K_LEFT] else 0
+        held_right = 1 if keys[pygame.K_RIGHT] else 0
+        for _ in range(self.timestep.advance(elapsed_ms)):
+            if self.state not in (PLAYING, EXPLODING):
+                break
+            # Continuous movement with key presses, applied every tick
+            inputs = Inputs(min(self.left + held_left, MAX_MOVES_PER_STEP),
+                            min(self.right + held_right, MAX_MOVES_PER_STEP), self.shield)
+            self.left = self.right = 0
+            self.shield = False
+            if self.recorder is not None:
+                self.recorder.record(inputs)
+            sim.step(inputs)
+            if sim.game_over:
+                self.end_round()
+            elif sim.player.exploding:
+                self.state = EXPLODING
+    
+    def draw(self):
+        sim = self.sim
+        renderer = self.renderer
+        if self.state == START:
+            return  # The title screen is drawn once on entering
+        if renderer.scene_frozen:
+            # The game over overlay has settled, so only its panel still animates
+            renderer.mark(show_game_over(self.screen, sim.score, sim.high_score, sim.win, self.explosion_time,
+                                         draw_overlay=False))
+            profiler.lap("game_over")
+        else:
+            if self.state == GAME_OVER:
+                self.explosion_time += 1  # Increment explosion animation counter
+            alpha = 1.0 if sim.game_over else self.timestep.alpha
+            draw_game(self.screen, sim, renderer, self.explosion_time, alpha)
+        if profiler.overlay:
+            renderer.mark(profiler.draw_overlay(self.screen))
+            profiler.lap("profiler")
         
         # Update display
-        pygame.display.flip()
-        clock.tick(60)
+        renderer.present(self.screen)
+    
+    def frame(self, elapsed_ms=None):
+        # One pass of the game loop. elapsed_ms overrides the real time since
+        # the last frame, for running headless faster than real time.
+        for event in pygame.event.get():
+            self.handle_event(event)
+        profiler.lap("events")
+        self.update(self.clock.get_time() if elapsed_ms is None else elapsed_ms)
+        self.draw()
+        profiler.lap("flip")
+        capture.grab(self.screen)
+        profiler.lap("capture")
+        self.clock.tick(MAX_RENDER_FPS)
+        profiler.lap("idle")
+        profiler.end_frame()
+        quality.observe(self.clock.get_rawtime())  # The frame's work, without the frame rate cap's wait
     
+    def run(self):
+        while self.running:
+            self.frame()
+        
+        # Keep a round that was quit part way through
+        if self.state in (PLAYING, EXPLODING):
+            self.log_round()
+            if self.recorder is not None and self.recorder.steps:
+                self.save_recording()
+        if profiler.csv_path is not None:
+            profiler.export_csv()
+            log.info(f"Wrote {len(profiler.rows)} frames of timings to {profiler.csv_path}")
+        if capture.enabled:
+            capture.close()
+            log.info(capture.report())
+        self.scores.close()
+
+def main(seed=None, record_path=None):
+    # Set up the game window
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Space Asteroid Dodge")
+    Session(screen, seed, record_path, METEOR_STORM).run()
     pygame.quit()
     sys.exit()
 
 def show_start_screen(screen):
-    # Create a surface for the stars background
-    screen.fill(DARK_BLUE)
+    # Draw the stars background
     draw_space(screen)
     
     # Create title text with glow effect
-    title_font = pygame.font.SysFont(None, 100)
-    title_text = title_font.render("SPACE DODGE", True, WHITE)
+    title_text = render_text(100, "SPACE DODGE", WHITE)
     
     # Draw glow effect
     for offset in range(10, 0, -2):
@@ -1167,14 +3309,13 @@ def show_start_screen(screen):
     pygame.draw.rect(screen, (100, 100, 150), instructions_panel, 3, border_radius=15)
     
     # Draw instructions
-    font = pygame.font.SysFont(None, 30)
-    text = font.render("Arrow Keys: Move Left/Right", True, WHITE)
+    text = render_text(30, "Arrow Keys: Move Left/Right", WHITE)
     screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT - 180))
     
-    text = font.render("Space: Activate Shield (when available)", True, WHITE)
+    text = render_text(30, "Space: Activate Shield (when available)", WHITE)
     screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT - 140))
     
-    text = font.render("Press SPACE to Start", True, GREEN)
+    text = render_text(30, "Press SPACE to Start", GREEN)
     screen.blit(text, (SCREEN_WIDTH//2 - text.get_width()//2, SCREEN_HEIGHT - 100))
     
     # Draw astronaut
@@ -1187,25 +3328,104 @@ def show_start_screen(screen):
         asteroid.draw(screen)
     
     pygame.display.flip()
-    
-    # Wait for player to start
-    waiting = True
-    while waiting:
-        for event in pygame.event.get():
-            if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
-            if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                waiting = False
+
+def seed_arg(text):
+    # Replay files store the seed as an unsigned 64-bit integer
+    try:
+        seed = int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid seed: {text!r}")
+    if not 0 <= seed < 2**64:
+        raise argparse.ArgumentTypeError(f"seed must be between 0 and {2**64 - 1}, not {seed}")
+    return seed
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Space Asteroid Dodge")
+    parser.add_argument("--no-sprite-cache", action="store_true",
+                        help="draw asteroids directly every frame instead of from the rotation cache")
+    parser.add_argument("--rotation-steps", type=int, default=ASTEROID_ROTATION_STEPS,
+                        help="number of quantized rotation angles cached per asteroid")
+    parser.add_argument("--sprite-cache-mb", type=int, default=ASTEROID_SPRITE_CACHE_MB,
+                        help="memory cap for cached asteroid sprites in megabytes")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="repaint and update only the regions that changed each frame; "
+                             "uses a still background, as a scrolling one changes everywhere")
+    parser.add_argument("--seed", type=seed_arg,
+                        help="seed for the session; the first round uses it and later rounds follow from it")
+    parser.add_argument("--record", metavar="PATH",
+                        help="record each round's seed and inputs to its own file, PATH with the round "
+                             "number added (game.rec becomes game.001.rec, game.002.rec, ...)")
+    parser.add_argument("--leaderboard", action="store_true", help="print the best scores and exit")
+    parser.add_argument("--replay", metavar="PATH",
+                        help="re-run a recorded round headless and report whether it matches")
+    parser.add_argument("--storm", type=int, nargs="?", const=STORM_DEBRIS, default=0, metavar="N",
+                        help=f"meteor storm mode with N pieces of debris (default {STORM_DEBRIS})")
+    parser.add_argument("--profile", action="store_true",
+                        help="time each phase of every frame and show the profiler overlay (toggle with F3)")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="write per-frame phase timings to PATH as CSV on exit (implies --profile)")
+    parser.add_argument("--stars", type=int, default=STAR_COUNT, help="number of background stars")
+    parser.add_argument("--parallax-layers", type=int, metavar="N",
+                        help=f"scrolling star layers in the background; 0 for a still background "
+                             f"(default {PARALLAX_LAYERS}, or 0 with --dirty-rects)")
+    parser.add_argument("--parallax-tile-height", type=int, default=PARALLAX_TILE_HEIGHT, metavar="PX",
+                        help="height of each background layer's wrapping tile")
+    parser.add_argument("--quality", choices=["auto"] + [tier.name for tier in QUALITY_TIERS], default="auto",
+                        help="pin the level of detail instead of adapting it to the frame rate")
+    parser.add_argument("--max-fps", type=int, default=MAX_RENDER_FPS,
+                        help="cap on rendered frames per second (the simulation always ticks at 60)")
+    parser.add_argument("--capture", metavar="PATH",
+                        help="record every frame: a directory of PNGs, or a .y4m or .rgb (raw RGB24) video file")
+    parser.add_argument("--capture-format", choices=FrameCapture.FORMATS,
+                        help="capture format, if not the one PATH's extension implies")
+    parser.add_argument("--capture-policy", choices=("drop", "block"), default="drop",
+                        help="when the capture writer falls behind, drop frames (default) or wait for it")
+    parser.add_argument("--capture-queue", type=int, default=CAPTURE_QUEUE_FRAMES, metavar="FRAMES",
+                        help="frames that may wait for the capture writer")
+    args = parser.parse_args(argv)
+    # Dirty rects only pay off over a still background; with scrolling
+    # layers every frame is a full redraw anyway
+    if args.parallax_layers is None:
+        args.parallax_layers = 0 if args.dirty_rects else PARALLAX_LAYERS
+    elif args.dirty_rects and args.parallax_layers:
+        parser.error("--dirty-rects needs a still background; leave out --parallax-layers or set it to 0")
+    return args
 
 if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s %(name)s: %(message)s")
+    args = parse_args()
+    MAX_RENDER_FPS = args.max_fps
+    USE_ASTEROID_SPRITE_CACHE = not args.no_sprite_cache
+    asteroid_sprites = AsteroidSpriteCache(args.rotation_steps, args.sprite_cache_mb)
+    DIRTY_RECT_RENDERING = args.dirty_rects
+    METEOR_STORM = args.storm
+    if args.stars != STAR_COUNT:
+        STAR_COUNT = args.stars
+        generate_background()
+    background.configure(args.parallax_layers, args.parallax_tile_height)
+    quality = QualityGovernor(None if args.quality == "auto" else args.quality,
+                              1000 / (MAX_RENDER_FPS or TICK_RATE))
+    profiler = FrameProfiler(args.profile or args.profile_csv is not None, args.profile_csv)
+    profiler.overlay = args.profile
+    capture = FrameCapture(args.capture, args.capture_format, args.capture_policy, args.capture_queue,
+                           MAX_RENDER_FPS or TICK_RATE)
+    
+    if args.leaderboard:
+        scores = ScoreStore()
+        print(scores.format())
+        scores.close()
+        sys.exit(0)
+    
+    if args.replay:
+        replay_sim, matches = play_replay(args.replay)
+        print(f"Replayed {replay_sim.game_time} steps: score {replay_sim.score}, "
+              f"{'matches' if matches else 'DOES NOT match'} the recording")
+        sys.exit(0 if matches else 1)
+    
     # Initialize pygame
     pygame.init()
     screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
     pygame.display.set_caption("Space Asteroid Dodge")
     
-    # Show start screen
-    show_start_screen(screen)
-    
-    # Start the game
-    main()
\ No newline at end of file
+    # Start the game from the title screen
+    main(args.seed, args.record)
\ No newline at end of file
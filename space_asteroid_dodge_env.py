@@ -0,0 +1,280 @@
+# Space Asteroid Dodge as an environment for control agents, Gym style:
+# reset(seed) and step(action) run the game's Simulation headless, as fast as
+# it will go, and return NumPy observations. VectorEnv runs many of them
+# across worker processes, exchanging observations through shared memory.
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+
+import numpy as np
+
+# Headless: never open a window, even to render observation frames
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame  # noqa: E402
+import space_asteroid_dodge as game  # noqa: E402
+
+# Actions
+NONE = 0
+LEFT = 1
+RIGHT = 2
+SHIELD = 3
+ACTIONS = (game.NO_INPUT, game.Inputs(1, 0, False), game.Inputs(0, 1, False), game.Inputs(0, 0, True))
+
+MAX_ASTEROIDS = 16  # Asteroids in an observation, nearest the player first
+MAX_EPISODE_STEPS = 60 * 60 * 5  # Five minutes of game time
+SHAPE_SEED = 0  # Asteroid shape templates; fixed, so a reset seed alone decides an episode
+
+# An observation is one float32 vector: the player and power-up state below,
+# then (x, y, radius, present) for each observed asteroid
+PLAYER_FIELDS = ("player_x", "shield_active", "shield_timer", "exploding", "powerup_active",
+                 "powerup_x", "powerup_y", "powerup_timer", "game_speed")
+ASTEROID_FIELDS = ("x", "y", "radius", "present")
+
+def new_seed():
+    return np.random.SeedSequence().entropy % 2**63
+
+def episode_seed(seed, episode):
+    # Seed of the episode-th episode after a reset with seed; the first is seed itself
+    if episode == 0:
+        return seed
+    return int(np.random.SeedSequence([seed, episode]).generate_state(1, np.uint64)[0]) % 2**63
+
+def observation_size(max_asteroids=MAX_ASTEROIDS):
+    return len(PLAYER_FIELDS) + len(ASTEROID_FIELDS) * max_asteroids
+
+class AsteroidDodgeEnv:
+    def __init__(self, max_asteroids=MAX_ASTEROIDS, frame_size=None, storm=0, max_steps=MAX_EPISODE_STEPS,
+                 shape_seed=SHAPE_SEED):
+        self.max_asteroids = max_asteroids
+        self.frame_size = frame_size  # (width, height) of an RGB frame in info["frame"], or None
+        self.max_steps = max_steps
+        self.observation_size = observation_size(max_asteroids)
+        self.action_count = len(ACTIONS)
+        # Particles are only ever drawn, so they are left out unless frames are
+        self.sim = game.Simulation(storm=storm, shape_seed=shape_seed, effects=frame_size is not None)
+        self.seed = None  # Seed of the last reset
+        self.episode = 0  # Episodes started since then
+        self.screen = None
+        self.renderer = None
+        if frame_size is not None:
+            pygame.font.init()
+            self.screen = pygame.Surface((game.SCREEN_WIDTH, game.SCREEN_HEIGHT))
+            self.renderer = game.DirtyRectRenderer(False)
+
+    def reset(self, seed=None, out=None):
+        # Returns (observation, info). Without a seed, the episode follows on
+        # from the last seeded reset, so a run of episodes repeats from one seed.
+        self.start_episode(seed)
+        return self.observe(out), self.info()
+
+    def start_episode(self, seed=None):
+        if seed is not None or self.seed is None:
+            self.seed = seed if seed is not None else new_seed()
+            self.episode = 0
+        else:
+            self.episode += 1
+        self.sim.reset(episode_seed(self.seed, self.episode))
+
+    def step(self, action, out=None):
+        # Returns (observation, reward, terminated, truncated, info). The
+        # reward is the change in score: 10 per asteroid dodged, 5 per
+        # asteroid destroyed by the shield.
+        reward, terminated, truncated = self.advance(action)
+        return self.observe(out), reward, terminated, truncated, self.info()
+
+    def advance(self, action):
+        # One game tick without building an observation: (reward, terminated, truncated)
+        sim = self.sim
+        score = sim.score
+        sim.step(ACTIONS[action])
+        terminated = sim.game_over
+        return sim.score - score, terminated, not terminated and sim.game_time >= self.max_steps
+
+    def observe(self, out=None):
+        # Writes into out when given, such as a view of a shared buffer
+        sim = self.sim
+        player = sim.player
+        obs = out if out is not None else np.empty(self.observation_size, np.float32)
+        obs[:len(PLAYER_FIELDS)] = (player.x, player.shield_active, player.shield_timer, player.exploding,
+                                    sim.shield_powerup_active, sim.shield_powerup_pos[0],
+                                    sim.shield_powerup_pos[1], sim.shield_powerup_timer, sim.game_speed)
+        asteroids = sim.asteroids
+        n = len(asteroids)
+        rows = obs[len(PLAYER_FIELDS):].reshape(self.max_asteroids, len(ASTEROID_FIELDS))
+        if n > self.max_asteroids:
+            # The lowest asteroids are the ones about to reach the player
+            nearest = np.argpartition(-asteroids.y[:n], self.max_asteroids - 1)[:self.max_asteroids]
+            nearest = nearest[np.argsort(-asteroids.y[nearest])]
+        else:
+            nearest = np.argsort(-asteroids.y[:n])
+        k = len(nearest)
+        rows[:k, 0] = asteroids.x[nearest]
+        rows[:k, 1] = asteroids.y[nearest]
+        rows[:k, 2] = asteroids.radius[nearest]
+        rows[:k, 3] = 1
+        rows[k:] = 0
+        return obs
+
+    def render_frame(self, out=None):
+        # The game as drawn, scaled down to frame_size, as (height, width, 3) uint8
+        game.draw_game(self.screen, self.sim, self.renderer, 0)
+        small = pygame.transform.smoothscale(self.screen, self.frame_size)
+        frame = out if out is not None else np.empty((self.frame_size[1], self.frame_size[0], 3), np.uint8)
+        frame[...] = pygame.surfarray.pixels3d(small).transpose(1, 0, 2)
+        return frame
+
+    def info(self):
+        sim = self.sim
+        info = {"score": sim.score, "win": sim.win, "game_time": sim.game_time}
+        if self.frame_size is not None:
+            info["frame"] = self.render_frame()
+        return info
+
+# Worker side of VectorEnv: steps its share of the environments on command,
+# reading actions from and writing results to the shared buffers
+def _worker(connection, names, num_envs, start, stop, env_kwargs, frame_shape):
+    buffers = {name: shared_memory.SharedMemory(name=shm_name) for name, shm_name in names.items()}
+    arrays = VectorEnv.arrays(buffers, num_envs, env_kwargs.get("max_asteroids", MAX_ASTEROIDS), frame_shape)
+    actions, observations, rewards, terminated, truncated, frames = (
+        arrays[name][start:stop] if arrays[name] is not None else None
+        for name in ("actions", "observations", "rewards", "terminated", "truncated", "frames"))
+    arrays = None
+    envs = [AsteroidDodgeEnv(**env_kwargs) for _ in range(stop - start)]
+    try:
+        while True:
+            command, argument = connection.recv()
+            if command == "reset":
+                for i, env in enumerate(envs):
+                    env.start_episode(None if argument is None else argument + start + i)
+                    env.observe(observations[i])
+                    if frames is not None:
+                        env.render_frame(frames[i])
+                connection.send(None)
+            elif command == "step":
+                episodes = []  # (env index, score, win, steps) of episodes that ended
+                for i, (env, action) in enumerate(zip(envs, actions.tolist())):
+                    reward, done, cut = env.advance(action)
+                    rewards[i] = reward
+                    terminated[i] = done
+                    truncated[i] = cut
+                    if done or cut:
+                        # Start the next episode straight away, as vector environments do
+                        sim = env.sim
+                        episodes.append((start + i, sim.score, sim.win, sim.game_time))
+                        env.start_episode()
+                    env.observe(observations[i])
+                    if frames is not None:
+                        env.render_frame(frames[i])
+                connection.send(episodes)
+            elif command == "close":
+                break
+    finally:
+        # The views must go before the memory can be closed
+        del actions, observations, rewards, terminated, truncated, frames
+        for buffer in buffers.values():
+            buffer.close()
+        connection.close()
+
+# N environments stepped together across a pool of worker processes. Each
+# worker owns a contiguous block of environments; actions, observations,
+# rewards and done flags live in shared memory, so a step only sends a short
+# message to each worker. Episodes that end are reset immediately.
+class VectorEnv:
+    def __init__(self, num_envs, workers=None, **env_kwargs):
+        self.num_envs = num_envs
+        self.workers = min(num_envs, workers or os.cpu_count() or 1)
+        max_asteroids = env_kwargs.get("max_asteroids", MAX_ASTEROIDS)
+        frame_size = env_kwargs.get("frame_size")
+        self.frame_shape = (frame_size[1], frame_size[0], 3) if frame_size is not None else None
+        self.observation_size = observation_size(max_asteroids)
+        self.action_count = len(ACTIONS)
+
+        sizes = {"actions": num_envs, "observations": num_envs * self.observation_size * 4,
+                 "rewards": num_envs * 4, "terminated": num_envs, "truncated": num_envs}
+        if self.frame_shape is not None:
+            sizes["frames"] = num_envs * int(np.prod(self.frame_shape))
+        self.buffers = {name: shared_memory.SharedMemory(create=True, size=size) for name, size in sizes.items()}
+        arrays = self.arrays(self.buffers, num_envs, max_asteroids, self.frame_shape)
+        self.actions = arrays["actions"]
+        self.observations = arrays["observations"]
+        self.rewards = arrays["rewards"]
+        self.terminated = arrays["terminated"]
+        self.truncated = arrays["truncated"]
+        self.frames = arrays["frames"]
+
+        context = multiprocessing.get_context("spawn")
+        names = {name: buffer.name for name, buffer in self.buffers.items()}
+        bounds = np.linspace(0, num_envs, self.workers + 1).astype(int)
+        self.connections = []
+        self.processes = []
+        for start, stop in zip(bounds[:-1].tolist(), bounds[1:].tolist()):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, args=(child, names, num_envs, start, stop, env_kwargs,
+                                                                 self.frame_shape), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+        self.closed = False
+
+    @staticmethod
+    def arrays(buffers, num_envs, max_asteroids, frame_shape):
+        # NumPy views of the shared buffers
+        return {
+            "actions": np.ndarray((num_envs,), np.int8, buffers["actions"].buf),
+            "observations": np.ndarray((num_envs, observation_size(max_asteroids)), np.float32,
+                                       buffers["observations"].buf),
+            "rewards": np.ndarray((num_envs,), np.float32, buffers["rewards"].buf),
+            "terminated": np.ndarray((num_envs,), bool, buffers["terminated"].buf),
+            "truncated": np.ndarray((num_envs,), bool, buffers["truncated"].buf),
+            "frames": (np.ndarray((num_envs,) + frame_shape, np.uint8, buffers["frames"].buf)
+                       if frame_shape is not None else None),
+        }
+
+    def reset(self, seed=None):
+        # Environment i is seeded seed + i, and the episodes that follow from
+        # that, so a whole run repeats from one seed. Returns the observations, one row
+        # per environment; the array is the shared buffer, overwritten by the
+        # next step, so copy it to keep it.
+        for connection in self.connections:
+            connection.send(("reset", seed))
+        for connection in self.connections:
+            connection.recv()
+        return self.observations
+
+    def step(self, actions):
+        # Returns (observations, rewards, terminated, truncated, episodes),
+        # where episodes lists (env index, score, win, steps) for each
+        # episode that ended and was reset during this step
+        self.actions[:] = actions
+        for connection in self.connections:
+            connection.send(("step", None))
+        episodes = []
+        for connection in self.connections:
+            episodes.extend(connection.recv())
+        return self.observations, self.rewards, self.terminated, self.truncated, episodes
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        for connection in self.connections:
+            try:
+                connection.send(("close", None))
+            except OSError:
+                pass
+        for process in self.processes:
+            process.join(5)
+        # Drop our views before releasing the memory
+        self.actions = self.observations = self.rewards = self.terminated = self.truncated = self.frames = None
+        for buffer in self.buffers.values():
+            buffer.close()
+            buffer.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()